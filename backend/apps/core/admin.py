@@ -1 +1,32 @@
+import json
+
 from django.contrib import admin
+from django.utils.html import format_html
+
+from .models import QueryTraceReport
+
+
+@admin.register(QueryTraceReport)
+class QueryTraceReportAdmin(admin.ModelAdmin):
+    list_display = [
+        'created_at', 'method', 'path', 'view', 'status_code',
+        'query_count', 'repeated_count', 'slow_count', 'duration_ms', 'trigger'
+    ]
+    list_filter = ['trigger', 'view', 'created_at']
+    search_fields = ['path', 'view']
+    date_hierarchy = 'created_at'
+    exclude = ['queries']
+    readonly_fields = [
+        'view', 'method', 'path', 'status_code', 'trigger', 'duration_ms', 'query_count',
+        'query_time_ms', 'repeated_count', 'slow_count', 'created_at', 'queries_display'
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Запросы')
+    def queries_display(self, obj):
+        return format_html(
+            '<pre style="white-space: pre-wrap">{}</pre>',
+            json.dumps(obj.queries, ensure_ascii=False, indent=2)
+        )
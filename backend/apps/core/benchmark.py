@@ -0,0 +1,205 @@
+"""
+Нагрузочный прогон типового набора запросов к API.
+
+Запросы выбираются из REQUEST_SUITE случайно с учетом весов и выполняются
+тестовым клиентом DRF в текущем процессе (без сети). Для каждого запроса
+замеряется время обработки и число SQL-запросов; итог - перцентили
+задержки, среднее число запросов и пропускная способность, по всему прогону
+и по каждому эндпоинту.
+"""
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .request_suite import SuiteContext, iter_suite_requests
+
+
+def percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """
+    Перцентиль с линейной интерполяцией между соседними значениями.
+
+    Args:
+        values: Отсортированные по возрастанию значения
+        p: Перцентиль от 0 до 100
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * p / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return values[lower]
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(values: Sequence[float], digits: int = 2) -> dict:
+    """mean, p50, p95, p99 и max для набора значений"""
+    values = sorted(values)
+    if not values:
+        return {'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    return {
+        'mean': round(sum(values) / len(values), digits),
+        'p50': round(percentile(values, 50), digits),
+        'p95': round(percentile(values, 95), digits),
+        'p99': round(percentile(values, 99), digits),
+        'max': round(values[-1], digits),
+    }
+
+
+@dataclass
+class Sample:
+    index: int
+    status: int
+    seconds: float
+    queries: int
+
+
+class _QueryCounter:
+    """execute_wrapper, считающий SQL-запросы соединения"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _execute(client, path, counter):
+    before = counter.count
+    started = time.perf_counter()
+    response = client.get(path)
+    status = response.status_code
+    if response.streaming:
+        # Потоковый ответ (ZIP) формируется при чтении - читаем его целиком
+        try:
+            for _ in response.streaming_content:
+                pass
+        except Exception:
+            status = 500
+    return status, time.perf_counter() - started, counter.count - before
+
+
+def run_benchmark(context: SuiteContext, requests: int = 1000, warmup: int = 50, seed: int = 1,
+                  concurrency: int = 1, host: str = 'localhost', suite=None) -> dict:
+    """
+    Выполняет взвешенную смесь запросов и возвращает отчет.
+
+    Args:
+        context: Пользователи и объекты для подстановки (build_suite_context)
+        requests: Число замеряемых запросов
+        warmup: Число запросов прогрева (не попадают в отчет)
+        seed: Seed выбора запросов - при одинаковых данных и seed смесь одна и та же
+        concurrency: Число потоков
+        host: Значение заголовка Host (должно входить в ALLOWED_HOSTS)
+        suite: Набор запросов (по умолчанию REQUEST_SUITE)
+
+    Returns:
+        Словарь с итогами прогона и по эндпоинтам
+    """
+    entries = list(iter_suite_requests(context, suite))
+    if not entries:
+        raise ValueError('Нет запросов, которые можно выполнить на текущих данных')
+
+    rng = random.Random(seed)
+    weights = [entry[0].weight for entry in entries]
+    plan = rng.choices(range(len(entries)), weights, k=warmup + requests)
+
+    samples: List[Sample] = []
+    lock = threading.Lock()
+
+    def worker(chunk):
+        counter = _QueryCounter()
+        clients = {}
+        local = []
+        try:
+            with connection.execute_wrapper(counter):
+                for position, index in chunk:
+                    suite_request, user, path = entries[index]
+                    client = clients.get(suite_request.role)
+                    if client is None:
+                        client = clients[suite_request.role] = APIClient(SERVER_NAME=host)
+                        client.raise_request_exception = False
+                        if user is not None:
+                            client.force_authenticate(user=user)
+                    status, seconds, queries = _execute(client, path, counter)
+                    if position >= warmup:
+                        local.append(Sample(index, status, seconds, queries))
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+        with lock:
+            samples.extend(local)
+
+    chunks = [list(enumerate(plan))[offset::concurrency] for offset in range(concurrency)]
+    started_at = timezone.now()
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker(chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, chunks))
+    elapsed = time.perf_counter() - started
+
+    # Время прогрева не учитываем в пропускной способности пропорционально его доле
+    measured_time = elapsed * requests / (warmup + requests)
+    endpoints = []
+    for index, (suite_request, _, path) in enumerate(entries):
+        own = [sample for sample in samples if sample.index == index]
+        if not own:
+            continue
+        endpoints.append({
+            'role': suite_request.role,
+            'path': suite_request.path,
+            'url': path,
+            'weight': suite_request.weight,
+            'requests': len(own),
+            'errors': sum(1 for sample in own if sample.status >= 400),
+            'latency_ms': summarize([sample.seconds * 1000 for sample in own]),
+            'queries': summarize([sample.queries for sample in own], digits=1),
+        })
+
+    return {
+        'started_at': started_at.isoformat(),
+        'vendor': connection.vendor,
+        'seed': seed,
+        'concurrency': concurrency,
+        'requests': len(samples),
+        'warmup': warmup,
+        'duration_seconds': round(measured_time, 3),
+        'throughput_rps': round(len(samples) / measured_time, 1) if measured_time else None,
+        'errors': sum(1 for sample in samples if sample.status >= 400),
+        'latency_ms': summarize([sample.seconds * 1000 for sample in samples]),
+        'queries_per_request': summarize([sample.queries for sample in samples], digits=1),
+        'endpoints': sorted(endpoints, key=lambda item: -(item['latency_ms']['p95'] or 0)),
+    }
+
+
+def compare_reports(baseline: dict, current: dict) -> List[dict]:
+    """Изменение p95 и числа запросов по эндпоинтам относительно прошлого прогона"""
+    previous = {(item['role'], item['path']): item for item in baseline.get('endpoints', [])}
+    rows = []
+    for item in current['endpoints']:
+        before = previous.get((item['role'], item['path']))
+        if before is None:
+            continue
+        old_p95, new_p95 = before['latency_ms']['p95'], item['latency_ms']['p95']
+        rows.append({
+            'role': item['role'],
+            'path': item['path'],
+            'p95_before': old_p95,
+            'p95_after': new_p95,
+            'p95_change_pct': round((new_p95 - old_p95) / old_p95 * 100, 1) if old_p95 else None,
+            'queries_before': before['queries']['mean'],
+            'queries_after': item['queries']['mean'],
+        })
+    return rows
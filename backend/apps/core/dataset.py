@@ -0,0 +1,340 @@
+"""
+Генератор синтетических данных для нагрузочного тестирования.
+
+Создает пользователей по классам и городам, курсы с разделами и блоками,
+подписки, ответы на ДЗ с историей проверок, новости с тегами и альбомы с
+фотографиями. Все записи создаются через bulk_create, поэтому сигналы не
+отправляются; поисковый индекс перестраивается в конце отдельно.
+
+Результат воспроизводим: при одинаковых размерах и seed генерируются одни
+и те же данные (кроме дат создания и ID).
+"""
+
+import random
+from dataclasses import asdict, dataclass, fields
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.courses.models import (
+    ContentElement,
+    Course,
+    HomeworkReviewHistory,
+    HomeworkSubmission,
+    Section,
+    Subscription,
+)
+from apps.core.rendering import render_blocks
+from apps.courses.subscriptions import reconcile_subscribers_count
+from apps.gallery.models import Album, Photo
+from apps.news.models import News, Tag
+from apps.news.tagging import refresh_tag_counts
+from apps.users.models import User
+
+EMAIL_DOMAIN = 'dataset.local'
+DEFAULT_PASSWORD = 'dataset-password'
+
+CITIES = [
+    ('Россия', 'Москва', 30), ('Россия', 'Санкт-Петербург', 15), ('Россия', 'Казань', 8),
+    ('Россия', 'Новосибирск', 6), ('Россия', 'Екатеринбург', 6), ('Россия', 'Нижний Новгород', 4),
+    ('Беларусь', 'Минск', 3), ('Казахстан', 'Алматы', 3), ('Россия', '', 5),
+]
+FIRST_NAMES = ['Александр', 'Мария', 'Иван', 'Анна', 'Дмитрий', 'Екатерина', 'Сергей', 'Ольга',
+               'Михаил', 'Дарья', 'Никита', 'Полина', 'Артем', 'Софья', 'Егор', 'Виктория']
+LAST_NAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов',
+              'Михайлов', 'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев']
+SUBJECTS = ['Ботаника', 'Алгебра', 'Геометрия', 'Физика', 'Химия', 'История', 'Литература',
+            'Информатика', 'Биология', 'География', 'Английский язык', 'Астрономия']
+TOPICS = ['введение', 'основные понятия', 'практикум', 'задачи повышенной сложности',
+          'лабораторная работа', 'повторение', 'итоговый проект', 'олимпиадные задачи']
+WORDS = ['растения', 'клетка', 'уравнение', 'функция', 'энергия', 'реакция', 'эпоха',
+         'алгоритм', 'программа', 'материк', 'климат', 'звезда', 'орбита', 'молекула',
+         'теорема', 'доказательство', 'эксперимент', 'наблюдение', 'вывод', 'гипотеза']
+TAGS = [('События', 'events'), ('Образование', 'education'), ('Объявления', 'announcements'),
+        ('Новости курса', 'course-news'), ('Достижения', 'achievements'), ('Расписание', 'schedule'),
+        ('Олимпиады', 'olympiads'), ('Лагерь', 'camp'), ('Экскурсии', 'excursions'), ('Спорт', 'sport')]
+
+
+@dataclass
+class DatasetSizes:
+    """Размеры генерируемого набора данных"""
+    students: int = 2000
+    teachers: int = 40
+    admins: int = 3
+    courses: int = 120
+    sections_per_course: int = 8
+    elements_per_section: int = 6
+    subscriptions_per_student: int = 4
+    # Доля ДЗ подписанных курсов, на которые студент отправил ответ
+    submission_rate: float = 0.6
+    news: int = 300
+    albums: int = 40
+    photos_per_album: int = 60
+
+    def scaled(self, factor: float) -> 'DatasetSizes':
+        """Размеры, умноженные на factor (доли и значения "на объект" не меняются)"""
+        values = asdict(self)
+        for name in ('students', 'teachers', 'courses', 'news', 'albums'):
+            values[name] = max(1, round(values[name] * factor))
+        return DatasetSizes(**values)
+
+
+SIZE_FIELDS = [field.name for field in fields(DatasetSizes)]
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _html(rng, paragraphs):
+    return ''.join(f'<p>{_text(rng, rng.randint(20, 60))}</p>' for _ in range(paragraphs))
+
+
+class DatasetGenerator:
+    """
+    Создает набор данных заданного размера.
+
+    Args:
+        sizes: Размеры набора
+        seed: Начальное значение генератора случайных чисел
+        prefix: Префикс email пользователей (чтобы несколько наборов
+            могли сосуществовать в одной БД)
+        batch_size: Размер пачки bulk_create
+    """
+
+    def __init__(self, sizes: DatasetSizes, seed: int = 1, prefix: str = 'load', batch_size: int = 1000):
+        self.sizes = sizes
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.now = timezone.now()
+        self.counts = {}
+
+    def _bulk(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        label = model._meta.label
+        self.counts[label] = self.counts.get(label, 0) + len(created)
+        return created
+
+    def existing_users(self) -> int:
+        return User.objects.filter(email__startswith=f'{self.prefix}.', email__endswith=f'@{EMAIL_DOMAIN}').count()
+
+    @transaction.atomic
+    def generate(self) -> dict:
+        """Создает все данные в одной транзакции и возвращает число записей по моделям"""
+        students, teachers, admins = self._users()
+        courses = self._courses(teachers)
+        elements = self._content(courses)
+        subscriptions = self._subscriptions(students, courses)
+        self._submissions(subscriptions, elements, teachers)
+        self._news()
+        self._albums(admins)
+        return self.counts
+
+    def _users(self):
+        password = make_password(DEFAULT_PASSWORD)
+        grades = list(range(1, 12))
+        grade_weights = [1, 1, 2, 3, 5, 6, 8, 9, 10, 10, 9]
+        city_weights = [weight for _, _, weight in CITIES]
+
+        def user(kind, index, role, grade=None):
+            country, city, _ = self.rng.choices(CITIES, city_weights)[0]
+            return User(
+                email=f'{self.prefix}.{kind}{index}@{EMAIL_DOMAIN}',
+                password=password,
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                role=role,
+                grade=grade,
+                country=country,
+                city=city,
+            )
+
+        sizes = self.sizes
+        users = self._bulk(User, [
+            user('student', index, User.Role.USER, self.rng.choices(grades, grade_weights)[0])
+            for index in range(sizes.students)
+        ] + [
+            user('teacher', index, User.Role.TEACHER) for index in range(sizes.teachers)
+        ] + [
+            user('admin', index, User.Role.ADMIN) for index in range(sizes.admins)
+        ])
+        students = users[:sizes.students]
+        teachers = users[sizes.students:sizes.students + sizes.teachers]
+        admins = users[sizes.students + sizes.teachers:]
+        return students, teachers, admins
+
+    def _courses(self, teachers):
+        courses = []
+        for index in range(self.sizes.courses):
+            subject = self.rng.choice(SUBJECTS)
+            courses.append(Course(
+                title=f'{subject}: {self.rng.choice(TOPICS)} ({index + 1})',
+                short_description=_text(self.rng, 15),
+                description=_html(self.rng, 3),
+                creator=self.rng.choice(teachers),
+                # Каждый десятый курс - черновик
+                is_published=self.rng.random() > 0.1,
+            ))
+        return self._bulk(Course, courses)
+
+    def _element(self, section, order):
+        rng = self.rng
+        content_type = rng.choices(
+            ['text', 'video', 'image', 'link', 'homework'], [5, 2, 1, 1, 1]
+        )[0]
+        element = ContentElement(
+            section=section, content_type=content_type, order=order,
+            title=f'{rng.choice(TOPICS).capitalize()} {order + 1}',
+            is_published=rng.random() > 0.05,
+        )
+        if content_type == 'text':
+            element.data = {'version': 1, 'type': 'text', 'html': _html(rng, rng.randint(2, 6))}
+        elif content_type == 'video':
+            video_id = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789_-') for _ in range(11))
+            element.data = {'version': 1, 'type': 'video', 'url': f'https://youtu.be/{video_id}',
+                            'provider': 'youtube', 'video_id': video_id, 'title': _text(rng, 4)}
+        elif content_type == 'image':
+            element.data = {'version': 1, 'type': 'image', 'url': f'/media/courses/content/{order}.jpg',
+                            'caption': _text(rng, 5), 'alt': _text(rng, 3)}
+        elif content_type == 'link':
+            element.data = {'version': 1, 'type': 'link', 'url': 'https://example.com/materials',
+                            'text': _text(rng, 3)}
+        else:
+            deadline = self.now + timedelta(days=rng.randint(-30, 60))
+            element.data = {'version': 1, 'type': 'homework', 'description': _text(rng, 30),
+                            'deadline': deadline.isoformat()}
+        element.render_html()
+        return element
+
+    def _content(self, courses):
+        sections = []
+        for course in courses:
+            for order in range(self.sizes.sections_per_course):
+                # Часть разделов открывается по расписанию
+                publish_datetime = None
+                if self.rng.random() < 0.2:
+                    publish_datetime = self.now + timedelta(days=self.rng.randint(-20, 40))
+                sections.append(Section(
+                    course=course, title=f'Раздел {order + 1}. {self.rng.choice(TOPICS)}',
+                    order=order, is_published=self.rng.random() > 0.05,
+                    publish_datetime=publish_datetime,
+                ))
+        sections = self._bulk(Section, sections)
+
+        elements = self._bulk(ContentElement, [
+            self._element(section, order)
+            for section in sections
+            for order in range(self.sizes.elements_per_section)
+        ])
+
+        course_by_section = {section.id: section.course_id for section in sections}
+        homework = {}
+        for element in elements:
+            if element.content_type == 'homework':
+                homework.setdefault(course_by_section[element.section_id], []).append(element)
+        return homework
+
+    def _subscriptions(self, students, courses):
+        published = [course for course in courses if course.is_published] or courses
+        # Популярность курсов распределена неравномерно
+        weights = [1 / (rank + 1) for rank in range(len(published))]
+        subscriptions = []
+        for student in students:
+            count = min(len(published), self.rng.randint(0, self.sizes.subscriptions_per_student * 2))
+            chosen = set()
+            while len(chosen) < count:
+                chosen.add(self.rng.choices(published, weights)[0].id)
+            subscriptions.extend(Subscription(user=student, course_id=course_id) for course_id in chosen)
+        subscriptions = self._bulk(Subscription, subscriptions)
+        # Подписки созданы через bulk_create - сигналы счетчика подписчиков не сработали
+        reconcile_subscribers_count([course.id for course in courses])
+        return subscriptions
+
+    def _submissions(self, subscriptions, homework, teachers):
+        statuses = HomeworkSubmission.Status
+        submissions = []
+        for subscription in subscriptions:
+            for element in homework.get(subscription.course_id, []):
+                if self.rng.random() >= self.sizes.submission_rate:
+                    continue
+                status = self.rng.choices(
+                    [statuses.SUBMITTED, statuses.REVIEWED, statuses.REVISION_REQUESTED], [3, 6, 1]
+                )[0]
+                submissions.append(HomeworkSubmission(
+                    element=element, user_id=subscription.user_id,
+                    file=f'courses/homework/{element.id}_{subscription.user_id}.pdf',
+                    comment=_text(self.rng, 8), status=status,
+                    grade=self.rng.randint(40, 100) if status == statuses.REVIEWED else None,
+                    teacher_comment=_text(self.rng, 10) if status != statuses.SUBMITTED else '',
+                    reviewed_at=self.now if status != statuses.SUBMITTED else None,
+                ))
+        submissions = self._bulk(HomeworkSubmission, submissions)
+
+        history = []
+        for submission in submissions:
+            if submission.status == statuses.SUBMITTED:
+                continue
+            for _ in range(self.rng.randint(1, 2)):
+                history.append(HomeworkReviewHistory(
+                    submission=submission, reviewer=self.rng.choice(teachers),
+                    grade=submission.grade, teacher_comment=submission.teacher_comment,
+                ))
+        self._bulk(HomeworkReviewHistory, history)
+
+    def _news(self):
+        existing = dict(Tag.objects.values_list('slug', 'id'))
+        self._bulk(Tag, [Tag(name=name, slug=slug) for name, slug in TAGS if slug not in existing])
+        tags = list(Tag.objects.filter(slug__in=[slug for _, slug in TAGS]))
+
+        news = []
+        for index in range(self.sizes.news):
+            is_published = self.rng.random() > 0.15
+            published_at = self.now - timedelta(days=self.rng.randint(0, 365)) if is_published else None
+            blocks = [{'type': 'text', 'data': {'html': _html(self.rng, 2)}}]
+            if self.rng.random() < 0.3:
+                blocks.append({'type': 'gallery', 'data': {'images': [
+                    {'url': f'/media/news/images/{index}_{photo}.jpg', 'caption': _text(self.rng, 4)}
+                    for photo in range(self.rng.randint(2, 8))
+                ]}})
+            news.append(News(
+                title=f'{self.rng.choice(SUBJECTS)}: {_text(self.rng, 5)}',
+                short_description=_text(self.rng, 20),
+                content_blocks=blocks,
+                rendered_html=render_blocks(blocks),
+                is_published=is_published,
+                published_at=published_at,
+            ))
+        news = self._bulk(News, news)
+
+        Through = News.tags.through
+        self._bulk(Through, [
+            Through(news=item, tag=tag)
+            for item in news
+            for tag in self.rng.sample(tags, self.rng.randint(1, 3))
+        ])
+        # Связи созданы через bulk_create - сигналы счетчиков тегов не сработали
+        refresh_tag_counts()
+
+    def _albums(self, admins):
+        albums = [
+            Album(title=f'Альбом {index + 1}: {self.rng.choice(TOPICS)}', description=_text(self.rng, 12),
+                  creator=self.rng.choice(admins) if admins else None,
+                  is_published=self.rng.random() > 0.1)
+            for index in range(self.sizes.albums)
+        ]
+        # bulk_create не вызывает Album.save(), который проставляет дату публикации
+        for album in albums:
+            album.published_at = self.now if album.is_published else None
+        albums = self._bulk(Album, albums)
+        photos = []
+        for album in albums:
+            count = self.rng.randint(self.sizes.photos_per_album // 2, self.sizes.photos_per_album * 3 // 2)
+            photos.extend(
+                Photo(album=album, image=f'gallery/photos/{album.id}_{order}.jpg',
+                      title=_text(self.rng, 3) if self.rng.random() < 0.3 else '', order=order)
+                for order in range(count)
+            )
+        self._bulk(Photo, photos)
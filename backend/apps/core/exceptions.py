@@ -18,8 +18,10 @@ def custom_exception_handler(exc, context):
             # Извлекаем информацию об ошибке
             error_message = str(exc)
 
-            # Определяем, какое поле вызвало ошибку
-            if 'email' in error_message.lower() or 'unique constraint' in error_message.lower():
+            # Определяем, какое поле вызвало ошибку. Про email сообщаем, только
+            # если нарушено ограничение на email: любая другая уникальность
+            # (например, повторная подписка на курс) - общее сообщение
+            if 'email' in error_message.lower():
                 data = {
                     'email': ['Пользователь с таким email уже зарегистрирован.']
                 }
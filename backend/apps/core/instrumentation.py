@@ -0,0 +1,269 @@
+"""
+Постоянно включенный сбор метрик запросов.
+
+RequestMetricsMiddleware для каждого запроса записывает имя view, метод,
+статус, общее время, число и время SQL-запросов (connection.execute_wrapper),
+время сериализации DRF и размер ответа. Записи хранятся в кольцевом буфере
+в памяти процесса (последние REQUEST_METRICS_BUFFER_SIZE запросов);
+перцентили считаются только при чтении метрик, поэтому накладные расходы
+на запрос - несколько вызовов perf_counter и одна вставка в deque.
+
+Метрики отдаются эндпоинтами /api/core/metrics/ (JSON) и
+/api/core/metrics/prometheus/ (текстовый формат Prometheus). Каждый процесс
+(воркер gunicorn) хранит свои метрики.
+"""
+
+import hmac
+import threading
+import time
+from collections import deque, namedtuple
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+from rest_framework import serializers
+
+from .benchmark import summarize
+
+RequestRecord = namedtuple('RequestRecord', [
+    'view', 'method', 'status', 'duration', 'db_queries', 'db_time', 'serializer_time', 'size', 'timestamp'
+])
+
+# Метрики текущего запроса (для учета времени сериализации)
+_current = ContextVar('request_metrics', default=None)
+
+
+def _buffer_size() -> int:
+    return getattr(settings, 'REQUEST_METRICS_BUFFER_SIZE', 5000)
+
+
+class MetricsStore:
+    """
+    Кольцевой буфер последних запросов и накопительные счетчики по view.
+
+    Счетчики (число запросов, ошибок, суммарное время) только растут - это
+    нужно для counter-метрик Prometheus. Перцентили считаются по буферу.
+    """
+
+    def __init__(self, size=None):
+        self.records = deque(maxlen=size or _buffer_size())
+        self.totals = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, record: RequestRecord):
+        with self._lock:
+            self.records.append(record)
+            totals = self.totals.get(record.view)
+            if totals is None:
+                totals = self.totals[record.view] = [0, 0, 0.0, 0, 0.0]
+            totals[0] += 1
+            if record.status >= 500:
+                totals[1] += 1
+            totals[2] += record.duration
+            totals[3] += record.db_queries
+            totals[4] += record.db_time
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.totals = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Копия буфера и счетчиков для расчета метрик"""
+        with self._lock:
+            return list(self.records), {view: list(values) for view, values in self.totals.items()}
+
+    def summary(self) -> dict:
+        """Перцентили по view для записей в буфере и накопительные счетчики"""
+        records, totals = self.snapshot()
+        by_view = {}
+        for record in records:
+            by_view.setdefault(record.view, []).append(record)
+
+        views = []
+        for view, items in by_view.items():
+            count, errors, duration, db_queries, db_time = totals.get(view, [0, 0, 0.0, 0, 0.0])
+            views.append({
+                'view': view,
+                'requests': len(items),
+                'errors': sum(1 for item in items if item.status >= 500),
+                'duration_ms': summarize([item.duration * 1000 for item in items]),
+                'db_queries': summarize([item.db_queries for item in items], digits=1),
+                'db_time_ms': summarize([item.db_time * 1000 for item in items]),
+                'serializer_time_ms': summarize([item.serializer_time * 1000 for item in items]),
+                'response_bytes': summarize([item.size for item in items], digits=0),
+                'total_requests': count,
+                'total_errors': errors,
+            })
+        views.sort(key=lambda item: -(item['duration_ms']['p95'] or 0))
+
+        return {
+            'buffer_size': self.records.maxlen,
+            'buffered': len(records),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'duration_ms': summarize([record.duration * 1000 for record in records]),
+            'db_queries': summarize([record.db_queries for record in records], digits=1),
+            'views': views,
+        }
+
+
+store = MetricsStore()
+
+
+class _RequestMetrics:
+    __slots__ = ('db_queries', 'db_time', 'serializer_time', 'serializer_depth')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+
+def _timed_data(prop):
+    """
+    Оборачивает свойство .data сериализатора замером времени.
+
+    Учитывается только внешний вызов: вложенные сериализаторы, которые
+    вызывают .data внутри (например, SubscriptionSerializer.get_course),
+    не считаются повторно.
+    """
+    getter = prop.fget
+
+    def data(self):
+        metrics = _current.get()
+        if metrics is None or metrics.serializer_depth:
+            return getter(self)
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return getter(self)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializer_depth -= 1
+
+    data._request_metrics = True
+    return property(data)
+
+
+def install_serializer_timing():
+    """Подключает замер времени к Serializer.data и ListSerializer.data (один раз)"""
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        prop = cls.__dict__['data']
+        if not getattr(prop.fget, '_request_metrics', False):
+            cls.data = _timed_data(prop)
+
+
+def view_label(request) -> str:
+    """Имя маршрута (course-list, global-stats) или шаблон пути для безымянных"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+
+def debug_header_allowed(request, meta_key: str, token_setting: str) -> bool:
+    """
+    Разрешен ли отладочный заголовок запроса (X-Query-Trace, X-Profile).
+
+    В DEBUG подходит любое непустое значение, иначе - только значение из
+    настройки token_setting (пустая настройка запрещает заголовок).
+    """
+    value = request.META.get(meta_key)
+    if not value:
+        return False
+    if settings.DEBUG:
+        return True
+    token = getattr(settings, token_setting, '')
+    return bool(token) and hmac.compare_digest(value, token)
+
+
+class RequestMetricsMiddleware:
+    """Собирает метрики каждого запроса в store (см. описание модуля)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+        if self.enabled:
+            install_serializer_timing()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        metrics = _RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - started
+
+        size = 0 if response.streaming else len(response.content)
+        store.add(RequestRecord(
+            view_label(request), request.method, response.status_code, duration,
+            metrics.db_queries, metrics.db_time, metrics.serializer_time, size, time.time()
+        ))
+        return response
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(summary: dict, totals: dict) -> str:
+    """
+    Метрики в текстовом формате Prometheus (version 0.0.4).
+
+    Квантили считаются по кольцевому буферу, счетчики - с запуска процесса.
+    """
+    lines = [
+        '# HELP portal_http_requests_total Число обработанных запросов',
+        '# TYPE portal_http_requests_total counter',
+    ]
+    for view, (count, _, _, _, _) in sorted(totals.items()):
+        lines.append(f'portal_http_requests_total{{view="{_escape_label(view)}"}} {count}')
+
+    lines += [
+        '# HELP portal_http_errors_total Число ответов 5xx',
+        '# TYPE portal_http_errors_total counter',
+    ]
+    for view, (_, errors, _, _, _) in sorted(totals.items()):
+        lines.append(f'portal_http_errors_total{{view="{_escape_label(view)}"}} {errors}')
+
+    lines += [
+        '# HELP portal_db_queries_total Число SQL-запросов',
+        '# TYPE portal_db_queries_total counter',
+    ]
+    for view, (_, _, _, queries, _) in sorted(totals.items()):
+        lines.append(f'portal_db_queries_total{{view="{_escape_label(view)}"}} {queries}')
+
+    for name, key, help_text in (
+        ('portal_http_request_duration_seconds', 'duration_ms', 'Время обработки запроса'),
+        ('portal_db_time_seconds', 'db_time_ms', 'Время SQL-запросов за запрос'),
+        ('portal_serializer_time_seconds', 'serializer_time_ms', 'Время сериализации за запрос'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} summary']
+        for item in summary['views']:
+            label = _escape_label(item['view'])
+            for quantile, field in (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99')):
+                value = item[key][field]
+                lines.append(f'{name}{{view="{label}",quantile="{quantile}"}} {value / 1000:.6f}')
+            total = totals.get(item['view'])
+            if key == 'duration_ms' and total:
+                lines.append(f'{name}_sum{{view="{label}"}} {total[2]:.6f}')
+                lines.append(f'{name}_count{{view="{label}"}} {total[0]}')
+
+    return '\n'.join(lines) + '\n'
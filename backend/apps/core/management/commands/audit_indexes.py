@@ -0,0 +1,132 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.core.query_analysis import SEQ_SCAN, TEMP_SORT, explain_query, fingerprint_sql, is_select
+from apps.core.request_suite import build_suite_context, iter_suite_requests
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет типовой набор запросов к API, получает планы (EXPLAIN) всех '
+        'SQL-запросов и выводит таблицы, которые просматриваются полностью'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help='ID курса для запросов (по умолчанию подбирается)')
+        parser.add_argument('--min-rows', type=int, default=0,
+                            help='Не сообщать о таблицах, в которых меньше строк')
+        parser.add_argument('--show-sorts', action='store_true',
+                            help='Показывать также сортировки без индекса')
+        parser.add_argument('--json', action='store_true', help='Вывести отчет в JSON')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Завершиться с ошибкой, если найдены полные просмотры')
+
+    def handle(self, *args, **options):
+        context = build_suite_context(options['course'])
+        host = next((host for host in settings.ALLOWED_HOSTS if host and host != '*'), 'localhost').lstrip('.')
+
+        queries = {}
+        statuses = []
+        issues = defaultdict(lambda: {'queries': set(), 'paths': set()})
+
+        # Все изменения (last_login, кэш и т.п.) и SET LOCAL откатываются
+        try:
+            with transaction.atomic():
+                for suite_request, user, path in iter_suite_requests(context):
+                    client = APIClient(SERVER_NAME=host)
+                    client.raise_request_exception = False
+                    if user is not None:
+                        client.force_authenticate(user=user)
+
+                    with CaptureQueriesContext(connection) as captured:
+                        response = client.get(path)
+                    statuses.append((suite_request.role, path, response.status_code))
+
+                    for query in captured.captured_queries:
+                        sql = query['sql']
+                        if not is_select(sql):
+                            continue
+                        entry = queries.setdefault(fingerprint_sql(sql), {'sql': sql, 'paths': set()})
+                        entry['paths'].add(path)
+
+                for fingerprint, entry in queries.items():
+                    _, found = explain_query(connection, entry['sql'])
+                    for issue in found:
+                        if issue.kind == TEMP_SORT and not options['show_sorts']:
+                            continue
+                        report = issues[(issue.kind, issue.table)]
+                        report['queries'].add(fingerprint)
+                        report['paths'].update(entry['paths'])
+
+                row_counts = self._row_counts({table for kind, table in issues if kind == SEQ_SCAN})
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        report = []
+        for (kind, table), data in sorted(issues.items(), key=lambda item: -len(item[1]['queries'])):
+            rows = row_counts.get(table)
+            if kind == SEQ_SCAN and rows is not None and rows < options['min_rows']:
+                continue
+            report.append({
+                'kind': kind,
+                'table': table,
+                'rows': rows,
+                'queries': sorted(data['queries']),
+                'paths': sorted(data['paths']),
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'vendor': connection.vendor,
+                'requests': [
+                    {'role': role, 'path': path, 'status': status} for role, path, status in statuses
+                ],
+                'distinct_queries': len(queries),
+                'issues': report,
+            }, ensure_ascii=False, indent=2))
+        else:
+            self._print_report(statuses, queries, report)
+
+        if options['fail_on_scan'] and any(item['kind'] == SEQ_SCAN for item in report):
+            raise CommandError('Найдены полные просмотры таблиц')
+
+    def _row_counts(self, tables):
+        counts = {}
+        with connection.cursor() as cursor:
+            for table in tables:
+                if table in connection.introspection.table_names(cursor):
+                    cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                    counts[table] = cursor.fetchone()[0]
+        return counts
+
+    def _print_report(self, statuses, queries, report):
+        failed = [(role, path, status) for role, path, status in statuses if status >= 400]
+        self.stdout.write(f'Запросов к API: {len(statuses)}, уникальных SQL: {len(queries)}')
+        for role, path, status in failed:
+            self.stdout.write(self.style.WARNING(f'  {status} {role} {path}'))
+
+        if not report:
+            self.stdout.write(self.style.SUCCESS('Полных просмотров таблиц не найдено'))
+            return
+
+        for item in report:
+            title = 'Полный просмотр' if item['kind'] == SEQ_SCAN else 'Сортировка без индекса'
+            rows = f', строк: {item["rows"]}' if item['rows'] is not None else ''
+            self.stdout.write(self.style.WARNING(
+                f'\n{title}: {item["table"] or "-"} (запросов: {len(item["queries"])}{rows})'
+            ))
+            for path in item['paths']:
+                self.stdout.write(f'  {path}')
+            for sql in item['queries'][:3]:
+                self.stdout.write(f'    {sql[:300]}')
@@ -0,0 +1,74 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.dataset import DEFAULT_PASSWORD, EMAIL_DOMAIN, SIZE_FIELDS, DatasetGenerator, DatasetSizes
+from apps.search.indexing import REGISTRY, index_objects
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетический набор данных для нагрузочного тестирования: '
+        'пользователей, курсы с содержимым, подписки, ответы на ДЗ, новости и альбомы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Множитель числа пользователей, курсов, новостей и альбомов')
+        parser.add_argument('--seed', type=int, default=1, help='Seed генератора случайных чисел')
+        parser.add_argument('--prefix', default='load',
+                            help=f'Префикс email пользователей (<prefix>.student1@{EMAIL_DOMAIN})')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--no-index', action='store_true', help='Не перестраивать поисковый индекс')
+        parser.add_argument('--json', action='store_true', help='Вывести итог в JSON')
+
+        defaults = DatasetSizes()
+        for name in SIZE_FIELDS:
+            default = getattr(defaults, name)
+            parser.add_argument(
+                f'--{name.replace("_", "-")}', dest=name, type=type(default), default=None,
+                help=f'По умолчанию {default} (с учетом --scale)'
+            )
+
+    def handle(self, *args, **options):
+        sizes = DatasetSizes().scaled(options['scale'])
+        for name in SIZE_FIELDS:
+            if options[name] is not None:
+                setattr(sizes, name, options[name])
+
+        generator = DatasetGenerator(
+            sizes, seed=options['seed'], prefix=options['prefix'], batch_size=options['batch_size']
+        )
+        if generator.existing_users():
+            raise CommandError(
+                f'Пользователи с префиксом "{options["prefix"]}" уже есть. Укажите другой --prefix'
+            )
+
+        started = time.perf_counter()
+        counts = generator.generate()
+        generated = time.perf_counter() - started
+
+        indexed = 0.0
+        if not options['no_index']:
+            started = time.perf_counter()
+            for entity in REGISTRY:
+                index_objects(entity)
+            indexed = time.perf_counter() - started
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'sizes': sizes.__dict__,
+                'seed': options['seed'],
+                'counts': counts,
+                'generate_seconds': round(generated, 2),
+                'index_seconds': round(indexed, 2),
+            }, ensure_ascii=False, indent=2))
+            return
+
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {generated:.1f} с (индексация {indexed:.1f} с). '
+            f'Пароль пользователей: {DEFAULT_PASSWORD}'
+        ))
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.core.publishing import apply_publications, next_publication_at
+from apps.news.tagging import refresh_tag_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Планировщик отложенных публикаций новостей и альбомов: спит до ближайшего '
+        'published_at и в этот момент пересчитывает счетчики тегов и сбрасывает кэши'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Один раз сверить счетчики тегов и выйти (запуск из cron)'
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Наибольшая пауза, секунды: за это время замечаются новые отложенные публикации'
+        )
+
+    def handle(self, *args, **options):
+        if options['max_sleep'] <= 0:
+            raise CommandError('--max-sleep должен быть положительным')
+
+        # Сверка при запуске: публикации, наступившие, пока планировщик не работал
+        refresh_tag_counts()
+        if options['once']:
+            self.stdout.write(self.style.SUCCESS('Счетчики тегов сверены'))
+            return
+
+        since = timezone.now()
+        self.stdout.write(f'Планировщик запущен в {since:%Y-%m-%d %H:%M:%S}')
+        try:
+            while True:
+                close_old_connections()
+                now = timezone.now()
+                published = apply_publications(since, now)
+                since = now
+                if published['news'] or published['albums']:
+                    self.stdout.write(
+                        f'{now:%Y-%m-%d %H:%M:%S}: опубликовано новостей {published["news"]}, '
+                        f'альбомов {published["albums"]}'
+                    )
+
+                next_at = next_publication_at(now)
+                delay = options['max_sleep']
+                if next_at is not None:
+                    delay = min(delay, (next_at - timezone.now()).total_seconds())
+                time.sleep(max(delay, 0))
+        except KeyboardInterrupt:
+            self.stdout.write('Планировщик остановлен')
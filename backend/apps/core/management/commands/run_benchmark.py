@@ -0,0 +1,97 @@
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.benchmark import compare_reports, run_benchmark
+from apps.core.request_suite import build_suite_context
+
+# Таблицы, размер которых записывается в отчет для сравнения прогонов
+DATASET_MODELS = [
+    'users.User', 'courses.Course', 'courses.Section', 'courses.ContentElement',
+    'courses.Subscription', 'courses.HomeworkSubmission', 'news.News', 'gallery.Album', 'gallery.Photo',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон: взвешенная смесь запросов к API от имени разных ролей. '
+        'Выводит перцентили задержки, число SQL-запросов и пропускную способность'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Число замеряемых запросов')
+        parser.add_argument('--warmup', type=int, default=50, help='Число запросов прогрева')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--concurrency', type=int, default=1, help='Число потоков')
+        parser.add_argument('--course', type=int, help='ID курса для запросов (по умолчанию подбирается)')
+        parser.add_argument('--output', help='Записать отчет в JSON-файл')
+        parser.add_argument('--compare', help='JSON-отчет прошлого прогона для сравнения')
+        parser.add_argument('--json', action='store_true', help='Вывести отчет в JSON')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--requests и --concurrency должны быть положительными')
+
+        host = next((host for host in settings.ALLOWED_HOSTS if host and host != '*'), 'localhost').lstrip('.')
+        context = build_suite_context(options['course'])
+        try:
+            report = run_benchmark(
+                context,
+                requests=options['requests'],
+                warmup=options['warmup'],
+                seed=options['seed'],
+                concurrency=options['concurrency'],
+                host=host,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        report['dataset'] = {
+            label: apps.get_model(label).objects.count() for label in DATASET_MODELS
+        }
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as baseline_file:
+                report['comparison'] = compare_reports(json.load(baseline_file), report)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            self._print_report(report)
+
+    def _print_report(self, report):
+        latency = report['latency_ms']
+        self.stdout.write(
+            f'Запросов: {report["requests"]} (ошибок: {report["errors"]}), '
+            f'{report["throughput_rps"]} запр/с, потоков: {report["concurrency"]}'
+        )
+        self.stdout.write(
+            f'Задержка, мс: p50 {latency["p50"]}  p95 {latency["p95"]}  p99 {latency["p99"]}  '
+            f'max {latency["max"]}'
+        )
+        self.stdout.write(f'SQL-запросов на запрос: {report["queries_per_request"]["mean"]}\n')
+
+        self.stdout.write(f'{"p50":>8} {"p95":>8} {"p99":>8} {"SQL":>6} {"n":>5}  эндпоинт')
+        for item in report['endpoints']:
+            line = (
+                f'{item["latency_ms"]["p50"]:>8} {item["latency_ms"]["p95"]:>8} '
+                f'{item["latency_ms"]["p99"]:>8} {item["queries"]["mean"]:>6} {item["requests"]:>5}  '
+                f'{item["role"]} {item["url"]}'
+            )
+            self.stdout.write(self.style.ERROR(line) if item['errors'] else line)
+
+        for row in report.get('comparison', []):
+            change = row['p95_change_pct']
+            if change is None:
+                continue
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+            self.stdout.write(style(
+                f'{change:+.1f}% p95 ({row["p95_before"]} -> {row["p95_after"]} мс), '
+                f'SQL {row["queries_before"]} -> {row["queries_after"]}: {row["role"]} {row["path"]}'
+            ))
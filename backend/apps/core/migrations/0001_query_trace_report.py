@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryTraceReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='View')),
+                ('method', models.CharField(max_length=10, verbose_name='Метод')),
+                ('path', models.CharField(max_length=500, verbose_name='Путь')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Статус ответа')),
+                ('trigger', models.CharField(choices=[('sample', 'Выборка'), ('header', 'Заголовок X-Query-Trace')], max_length=10, verbose_name='Причина трассировки')),
+                ('duration_ms', models.FloatField(verbose_name='Время обработки, мс')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Число SQL-запросов')),
+                ('query_time_ms', models.FloatField(verbose_name='Время SQL-запросов, мс')),
+                ('repeated_count', models.PositiveIntegerField(default=0, verbose_name='Повторяющихся запросов')),
+                ('slow_count', models.PositiveIntegerField(default=0, verbose_name='Медленных запросов')),
+                ('queries', models.JSONField(default=list, verbose_name='Запросы')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Трассировка запросов',
+                'verbose_name_plural': 'Трассировки запросов',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
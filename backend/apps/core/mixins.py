@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+# Наибольший ID (BIGINT): большие числа SQLite не принимает в параметрах запроса
+MAX_ID = 2 ** 63 - 1
+# Наибольший порядок: поле order - PositiveIntegerField (INTEGER)
+MAX_ORDER = 2 ** 31 - 1
+
+
+class BulkReorderMixin:
+    """
+    Добавляет во ViewSet действие reorder для массового изменения порядка.
+
+    Все объекты загружаются одним запросом (in_bulk), права проверяются
+    на всём наборе сразу, запись выполняется одним bulk_update.
+
+    Атрибуты:
+        reorder_model: Модель с полем order
+        reorder_owner_field: Путь к ID владельца (например, 'section__course__creator_id').
+            Если None - права проверяются только permission-классами ViewSet
+        reorder_success_message: Текст статуса в ответе
+    """
+    reorder_model = None
+    reorder_owner_field = None
+    reorder_success_message = 'Порядок обновлен'
+
+    @action(detail=False, methods=['post'])
+    def reorder(self, request):
+        """
+        Массово обновляет порядок объектов.
+
+        Ожидаемый формат:
+        {
+            "items": [
+                {"id": 1, "order": 0},
+                {"id": 2, "order": 1}
+            ]
+        }
+
+        Returns:
+            {"status": "...", "updated": 2}
+        """
+        items = request.data.get('items', [])
+
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Поле "items" должно быть списком'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not items:
+            return Response(
+                {'error': 'Список элементов не может быть пустым'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        orders = {}
+        for item in items:
+            if not isinstance(item, dict) or 'id' not in item or 'order' not in item:
+                return Response(
+                    {'error': 'Каждый элемент должен содержать поля "id" и "order"'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                object_id = int(item['id'])
+                new_order = int(item['order'])
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'Поля "id" и "order" должны быть целыми числами'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not 0 < object_id <= MAX_ID:
+                return Response(
+                    {'error': f'Поле "id" должно быть от 1 до {MAX_ID}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if new_order < 0:
+                return Response(
+                    {'error': 'Поле "order" не может быть отрицательным'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if new_order > MAX_ORDER:
+                return Response(
+                    {'error': f'Поле "order" не может быть больше {MAX_ORDER}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            orders[object_id] = new_order
+
+        queryset = self.reorder_model.objects.only('id', 'order')
+        if self.reorder_owner_field:
+            queryset = queryset.annotate(reorder_owner_id=F(self.reorder_owner_field))
+
+        with transaction.atomic():
+            objects = queryset.in_bulk(list(orders))
+
+            missing = [object_id for object_id in orders if object_id not in objects]
+            if missing:
+                return Response(
+                    {'error': f'Элемент с id={missing[0]} не найден'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            if self.reorder_owner_field and not request.user.is_admin:
+                forbidden = [
+                    obj.id for obj in objects.values()
+                    if obj.reorder_owner_id != request.user.id
+                ]
+                if forbidden:
+                    return Response(
+                        {'error': f'Нет прав для изменения элемента {forbidden[0]}'},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+
+            for object_id, new_order in orders.items():
+                objects[object_id].order = new_order
+            self.reorder_model.objects.bulk_update(objects.values(), ['order'])
+
+        return Response({
+            'status': self.reorder_success_message,
+            'updated': len(objects)
+        })
@@ -1 +1,36 @@
 from django.db import models
+
+
+class QueryTraceReport(models.Model):
+    """
+    Отчет трассировки SQL-запросов одного HTTP-запроса (apps.core.query_tracing).
+
+    queries - группы запросов по fingerprint: число, время, пример SQL,
+    места вызова в коде проекта и отметки repeated (N+1) и slow.
+    """
+    class Trigger(models.TextChoices):
+        SAMPLE = 'sample', 'Выборка'
+        HEADER = 'header', 'Заголовок X-Query-Trace'
+
+    view = models.CharField('View', max_length=200, blank=True)
+    method = models.CharField('Метод', max_length=10)
+    path = models.CharField('Путь', max_length=500)
+    status_code = models.PositiveSmallIntegerField('Статус ответа')
+    trigger = models.CharField('Причина трассировки', max_length=10, choices=Trigger.choices)
+
+    duration_ms = models.FloatField('Время обработки, мс')
+    query_count = models.PositiveIntegerField('Число SQL-запросов')
+    query_time_ms = models.FloatField('Время SQL-запросов, мс')
+    repeated_count = models.PositiveIntegerField('Повторяющихся запросов', default=0)
+    slow_count = models.PositiveIntegerField('Медленных запросов', default=0)
+    queries = models.JSONField('Запросы', default=list)
+
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Трассировка запросов'
+        verbose_name_plural = 'Трассировки запросов'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.query_count} SQL)'
@@ -0,0 +1,174 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Постраничная навигация с опциональным режимом курсора (keyset).
+
+    По умолчанию работает как PageNumberPagination. Режим курсора включается
+    параметром ?pagination=cursor (или наличием ?cursor=): страница выбирается
+    условием WHERE по ключу сортировки последней записи вместо OFFSET, а
+    COUNT(*) не выполняется. Поэтому любая страница стоит столько же, сколько
+    первая, если ключ сортировки покрыт индексом.
+
+    Формат ответа тот же: {count, next, previous, results}, count = null.
+
+    Ключ сортировки задается атрибутом cursor_ordering у view или у пагинатора,
+    например ('-created_at',). Для однозначности к ключу добавляется pk.
+    Поля ключа не должны содержать NULL. Параметр ?ordering= в режиме
+    курсора не применяется.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    cursor_mode_value = 'cursor'
+    cursor_ordering = None
+    # Только режим курсора, без номеров страниц
+    cursor_only = False
+    # Адрес, к которому добавляется курсор в ссылках (по умолчанию - адрес запроса)
+    base_url = None
+
+    invalid_cursor_message = 'Неверный курсор'
+
+    def __init__(self, cursor_ordering=None):
+        if cursor_ordering is not None:
+            self.cursor_ordering = cursor_ordering
+        self.cursor_mode = False
+
+    def _get_keys(self, view):
+        ordering = getattr(view, 'cursor_ordering', None) or self.cursor_ordering
+        if not ordering:
+            return None
+        keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        if keys[-1][0] not in ('pk', 'id'):
+            keys.append(('pk', keys[-1][1]))
+        return keys
+
+    def _is_cursor_requested(self, request):
+        return (
+            self.cursor_only
+            or request.query_params.get(self.mode_query_param) == self.cursor_mode_value
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        keys = self._get_keys(view)
+        self.cursor_mode = keys is not None and self._is_cursor_requested(request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.keys = keys
+        page_size = self.get_page_size(request)
+        position, reverse = self._decode_cursor(request, queryset)
+
+        if position is not None:
+            queryset = queryset.filter(self._position_filter(position, reverse))
+        queryset = queryset.order_by(*self._order_by(reverse))
+
+        items = list(queryset[:page_size + 1])
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page_items = items
+        return items
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': None,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not (self.has_next and self.page_items):
+            return None
+        return self._link(self.page_items[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not (self.has_previous and self.page_items):
+            return None
+        return self._link(self.page_items[0], reverse=True)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count']['nullable'] = True
+        return response_schema
+
+    def _order_by(self, reverse):
+        return [
+            ('-' if descending != reverse else '') + name
+            for name, descending in self.keys
+        ]
+
+    def _position_filter(self, position, reverse):
+        """
+        Условие "после позиции" для составного ключа:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        conditions = []
+        equal = Q()
+        for (name, descending), value in zip(self.keys, position):
+            lookup = 'lt' if descending != reverse else 'gt'
+            conditions.append(equal & Q(**{f'{name}__{lookup}': value}))
+            equal &= Q(**{name: value})
+        return reduce(or_, conditions)
+
+    def _key_field(self, queryset, name):
+        if name == 'pk':
+            return queryset.model._meta.pk
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def _decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            values = payload['v']
+            if len(values) != len(self.keys):
+                raise ValueError
+            position = [
+                self._key_field(queryset, name).to_python(value)
+                for (name, _), value in zip(self.keys, values)
+            ]
+            if any(value is None for value in position):
+                raise ValueError
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _link(self, item, reverse):
+        values = []
+        for name, _ in self.keys:
+            value = getattr(item, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'), default=str)
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+        url = remove_query_param(self.base_url or self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
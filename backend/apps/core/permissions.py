@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -6,3 +9,14 @@ class IsTeacherOrAdmin(permissions.BasePermission):
 
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_teacher
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """Доступ по токену сборщика метрик (заголовок Authorization: Bearer <REQUEST_METRICS_TOKEN>)."""
+
+    def has_permission(self, request, view):
+        token = getattr(settings, 'REQUEST_METRICS_TOKEN', '')
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not token or not header.startswith('Bearer '):
+            return False
+        return hmac.compare_digest(header[len('Bearer '):].strip(), token)
@@ -0,0 +1,161 @@
+"""
+Семплирующий профилировщик запросов.
+
+ProfilerMiddleware профилирует долю запросов (PROFILER_SAMPLE_RATE) или
+запросы с заголовком X-Profile. Пока запрос обрабатывается, фоновый поток
+каждые PROFILER_INTERVAL_MS снимает стек потока запроса через
+sys._current_frames() - сам запрос не замедляется трассировкой каждого вызова.
+Стеки агрегируются по view в формате collapsed stacks
+("модуль:функция;модуль:функция N"), который принимают flamegraph.pl,
+speedscope и inferno.
+
+Профили хранятся в памяти процесса и отдаются эндпоинтом /api/core/profiles/.
+Время ожидания (SQL, файлы) тоже попадает в стеки - это wall-clock профиль.
+"""
+
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .instrumentation import debug_header_allowed, view_label
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+# Стеки сверх лимита на view учитываются одной строкой
+OTHER_STACK = '[прочие стеки]'
+
+
+def _interval() -> float:
+    return getattr(settings, 'PROFILER_INTERVAL_MS', 5) / 1000
+
+
+def collapse_stack(frame, stop_code=None) -> str:
+    """
+    Стек от корня к листу в виде "модуль:функция;...".
+
+    Кадры выше stop_code (middleware и обработчик WSGI) отбрасываются.
+    """
+    names = []
+    while frame is not None and frame.f_code is not stop_code:
+        code = frame.f_code
+        names.append(f'{frame.f_globals.get("__name__", "?")}:{code.co_name}')
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+class _RequestProfile:
+    __slots__ = ('stacks', 'stop_code')
+
+    def __init__(self, stop_code):
+        self.stacks = Counter()
+        self.stop_code = stop_code
+
+
+class Sampler:
+    """Фоновый поток, снимающий стеки профилируемых потоков"""
+
+    def __init__(self):
+        self.active = {}
+        self.thread = None
+        self._lock = threading.Lock()
+
+    def start(self, thread_id, profile):
+        with self._lock:
+            self.active[thread_id] = profile
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self.thread.start()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self.active.pop(thread_id, None)
+
+    def _run(self):
+        interval = _interval()
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                if not self.active:
+                    # Поток завершается, новый запустит следующий start()
+                    self.thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, profile in self.active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        profile.stacks[collapse_stack(frame, profile.stop_code)] += 1
+
+
+class ProfileStore:
+    """Агрегированные стеки по view с момента запуска процесса или сброса"""
+
+    def __init__(self):
+        self.views = {}
+        self._lock = threading.Lock()
+
+    def add(self, view: str, stacks: Counter):
+        limit = getattr(settings, 'PROFILER_MAX_STACKS', 2000)
+        with self._lock:
+            data = self.views.get(view)
+            if data is None:
+                data = self.views[view] = {'requests': 0, 'samples': 0, 'stacks': Counter()}
+            data['requests'] += 1
+            data['samples'] += sum(stacks.values())
+            for stack, count in stacks.items():
+                if stack in data['stacks'] or len(data['stacks']) < limit:
+                    data['stacks'][stack] += count
+                else:
+                    data['stacks'][OTHER_STACK] += count
+
+    def clear(self):
+        with self._lock:
+            self.views = {}
+
+    def summary(self) -> list:
+        with self._lock:
+            rows = [
+                {'view': view, 'requests': data['requests'], 'samples': data['samples'],
+                 'stacks': len(data['stacks'])}
+                for view, data in self.views.items()
+            ]
+        return sorted(rows, key=lambda row: -row['samples'])
+
+    def collapsed(self, view: str):
+        """Строки collapsed stacks для view или None, если профилей нет"""
+        with self._lock:
+            data = self.views.get(view)
+            if data is None:
+                return None
+            stacks = sorted(data['stacks'].items(), key=lambda item: -item[1])
+        return '\n'.join(f'{stack} {count}' for stack, count in stacks) + '\n'
+
+
+sampler = Sampler()
+store = ProfileStore()
+
+
+class ProfilerMiddleware:
+    """Профилирует выбранные запросы (см. описание модуля)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+        sampled = sample_rate and random.random() < sample_rate
+        if not sampled and not debug_header_allowed(request, PROFILE_HEADER, 'PROFILER_TOKEN'):
+            return self.get_response(request)
+
+        thread_id = threading.get_ident()
+        sampler.start(thread_id, _RequestProfile(sys._getframe().f_code))
+        try:
+            return self.get_response(request)
+        finally:
+            profile = sampler.stop(thread_id)
+            if profile is not None:
+                store.add(view_label(request), profile.stacks)
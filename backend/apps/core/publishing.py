@@ -0,0 +1,41 @@
+"""
+Отложенные публикации новостей и альбомов.
+
+Новость или альбом с is_published=True и published_at в будущем скрыты из
+публичных списков и поиска самим запросом (условие published_at <= now по
+индексу), поэтому появляются точно в срок без участия планировщика и без
+фильтрации в Python. Планировщик (команда publish_scheduled) в момент
+публикации обновляет то, что зависит от видимости, но хранится отдельно:
+счетчики тегов новостей и кэш облака тегов.
+"""
+
+from apps.gallery.models import Album
+from apps.news.models import News
+from apps.news.tagging import refresh_tag_counts
+
+
+def next_publication_at(now):
+    """Ближайшее время отложенной публикации после now или None"""
+    dates = [
+        model.objects.filter(is_published=True, published_at__gt=now)
+        .order_by('published_at').values_list('published_at', flat=True).first()
+        for model in (News, Album)
+    ]
+    dates = [date for date in dates if date is not None]
+    return min(dates) if dates else None
+
+
+def apply_publications(since, until) -> dict:
+    """
+    Обновляет данные, зависящие от публикаций, наступивших в интервале (since, until].
+
+    Returns:
+        Число ставших видимыми новостей и альбомов
+    """
+    due = {'is_published': True, 'published_at__gt': since, 'published_at__lte': until}
+    news_ids = list(News.objects.filter(**due).values_list('id', flat=True))
+    if news_ids:
+        refresh_tag_counts(
+            News.tags.through.objects.filter(news_id__in=news_ids).values_list('tag_id', flat=True)
+        )
+    return {'news': len(news_ids), 'albums': Album.objects.filter(**due).count()}
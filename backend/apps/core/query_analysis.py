@@ -0,0 +1,111 @@
+"""
+Разбор SQL-запросов: нормализация и планы выполнения.
+
+fingerprint_sql приводит запросы, отличающиеся только значениями
+параметров, к одному виду. explain_query получает план запроса и находит
+в нем полные просмотры таблиц и сортировки без индекса.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import List
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+# Плейсхолдеры DB-API (%s) в SQL из execute_wrapper - как подставленные значения
+_PLACEHOLDER_RE = re.compile(r'(?<!%)%s')
+_IN_LIST_RE = re.compile(r'\bIN \((?:\?,\s*)*\?\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# "table" alias в FROM/JOIN - Django использует псевдонимы вида U0, T3, V1
+_TABLE_ALIAS_RE = re.compile(r'"(\w+)"\s+(?:AS\s+)?([A-Z]\d+)\b')
+
+SEQ_SCAN = 'seq_scan'
+TEMP_SORT = 'temp_sort'
+
+
+@dataclass
+class PlanIssue:
+    kind: str
+    table: str
+    detail: str
+
+
+def fingerprint_sql(sql: str) -> str:
+    """SQL без значений параметров: строки, числа и %s заменены на ?, списки IN свернуты"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def is_select(sql: str) -> bool:
+    return sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+
+def _sqlite_issues(rows, sql) -> List[PlanIssue]:
+    aliases = {alias: table for table, alias in _TABLE_ALIAS_RE.findall(sql)}
+    issues = []
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith('SCAN ') and ' USING ' not in detail and 'VIRTUAL TABLE' not in detail:
+            name = detail.split()[1]
+            if name in ('CONSTANT', 'SUBQUERY'):
+                continue
+            issues.append(PlanIssue(SEQ_SCAN, aliases.get(name, name), detail))
+        elif detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            issues.append(PlanIssue(TEMP_SORT, '', detail))
+    return issues
+
+
+def _postgres_issues(plan) -> List[PlanIssue]:
+    issues = []
+
+    def walk(node):
+        node_type = node.get('Node Type')
+        if node_type == 'Seq Scan':
+            issues.append(PlanIssue(SEQ_SCAN, node.get('Relation Name', ''), json.dumps(node.get('Filter', ''))))
+        elif node_type == 'Sort':
+            issues.append(PlanIssue(TEMP_SORT, '', ', '.join(node.get('Sort Key', []))))
+        for child in node.get('Plans', []):
+            walk(child)
+
+    for entry in plan:
+        walk(entry['Plan'])
+    return issues
+
+
+def explain_query(connection, sql: str):
+    """
+    План запроса и найденные в нем проблемы.
+
+    На PostgreSQL перед EXPLAIN отключается enable_seqscan (SET LOCAL, нужна
+    открытая транзакция): на маленьких таблицах планировщик выбирает полный
+    просмотр даже при наличии индекса, а так Seq Scan в плане означает, что
+    подходящего индекса нет.
+
+    Args:
+        connection: Соединение Django
+        sql: Запрос с подставленными значениями параметров
+
+    Returns:
+        Кортеж (строки плана, список PlanIssue)
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            rows = cursor.fetchall()
+            return [row[-1] for row in rows], _sqlite_issues(rows, sql)
+
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return [json.dumps(plan, ensure_ascii=False)], _postgres_issues(plan)
+
+        cursor.execute('EXPLAIN ' + sql)
+        return [str(row) for row in cursor.fetchall()], []
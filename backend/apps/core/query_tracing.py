@@ -0,0 +1,169 @@
+"""
+Трассировка SQL-запросов внутри HTTP-запроса: N+1 и медленные запросы.
+
+QueryTraceMiddleware включает трассировку для доли запросов
+(QUERY_TRACE_SAMPLE_RATE) или по заголовку X-Query-Trace. Запросы
+группируются по fingerprint_sql; для каждого запоминается кадр кода проекта
+(apps/...), из которого он был выполнен, - например,
+apps/courses/serializers.py:446 get_my_submission. Повторяющиеся запросы
+(QUERY_TRACE_REPEAT_THRESHOLD и больше одинаковых) и медленные
+(дольше QUERY_TRACE_SLOW_MS) помечаются, отчет сохраняется в QueryTraceReport.
+"""
+
+import logging
+import os
+import random
+import sys
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from . import instrumentation
+from .query_analysis import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = 'HTTP_X_QUERY_TRACE'
+
+# Пример SQL в отчете обрезается до этой длины
+MAX_SQL_LENGTH = 2000
+# Число разных мест вызова, сохраняемых для одного fingerprint
+MAX_ORIGINS = 5
+
+_APPS_DIR = os.path.join(str(settings.BASE_DIR), 'apps') + os.sep
+# Модули, оборачивающие выполнение запросов, - не источник запроса
+_SKIPPED_FILES = {__file__, instrumentation.__file__}
+
+
+def _origin() -> str:
+    """Ближайший к запросу кадр кода проекта: путь:строка функция"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APPS_DIR) and filename not in _SKIPPED_FILES:
+            return f'{os.path.relpath(filename, settings.BASE_DIR)}:{frame.f_lineno} {frame.f_code.co_name}'
+        frame = frame.f_back
+    return '<вне кода проекта>'
+
+
+class QueryTracer:
+    """execute_wrapper, группирующий запросы по fingerprint"""
+
+    def __init__(self):
+        self.groups = {}
+        self.total_time = 0.0
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.total_time += duration
+            self.count += 1
+            self._record(sql, duration)
+
+    def _record(self, sql, duration):
+        fingerprint = fingerprint_sql(sql)
+        group = self.groups.get(fingerprint)
+        if group is None:
+            group = self.groups[fingerprint] = {
+                'fingerprint': fingerprint,
+                'sql': sql[:MAX_SQL_LENGTH],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'origins': {},
+            }
+        group['count'] += 1
+        group['total_ms'] += duration * 1000
+        group['max_ms'] = max(group['max_ms'], duration * 1000)
+
+        origin = _origin()
+        origins = group['origins']
+        if origin in origins or len(origins) < MAX_ORIGINS:
+            origins[origin] = origins.get(origin, 0) + 1
+
+    def report(self, repeat_threshold: int, slow_ms: float) -> dict:
+        """Группы запросов (самые затратные первыми) с отметками repeated/slow"""
+        queries = []
+        for group in self.groups.values():
+            queries.append({
+                'fingerprint': group['fingerprint'],
+                'sql': group['sql'],
+                'count': group['count'],
+                'total_ms': round(group['total_ms'], 2),
+                'max_ms': round(group['max_ms'], 2),
+                'repeated': group['count'] >= repeat_threshold,
+                'slow': group['max_ms'] >= slow_ms,
+                'origins': [
+                    {'frame': frame, 'count': count}
+                    for frame, count in sorted(group['origins'].items(), key=lambda item: -item[1])
+                ],
+            })
+        queries.sort(key=lambda item: -item['total_ms'])
+        return {
+            'query_count': self.count,
+            'query_time_ms': round(self.total_time * 1000, 2),
+            'repeated_count': sum(1 for item in queries if item['repeated']),
+            'slow_count': sum(1 for item in queries if item['slow']),
+            'queries': queries,
+        }
+
+
+class QueryTraceMiddleware:
+    """
+    Трассирует SQL-запросы выбранных HTTP-запросов и сохраняет отчеты.
+
+    Отчет по выборке (QUERY_TRACE_SAMPLE_RATE) сохраняется, только если найдены
+    повторяющиеся или медленные запросы; по заголовку - всегда, а его id
+    возвращается в заголовке ответа X-Query-Trace-Id.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        forced = instrumentation.debug_header_allowed(request, TRACE_HEADER, 'QUERY_TRACE_TOKEN')
+        sample_rate = getattr(settings, 'QUERY_TRACE_SAMPLE_RATE', 0.0)
+        if not forced and not (sample_rate and random.random() < sample_rate):
+            return self.get_response(request)
+
+        tracer = QueryTracer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(tracer):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        report = tracer.report(
+            getattr(settings, 'QUERY_TRACE_REPEAT_THRESHOLD', 5),
+            getattr(settings, 'QUERY_TRACE_SLOW_MS', 100),
+        )
+        if forced or report['repeated_count'] or report['slow_count']:
+            trace = self._save(request, response, duration, report, forced)
+            if trace is not None and forced:
+                response['X-Query-Trace-Id'] = str(trace.id)
+        return response
+
+    def _save(self, request, response, duration, report, forced):
+        from .models import QueryTraceReport
+
+        try:
+            return QueryTraceReport.objects.create(
+                view=instrumentation.view_label(request),
+                method=request.method,
+                path=request.get_full_path()[:500],
+                status_code=response.status_code,
+                trigger=QueryTraceReport.Trigger.HEADER if forced else QueryTraceReport.Trigger.SAMPLE,
+                duration_ms=round(duration * 1000, 2),
+                query_count=report['query_count'],
+                query_time_ms=report['query_time_ms'],
+                repeated_count=report['repeated_count'],
+                slow_count=report['slow_count'],
+                queries=report['queries'],
+            )
+        except DatabaseError:
+            logger.exception('Не удалось сохранить отчет трассировки запросов')
+            return None
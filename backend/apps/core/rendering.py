@@ -0,0 +1,302 @@
+"""
+Серверный рендеринг JSON блоков в HTML.
+
+Блоки элементов курса (ContentElement.data) и новостей (News.content_blocks)
+превращаются в HTML-фрагменты при сохранении и хранятся в колонке
+rendered_html, поэтому клиентам и поисковым роботам готовый HTML отдается
+без работы на каждый запрос. Разметка повторяет BlockPreview во фронтенде.
+
+HTML из CKEditor очищается sanitize_html: остаются только разрешенные
+теги и атрибуты, ссылки - только http(s), mailto и относительные.
+"""
+
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import quote, urlsplit
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Разрешенные теги и их атрибуты (разметка CKEditor 5 с настройками проекта)
+ALLOWED_TAGS = {
+    'p': set(), 'br': set(), 'hr': set(), 'span': set(), 'div': set(),
+    'strong': set(), 'b': set(), 'em': set(), 'i': set(), 'u': set(), 's': set(),
+    'sub': set(), 'sup': set(), 'code': set(), 'pre': set(), 'blockquote': set(),
+    'h1': set(), 'h2': set(), 'h3': set(), 'h4': set(), 'h5': set(), 'h6': set(),
+    'ul': set(), 'ol': {'start'}, 'li': set(),
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'figure': set(), 'figcaption': set(),
+    'table': set(), 'thead': set(), 'tbody': set(), 'tr': set(),
+    'th': {'colspan', 'rowspan'}, 'td': {'colspan', 'rowspan'},
+}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Содержимое этих тегов удаляется целиком
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript'}
+URL_ATTRIBUTES = {'href', 'src'}
+SAFE_URL_SCHEMES = {'http', 'https', 'mailto'}
+
+VIDEO_ALLOW = 'accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture'
+DEADLINE_FORMAT = '%d.%m.%Y %H:%M'
+FILE_FORMAT_LABELS = {
+    'pdf': 'PDF', 'doc': 'DOC/DOCX', 'txt': 'TXT', 'zip': 'ZIP/RAR', 'image': 'Изображения', 'video': 'Видео',
+}
+
+
+def safe_url(url) -> str:
+    """URL, если его схема разрешена (или он относительный), иначе пустая строка"""
+    if not isinstance(url, str):
+        return ''
+    url = url.strip()
+    if not url:
+        return ''
+    try:
+        scheme = urlsplit(url).scheme.lower()
+    except ValueError:
+        return ''
+    return url if not scheme or scheme in SAFE_URL_SCHEMES else ''
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []
+        self._drop = 0
+
+    def _attributes(self, tag, attrs):
+        allowed = ALLOWED_TAGS[tag]
+        result = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES:
+                value = safe_url(value)
+                if not value:
+                    continue
+            result.append(f' {name}="{escape(value)}"')
+        if tag == 'a' and any(name == 'target' for name, _ in attrs):
+            result.append(' rel="noopener noreferrer"')
+        return ''.join(result)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop += 1
+            return
+        if self._drop or tag not in ALLOWED_TAGS:
+            return
+        self.parts.append(f'<{tag}{self._attributes(tag, attrs)}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and tag in ALLOWED_TAGS and not self._drop:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop = max(self._drop - 1, 0)
+            return
+        if self._drop or tag not in self.open_tags:
+            return
+        # Закрываем незакрытые вложенные теги, чтобы фрагмент оставался корректным
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.parts.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self._drop:
+            self.parts.append(escape(data, quote=False))
+
+    def result(self) -> str:
+        self.close()
+        self.parts.extend(f'</{tag}>' for tag in reversed(self.open_tags))
+        return ''.join(self.parts)
+
+
+def sanitize_html(html) -> str:
+    """Оставляет в HTML только разрешенные теги, атрибуты и ссылки"""
+    if not html or not isinstance(html, str):
+        return ''
+    sanitizer = _Sanitizer()
+    sanitizer.feed(html)
+    return sanitizer.result()
+
+
+def video_embed_url(data: dict) -> str:
+    """Адрес для iframe по provider и video_id (как getEmbedUrl во фронтенде)"""
+    provider = data.get('provider')
+    video_id = data.get('video_id') or data.get('videoId')
+    if not provider or not video_id or not isinstance(video_id, str):
+        return ''
+    if provider == 'custom':
+        url = safe_url(video_id)
+        return url if url.startswith(('http://', 'https://')) else ''
+
+    video_id = quote(video_id, safe='-_')
+    if provider == 'youtube':
+        return f'https://www.youtube.com/embed/{video_id}'
+    if provider == 'vimeo':
+        return f'https://player.vimeo.com/video/{video_id}'
+    if provider == 'vk':
+        owner_id, _, item_id = video_id.partition('_')
+        return f'https://vk.com/video_ext.php?oid={owner_id}&id={item_id}&hd=2'
+    if provider == 'rutube':
+        private_key = data.get('privateKey')
+        suffix = f'?p={quote(private_key, safe="")}' if isinstance(private_key, str) and private_key else ''
+        return f'https://rutube.ru/play/embed/{video_id}{suffix}'
+    if provider == 'dzen':
+        return f'https://dzen.ru/embed/{video_id}?from_block=partner&from=zen&mute=0&autoplay=0&tv=0'
+    return ''
+
+
+def _text(value) -> str:
+    return escape(value) if isinstance(value, str) else ''
+
+
+def _render_text(data):
+    html = sanitize_html(data.get('html'))
+    return f'<div class="preview-text">{html}</div>' if html else ''
+
+
+def _render_video(data):
+    url = video_embed_url(data)
+    if not url:
+        return ''
+    title = _text(data.get('title'))
+    heading = f'<h4>{title}</h4>' if title else ''
+    return (
+        f'<div class="preview-video">{heading}'
+        f'<iframe src="{escape(url)}" title="{title or "Видео"}" allow="{VIDEO_ALLOW}" '
+        f'allowfullscreen loading="lazy"></iframe></div>'
+    )
+
+
+def _image(url, alt, caption, css_class):
+    url = safe_url(url)
+    if not url:
+        return ''
+    caption = _text(caption)
+    figcaption = f'<figcaption class="caption">{caption}</figcaption>' if caption else ''
+    return (
+        f'<figure class="{css_class}"><img src="{escape(url)}" alt="{_text(alt) or "Изображение"}" '
+        f'loading="lazy">{figcaption}</figure>'
+    )
+
+
+def _render_image(data):
+    return _image(data.get('url'), data.get('alt'), data.get('caption'), 'preview-image')
+
+
+def _render_gallery(data):
+    images = data.get('images')
+    if not isinstance(images, list):
+        return ''
+    items = ''.join(
+        _image(image.get('url'), image.get('alt') or image.get('caption'), image.get('caption'), 'gallery-item')
+        for image in images if isinstance(image, dict)
+    )
+    return f'<div class="preview-gallery">{items}</div>' if items else ''
+
+
+def _render_link(data):
+    url = safe_url(data.get('url'))
+    if not url:
+        return ''
+    text = _text(data.get('text')) or escape(url)
+    if data.get('openInNewTab'):
+        return (
+            f'<div class="preview-link"><a href="{escape(url)}" target="_blank" '
+            f'rel="noopener noreferrer">{text} ↗</a></div>'
+        )
+    return f'<div class="preview-link"><a href="{escape(url)}">{text}</a></div>'
+
+
+def _render_homework(data):
+    description = _text(data.get('description'))
+    if not description:
+        return ''
+    meta = []
+    file_url = safe_url(data.get('task_file_url'))
+    if file_url:
+        file_name = _text(data.get('task_file_name')) or 'Скачать файл задания'
+        meta.append(
+            f'<div class="mb-2"><a href="{escape(file_url)}" target="_blank" rel="noopener noreferrer" '
+            f'class="btn btn-sm btn-outline-primary">{file_name}</a></div>'
+        )
+    deadline = parse_datetime(data['deadline']) if isinstance(data.get('deadline'), str) else None
+    if deadline:
+        if timezone.is_naive(deadline):
+            deadline = timezone.make_aware(deadline)
+        deadline = timezone.localtime(deadline)
+        meta.append(
+            f'<div class="mb-2"><strong>Срок сдачи:</strong> '
+            f'<time datetime="{deadline.isoformat()}">{deadline.strftime(DEADLINE_FORMAT)}</time></div>'
+        )
+    formats = data.get('allowedFormats')
+    if isinstance(formats, list):
+        labels = [FILE_FORMAT_LABELS[value] for value in formats if value in FILE_FORMAT_LABELS]
+        if labels:
+            meta.append(f'<div class="mb-2"><strong>Допустимые форматы:</strong> {", ".join(labels)}</div>')
+    max_size = data.get('maxFileSize')
+    if isinstance(max_size, (int, float)) and not isinstance(max_size, bool):
+        meta.append(f'<div><strong>Макс. размер файла:</strong> {max_size:g} MB</div>')
+    return (
+        f'<div class="preview-homework"><h4>📋 Домашнее задание</h4>'
+        f'<div class="preview-homework-content">{description}</div>'
+        f'<div class="preview-homework-meta">{"".join(meta)}</div></div>'
+    )
+
+
+RENDERERS = {
+    'text': _render_text,
+    'video': _render_video,
+    'image': _render_image,
+    'gallery': _render_gallery,
+    'link': _render_link,
+    'homework': _render_homework,
+}
+
+
+def render_block(block_type: str, data) -> str:
+    """HTML одного блока; для неизвестного типа или пустых данных - пустая строка"""
+    renderer = RENDERERS.get(block_type)
+    if renderer is None or not isinstance(data, dict):
+        return ''
+    return renderer(data)
+
+
+def render_blocks(blocks) -> str:
+    """HTML списка блоков новости ({type, data}), каждый в div.preview-block"""
+    if not isinstance(blocks, list):
+        return ''
+    parts = []
+    for block in blocks:
+        if not isinstance(block, dict):
+            continue
+        html = render_block(block.get('type'), block.get('data'))
+        if html:
+            parts.append(f'<div class="preview-block">{html}</div>')
+    return ''.join(parts)
+
+
+def render_element(element) -> str:
+    """
+    HTML элемента курса.
+
+    Элементы старого формата (без data) рендерятся из отдельных полей:
+    text_content, image, link_url, homework_description.
+    """
+    if element.data:
+        return render_block(element.content_type, element.data)
+
+    legacy = {
+        'text': lambda: {'html': element.text_content},
+        'image': lambda: {'url': element.image.url if element.image else ''},
+        'link': lambda: {'url': element.link_url, 'text': element.link_text},
+        'homework': lambda: {'description': element.homework_description},
+    }.get(element.content_type)
+    return render_block(element.content_type, legacy()) if legacy else ''
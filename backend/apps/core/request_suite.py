@@ -0,0 +1,188 @@
+"""
+Типовой набор запросов к API для аудита индексов и замеров.
+
+Запросы описаны шаблонами путей с подстановками ({course}, {section}, ...)
+и ролью, от имени которой выполняются. Конкретные объекты и пользователи
+подбираются из текущей БД функцией build_suite_context.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from django.utils import timezone
+
+from apps.courses.models import ContentElement, Course, HomeworkSubmission, Subscription
+from apps.gallery.models import Album
+from apps.news.models import News, Tag
+from apps.users.models import User
+
+ANONYMOUS = 'anonymous'
+STUDENT = 'student'
+TEACHER = 'teacher'
+ADMIN = 'admin'
+ROLES = (ANONYMOUS, STUDENT, TEACHER, ADMIN)
+
+
+@dataclass(frozen=True)
+class SuiteRequest:
+    role: str
+    path: str
+    # Относительная частота запроса в нагрузочном сценарии
+    weight: int = 1
+
+
+REQUEST_SUITE = [
+    # Публичные страницы
+    SuiteRequest(ANONYMOUS, '/api/courses/', 10),
+    SuiteRequest(ANONYMOUS, '/api/courses/latest/', 5),
+    SuiteRequest(ANONYMOUS, '/api/courses/{course}/', 8),
+    SuiteRequest(ANONYMOUS, '/api/courses/?search={word}', 2),
+    SuiteRequest(ANONYMOUS, '/api/news/', 6),
+    SuiteRequest(ANONYMOUS, '/api/news/latest/', 5),
+    SuiteRequest(ANONYMOUS, '/api/news/{news}/', 3),
+    SuiteRequest(ANONYMOUS, '/api/news/?tags={tag}', 2),
+    SuiteRequest(ANONYMOUS, '/api/news/tags/', 2),
+    SuiteRequest(ANONYMOUS, '/api/news/tags/cloud/', 3),
+    SuiteRequest(ANONYMOUS, '/api/news/tags/{tag}/', 1),
+    SuiteRequest(ANONYMOUS, '/api/gallery/albums/', 3),
+    SuiteRequest(ANONYMOUS, '/api/gallery/albums/latest/', 3),
+    SuiteRequest(ANONYMOUS, '/api/gallery/albums/{album}/', 2),
+    SuiteRequest(ANONYMOUS, '/api/gallery/albums/{album}/photos/', 1),
+    SuiteRequest(ANONYMOUS, '/api/gallery/photos/?album={album}', 2),
+    SuiteRequest(ANONYMOUS, '/api/gallery/photos/{photo}/', 1),
+    SuiteRequest(ANONYMOUS, '/api/search/?q={word}', 2),
+    SuiteRequest(ANONYMOUS, '/api/search/?q={prefix}&mode=typeahead', 4),
+
+    # Студент
+    SuiteRequest(STUDENT, '/api/courses/my_courses/', 8),
+    SuiteRequest(STUDENT, '/api/courses/{course}/', 6),
+    SuiteRequest(STUDENT, '/api/courses/{course}/schedule/?include_homework=true', 3),
+    SuiteRequest(STUDENT, '/api/sections/?course={course}', 6),
+    SuiteRequest(STUDENT, '/api/sections/{section}/', 6),
+    SuiteRequest(STUDENT, '/api/elements/?section={section}', 4),
+    SuiteRequest(STUDENT, '/api/elements/{element}/', 4),
+    SuiteRequest(STUDENT, '/api/homework/', 4),
+    SuiteRequest(STUDENT, '/api/my-schedule/', 4),
+    SuiteRequest(STUDENT, '/api/users/profile/', 3),
+    SuiteRequest(STUDENT, '/api/auth/user/', 3),
+
+    # Преподаватель
+    SuiteRequest(TEACHER, '/api/courses/created_courses/', 3),
+    SuiteRequest(TEACHER, '/api/courses/drafts/', 1),
+    SuiteRequest(TEACHER, '/api/courses/{course}/subscribers/', 1),
+    SuiteRequest(TEACHER, '/api/courses/{course}/export/', 1),
+    SuiteRequest(TEACHER, '/api/homework/?course={course}', 3),
+    SuiteRequest(TEACHER, '/api/homework/?course={course}&status=submitted', 2),
+    SuiteRequest(TEACHER, '/api/homework/{submission}/', 2),
+    SuiteRequest(TEACHER, '/api/homework/section-stats/?course_id={course}', 2),
+    SuiteRequest(TEACHER, '/api/homework/{submission}/review_history/', 1),
+    SuiteRequest(TEACHER, '/api/homework/download-all/?section={section}', 1),
+    SuiteRequest(TEACHER, '/api/core/stats/courses/', 1),
+    SuiteRequest(TEACHER, '/api/core/stats/courses/{course}/', 1),
+    SuiteRequest(TEACHER, '/api/core/stats/courses/{course}/export/', 1),
+
+    # Администратор
+    SuiteRequest(ADMIN, '/api/users/', 1),
+    SuiteRequest(ADMIN, '/api/users/?role=user', 1),
+    SuiteRequest(ADMIN, '/api/users/{student}/', 1),
+    SuiteRequest(ADMIN, '/api/core/dashboard/', 1),
+    SuiteRequest(ADMIN, '/api/core/users-by-grade/', 1),
+    SuiteRequest(ADMIN, '/api/core/popular-courses/', 1),
+    SuiteRequest(ADMIN, '/api/core/active-users/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/global/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/users/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/users/export/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/top-active-users/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/top-active-users/export/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/top-popular-courses/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/users-by-grade/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/users-by-grade/export/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/users-geography/', 1),
+    SuiteRequest(ADMIN, '/api/core/stats/users-geography/export/', 1),
+    SuiteRequest(ADMIN, '/api/news/?is_published=false', 1),
+]
+
+
+@dataclass
+class SuiteContext:
+    """Пользователи по ролям и ID объектов для подстановки в шаблоны путей"""
+    users: Dict[str, Optional[User]] = field(default_factory=dict)
+    values: Dict[str, object] = field(default_factory=dict)
+
+
+def build_suite_context(course_id: Optional[int] = None) -> SuiteContext:
+    """
+    Подбирает объекты и пользователей для набора запросов.
+
+    Берется опубликованный курс с подписчиками (или course_id), его
+    создатель как преподаватель и первый подписчик как студент.
+    """
+    courses = Course.objects.all()
+    if course_id is not None:
+        course = courses.filter(pk=course_id).first()
+    else:
+        course = (
+            courses.filter(is_published=True, subscriptions__isnull=False).order_by('-id').first()
+            or courses.filter(is_published=True).order_by('-id').first()
+        )
+
+    context = SuiteContext()
+    context.users[ANONYMOUS] = None
+    context.users[ADMIN] = User.objects.filter(role=User.Role.ADMIN).order_by('id').first()
+    context.users[TEACHER] = course.creator if course else None
+    subscription = (
+        Subscription.objects.filter(course=course).select_related('user').order_by('id').first()
+        if course else None
+    )
+    context.users[STUDENT] = subscription.user if subscription else None
+    if subscription is not None:
+        context.values['student'] = subscription.user_id
+
+    if course is not None:
+        context.values['course'] = course.id
+        word = (re.findall(r'\w+', course.title) or ['курс'])[0]
+        context.values['word'] = quote(word)
+        context.values['prefix'] = quote(word[:3])
+        section = course.sections.order_by('order', 'id').first()
+        if section is not None:
+            context.values['section'] = section.id
+        element = ContentElement.objects.filter(section=section).order_by('order', 'id').first()
+        if element is not None:
+            context.values['element'] = element.id
+        submission = HomeworkSubmission.objects.filter(element__section__course=course).order_by('-id').first()
+        if submission is not None:
+            context.values['submission'] = submission.id
+
+    news = News.objects.filter(is_published=True, published_at__lte=timezone.now()).order_by('-id').first()
+    if news is not None:
+        context.values['news'] = news.id
+    tag = Tag.objects.order_by('id').first()
+    if tag is not None:
+        context.values['tag'] = tag.id
+    album = Album.objects.filter(is_published=True, published_at__lte=timezone.now()).order_by('-id').first()
+    if album is not None:
+        context.values['album'] = album.id
+        photo = album.photos.order_by('order', 'id').first()
+        if photo is not None:
+            context.values['photo'] = photo.id
+
+    return context
+
+
+def iter_suite_requests(context: SuiteContext, suite=None) -> Iterator[Tuple[SuiteRequest, Optional[User], str]]:
+    """
+    Запросы набора с подставленными значениями.
+
+    Запросы, для которых в БД нет нужного объекта или пользователя роли,
+    пропускаются.
+    """
+    for request in suite or REQUEST_SUITE:
+        if request.role != ANONYMOUS and context.users.get(request.role) is None:
+            continue
+        try:
+            path = request.path.format(**context.values)
+        except KeyError:
+            continue
+        yield request, context.users.get(request.role), path
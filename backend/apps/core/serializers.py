@@ -78,9 +78,14 @@ class CourseListItemSerializer(serializers.ModelSerializer):
     """Сериализатор для списка курсов в статистике."""
 
     creator_name: str = serializers.CharField(source='creator.full_name', read_only=True)
-    subscribers_count: int = serializers.IntegerField(source='subs_count', read_only=True)
+    subscribers_count: int = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Course
         fields = ['id', 'title', 'creator_name', 'subscribers_count', 'created_at']
         read_only_fields = fields
+
+
+class PublishSerializer(serializers.Serializer):
+    """Параметры публикации новости или альбома: published_at в будущем - отложенная публикация"""
+    published_at = serializers.DateTimeField(required=False, allow_null=True)
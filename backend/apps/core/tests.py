@@ -5,14 +5,30 @@
     python manage.py test apps.core
 """
 
-from django.test import TestCase
-from django.urls import reverse
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, resolve, reverse
+from django.urls.resolvers import URLResolver
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from apps.users.models import User
-from apps.courses.models import Course, Section, ContentElement, HomeworkSubmission, Subscription
+from apps.courses.models import (
+    Course, Section, ContentElement, HomeworkSubmission, HomeworkReviewHistory, Subscription
+)
+from apps.courses.subscriptions import reconcile_subscribers_count
+from apps.core.exceptions import custom_exception_handler
+from apps.core.request_suite import REQUEST_SUITE, build_suite_context, iter_suite_requests
+from apps.gallery.models import Album, Photo
+from apps.news.models import News, Tag
+from apps.search.indexing import index_objects
+from apps.search.models import SearchDocument
 
 
 class GlobalStatsAPITestCase(TestCase):
@@ -300,3 +316,508 @@ class CourseStatsAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
         self.assertIn('attachment', response['Content-Disposition'])
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Тесты режима курсора в постраничной навигации."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User',
+            role=User.Role.ADMIN
+        )
+        User.objects.bulk_create([
+            User(email=f'student{index}@test.com', first_name='Student', last_name=str(index))
+            for index in range(25)
+        ])
+        # Одинаковая дата у части записей проверяет разрешение по pk
+        User.objects.filter(email__startswith='student', id__gt=cls.admin.id + 10).update(
+            created_at=timezone.now()
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def collect(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        pages = 0
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNone(response.data['count'])
+            ids.extend(item['id'] for item in response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return ids, pages, response
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_walks_all_pages_in_page_number_order(self):
+        url = reverse('users-by-role')
+        expected = list(User.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        ids, pages, last = self.collect(url, {'pagination': 'cursor', 'page_size': 10})
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+        # Назад с последней страницы - предыдущая страница
+        previous = self.client.get(last.data['previous'])
+        self.assertEqual([item['id'] for item in previous.data['results']], expected[10:20])
+
+    def test_page_number_mode_unchanged(self):
+        response = self.client.get(reverse('users-by-role'), {'page': 2, 'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 26)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('users-by-role'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AuditIndexesCommandTestCase(TestCase):
+    """Тесты команды аудита индексов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.com', password='testpass123', role=User.Role.ADMIN
+        )
+        cls.teacher = User.objects.create_user(
+            email='teacher@test.com', password='testpass123', role=User.Role.TEACHER
+        )
+        cls.student = User.objects.create_user(email='student@test.com', password='testpass123')
+        cls.course = Course.objects.create(
+            title='Ботаника для начинающих', creator=cls.teacher, is_published=True
+        )
+        section = Section.objects.create(course=cls.course, title='Раздел 1', is_published=True)
+        element = ContentElement.objects.create(
+            section=section, content_type=ContentElement.ContentType.HOMEWORK, title='ДЗ'
+        )
+        Subscription.objects.create(user=cls.student, course=cls.course)
+        HomeworkSubmission.objects.create(user=cls.student, element=element, file='courses/homework/answer.pdf')
+
+    def test_json_report(self):
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('audit_indexes', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertGreater(report['distinct_queries'], 0)
+        paths = [item['path'] for item in report['requests']]
+        self.assertIn(f'/api/courses/{self.course.id}/', paths)
+        self.assertTrue(all(item['status'] < 500 for item in report['requests']))
+        # Команда ничего не меняет в БД
+        self.assertEqual(Course.objects.count(), 1)
+        for issue in report['issues']:
+            self.assertIn(issue['kind'], ('seq_scan', 'temp_sort'))
+
+
+# Бюджет запросов к БД на один вызов эндпоинта (по имени маршрута)
+DEFAULT_QUERY_BUDGET = 4
+QUERY_BUDGETS = {
+    'course-detail': 5,
+    'course-export': 5,
+    'course-schedule': 5,
+    'my-schedule': 5,
+    'global-stats': 5,
+    'dashboard-stats': 6,
+}
+
+# Маршруты, которые не входят в набор запросов
+UNMEASURED_ROUTES = {
+    'api-root',
+    # Служебные эндпоинты метрик и профилей: читают данные в памяти, без запросов к данным
+    'request-metrics',
+    'request-metrics-prometheus',
+    'request-profiles',
+    'request-profile-collapsed',
+}
+
+
+def _api_get_routes(patterns=None):
+    """Имена GET-маршрутов приложений проекта (apps.*)"""
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _api_get_routes(pattern.url_patterns)
+            continue
+        callback = pattern.callback
+        view_class = getattr(callback, 'cls', callback)
+        if not view_class.__module__.startswith('apps.'):
+            continue
+        actions = getattr(callback, 'actions', None)
+        methods = actions.keys() if actions else getattr(view_class, 'http_method_names', [])
+        if 'get' in methods:
+            yield pattern.name
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Число запросов к БД для каждого маршрута набора REQUEST_SUITE.
+
+    Набор выполняется дважды: на небольших данных и после того, как данных
+    стало в несколько раз больше. Число запросов не должно зависеть от
+    объема данных (N+1) и не должно превышать бюджет маршрута.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.com', password='testpass123', role=User.Role.ADMIN
+        )
+        cls.teacher = User.objects.create_user(
+            email='teacher@test.com', password='testpass123', first_name='Анна',
+            last_name='Петрова', role=User.Role.TEACHER
+        )
+        cls.student = User.objects.create_user(
+            email='student@test.com', password='testpass123', grade=9, city='Москва'
+        )
+        cls.course = Course.objects.create(
+            title='Ботаника для начинающих', short_description='Курс',
+            creator=cls.teacher, is_published=True
+        )
+        Subscription.objects.create(user=cls.student, course=cls.course)
+        cls.album = Album.objects.create(title='Выпускной', creator=cls.admin, is_published=True)
+        cls.news = News.objects.create(
+            title='Новость', short_description='Кратко', is_published=True,
+            published_at=timezone.now()
+        )
+        cls.tag = Tag.objects.create(name='Школа', slug='school')
+        cls.news.tags.add(cls.tag)
+
+    def grow(self, count):
+        """Добавляет count записей каждого вида к курсу, альбому, новостям и пользователям"""
+        now = timezone.now()
+        start = User.objects.count()
+        students = User.objects.bulk_create([
+            User(email=f'student{start + index}@test.com', first_name='Ученик',
+                 last_name=str(start + index), grade=5 + index % 6, city='Казань')
+            for index in range(count)
+        ])
+        courses = Course.objects.bulk_create([
+            Course(title=f'Курс {index}', short_description='Курс', creator=self.teacher, is_published=True)
+            for index in range(count)
+        ])
+        Subscription.objects.bulk_create(
+            [Subscription(user=student, course=self.course) for student in students]
+            + [Subscription(user=self.student, course=course) for course in courses]
+        )
+        reconcile_subscribers_count([self.course.id, *(course.id for course in courses)])
+
+        offset = self.course.sections.count()
+        sections = Section.objects.bulk_create([
+            Section(course=self.course, title=f'Раздел {offset + index}', order=offset + index,
+                    is_published=True, publish_datetime=now + timedelta(days=index % 2))
+            for index in range(count)
+        ])
+        first_section = self.course.sections.order_by('order', 'id').first()
+        elements = ContentElement.objects.bulk_create([
+            ContentElement(
+                section=section, content_type=ContentElement.ContentType.HOMEWORK,
+                title=f'ДЗ {index}', order=index, is_published=True,
+                data={'deadline': (now + timedelta(days=7)).isoformat()}
+            )
+            for section in sections + [first_section]
+            for index in range(count)
+        ] + [
+            ContentElement(section=first_section, content_type=ContentElement.ContentType.TEXT,
+                           title=f'Текст {index}', order=count + index, is_published=True)
+            for index in range(count)
+        ])
+        homework = [element for element in elements if element.content_type == 'homework']
+        submissions = HomeworkSubmission.objects.bulk_create([
+            HomeworkSubmission(user=user, element=element, file='courses/homework/answer.pdf')
+            for user in students + [self.student]
+            for element in homework[:count]
+        ])
+        HomeworkReviewHistory.objects.bulk_create([
+            HomeworkReviewHistory(submission=submission, reviewer=self.teacher, grade=90)
+            for submission in submissions
+        ])
+
+        Photo.objects.bulk_create([
+            Photo(album=self.album, image=f'gallery/photos/{index}.jpg', order=index)
+            for index in range(count)
+        ])
+        Album.objects.bulk_create([
+            Album(title=f'Альбом {index}', creator=self.admin, is_published=True)
+            for index in range(count)
+        ])
+        tags = Tag.objects.bulk_create([
+            Tag(name=f'Тег {start + index}', slug=f'tag-{start + index}') for index in range(count)
+        ])
+        news = News.objects.bulk_create([
+            News(title=f'Новость {index}', short_description='Кратко', is_published=True, published_at=now)
+            for index in range(count)
+        ])
+        News.tags.through.objects.bulk_create([
+            News.tags.through(news=item, tag=tag) for item in news + [self.news] for tag in tags
+        ])
+        for entity in SearchDocument.Entity.values:
+            index_objects(entity)
+
+    def measure(self, context):
+        counts = {}
+        for suite_request, user, path in iter_suite_requests(context):
+            # Кэш контекста доступа иначе делает первый запрос дороже остальных
+            cache.clear()
+            client = APIClient()
+            if user is not None:
+                client.force_authenticate(user=user)
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get(path)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, f'{suite_request.role} {path}')
+            counts[(suite_request.role, path)] = len(captured)
+        return counts
+
+    def test_every_api_route_is_measured(self):
+        values = dict.fromkeys(['course', 'section', 'element', 'submission', 'news', 'tag',
+                                'album', 'photo', 'student', 'word', 'prefix'], 1)
+        measured = {
+            resolve(urlsplit(request.path.format(**values)).path).url_name
+            for request in REQUEST_SUITE
+        }
+        missing = set(_api_get_routes()) - measured - UNMEASURED_ROUTES
+        self.assertEqual(missing, set())
+
+    def test_query_count_does_not_grow_with_data(self):
+        self.grow(2)
+        context = build_suite_context(self.course.id)
+        context.values['album'] = self.album.id
+        context.values['photo'] = self.album.photos.first().id
+        context.values['news'] = self.news.id
+        small = self.measure(context)
+
+        self.grow(6)
+        large = self.measure(context)
+
+        self.assertEqual(len(small), len(REQUEST_SUITE))
+        for (role, path), queries in large.items():
+            with self.subTest(role=role, path=path):
+                self.assertEqual(queries, small[(role, path)], 'число запросов растет с объемом данных')
+                name = resolve(urlsplit(path).path).url_name
+                self.assertLessEqual(queries, QUERY_BUDGETS.get(name, DEFAULT_QUERY_BUDGET))
+
+
+class BenchmarkCommandsTestCase(TestCase):
+    """Тесты генератора данных и нагрузочного прогона."""
+
+    def test_generate_dataset_and_run_benchmark(self):
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command(
+            'generate_dataset', '--students', '30', '--teachers', '2', '--courses', '3',
+            '--sections-per-course', '2', '--elements-per-section', '3', '--news', '5',
+            '--albums', '2', '--photos-per-album', '4', '--json', stdout=out
+        )
+        counts = json.loads(out.getvalue())['counts']
+        self.assertEqual(counts['courses.Course'], 3)
+        self.assertEqual(counts['courses.ContentElement'], 18)
+        self.assertEqual(User.objects.filter(role=User.Role.USER).count(), 30)
+
+        out = StringIO()
+        call_command('run_benchmark', '--requests', '60', '--warmup', '5', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['requests'], 60)
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(report['dataset']['courses.Course'], 3)
+        self.assertLessEqual(report['latency_ms']['p50'], report['latency_ms']['p99'])
+
+
+class RequestMetricsTestCase(TestCase):
+    """Тесты middleware метрик запросов и эндпоинтов метрик."""
+
+    def setUp(self):
+        from apps.core.instrumentation import store
+        self.store = store
+        self.store.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com', password='testpass123',
+            first_name='Admin', last_name='User', role=User.Role.ADMIN
+        )
+        self.student = User.objects.create_user(
+            email='student@test.com', password='testpass123',
+            first_name='Student', last_name='User', role=User.Role.USER
+        )
+        Course.objects.create(title='Курс', description='Описание', creator=self.admin, is_published=True)
+
+    def test_records_view_queries_and_serializer_time(self):
+        self.client.get('/api/courses/')
+        self.client.get('/api/courses/')
+
+        records = [record for record in self.store.records if record.view == 'course-list']
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].status, 200)
+        self.assertGreater(records[0].db_queries, 0)
+        self.assertGreater(records[0].serializer_time, 0)
+        self.assertGreater(records[0].size, 0)
+
+    def test_metrics_endpoint_admin_only(self):
+        self.client.get('/api/courses/')
+
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.get('/api/core/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/core/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        views = {item['view']: item for item in response.data['views']}
+        self.assertEqual(views['course-list']['requests'], 1)
+        self.assertIsNotNone(views['course-list']['duration_ms']['p95'])
+
+    def test_prometheus_endpoint_accepts_token(self):
+        self.client.get('/api/courses/')
+
+        with self.settings(REQUEST_METRICS_TOKEN='scrape-secret'):
+            response = self.client.get('/api/core/metrics/prometheus/', HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+            response = self.client.get('/api/core/metrics/prometheus/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('portal_http_requests_total{view="course-list"} 1', body)
+        self.assertIn('portal_http_request_duration_seconds{view="course-list",quantile="0.95"}', body)
+
+
+class QueryTraceTestCase(TestCase):
+    """Тесты трассировки SQL-запросов."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com', password='testpass123',
+            first_name='Teacher', last_name='User', role=User.Role.TEACHER
+        )
+        self.course = Course.objects.create(
+            title='Курс', description='Описание', creator=self.teacher, is_published=True
+        )
+        section = Section.objects.create(course=self.course, title='Раздел', order=1)
+        for order in range(6):
+            ContentElement.objects.create(
+                section=section, content_type=ContentElement.ContentType.HOMEWORK,
+                title=f'ДЗ {order}', order=order
+            )
+
+    def test_groups_repeated_queries_with_origin(self):
+        from apps.core.query_tracing import QueryTracer
+
+        tracer = QueryTracer()
+        with connection.execute_wrapper(tracer):
+            for element in ContentElement.objects.all():
+                element.submissions.filter(user=self.teacher).first()
+        report = tracer.report(repeat_threshold=5, slow_ms=1000)
+
+        self.assertEqual(report['query_count'], 7)
+        self.assertEqual(report['repeated_count'], 1)
+        repeated = next(item for item in report['queries'] if item['repeated'])
+        self.assertEqual(repeated['count'], 6)
+        self.assertIn('courses_homeworksubmission', repeated['fingerprint'])
+        self.assertTrue(repeated['origins'][0]['frame'].startswith('apps/core/tests.py:'))
+        self.assertTrue(repeated['origins'][0]['frame'].endswith('test_groups_repeated_queries_with_origin'))
+
+    def test_in_lists_of_any_length_share_fingerprint(self):
+        """Запросы с __in разной длины из execute_wrapper (плейсхолдеры %s) группируются."""
+        from apps.core.query_analysis import fingerprint_sql
+        from apps.core.query_tracing import QueryTracer
+
+        self.assertEqual(
+            fingerprint_sql('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            fingerprint_sql('SELECT * FROM t WHERE id IN (%s)')
+        )
+        tracer = QueryTracer()
+        ids = list(ContentElement.objects.values_list('id', flat=True))
+        with connection.execute_wrapper(tracer):
+            for size in range(1, 7):
+                list(ContentElement.objects.filter(id__in=ids[:size]))
+        report = tracer.report(repeat_threshold=5, slow_ms=1000)
+        self.assertEqual(report['repeated_count'], 1)
+        self.assertIn('IN (...)', report['queries'][0]['fingerprint'])
+
+    def test_header_saves_report(self):
+        from apps.core.models import QueryTraceReport
+
+        with self.settings(QUERY_TRACE_TOKEN='trace-secret'):
+            self.client.get(f'/api/courses/{self.course.id}/', HTTP_X_QUERY_TRACE='wrong')
+            self.assertFalse(QueryTraceReport.objects.exists())
+
+            response = self.client.get(f'/api/courses/{self.course.id}/', HTTP_X_QUERY_TRACE='trace-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        trace = QueryTraceReport.objects.get(id=response['X-Query-Trace-Id'])
+        self.assertEqual(trace.view, 'course-detail')
+        self.assertEqual(trace.trigger, QueryTraceReport.Trigger.HEADER)
+        self.assertEqual(trace.query_count, sum(item['count'] for item in trace.queries))
+        self.assertEqual(trace.repeated_count, 0)
+
+
+class ProfilerTestCase(TestCase):
+    """Тесты семплирующего профилировщика."""
+
+    def setUp(self):
+        from apps.core.profiling import store
+        self.store = store
+        self.store.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com', password='testpass123',
+            first_name='Admin', last_name='User', role=User.Role.ADMIN
+        )
+
+    def test_collapse_stack_is_root_first(self):
+        import sys
+        from apps.core.profiling import collapse_stack
+
+        def leaf():
+            return collapse_stack(sys._getframe(), stop_code=self.test_collapse_stack_is_root_first.__code__)
+
+        self.assertEqual(leaf(), f'{__name__}:leaf')
+
+    def test_header_profiles_request(self):
+        with self.settings(PROFILER_TOKEN='profile-secret', PROFILER_INTERVAL_MS=1):
+            self.client.get('/api/courses/', HTTP_X_PROFILE='wrong')
+            self.assertEqual(self.store.summary(), [])
+
+            response = self.client.get('/api/courses/', HTTP_X_PROFILE='profile-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.store.summary()[0]['view'], 'course-list')
+        self.assertEqual(self.store.summary()[0]['requests'], 1)
+
+    def test_collapsed_endpoint(self):
+        from collections import Counter
+
+        self.store.add('course-detail', Counter({'a:view;b:serialize': 3, 'a:view': 1}))
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get('/api/core/profiles/course-detail/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content.decode(), 'a:view;b:serialize 3\na:view 1\n')
+        self.assertEqual(self.client.get('/api/core/profiles/news-list/').status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get('/api/core/profiles/')
+        self.assertEqual(response.data[0]['samples'], 4)
+        self.client.delete('/api/core/profiles/')
+        self.assertEqual(self.store.summary(), [])
+
+
+class ExceptionHandlerTestCase(SimpleTestCase):
+    """Тесты для преобразования IntegrityError в ответ API."""
+
+    def test_only_email_violation_reported_as_duplicate_email(self):
+        response = custom_exception_handler(IntegrityError('UNIQUE constraint failed: users_user.email'), {})
+        self.assertIn('email', response.data)
+
+        response = custom_exception_handler(IntegrityError(
+            'UNIQUE constraint failed: courses_subscription.user_id, courses_subscription.course_id'
+        ), {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('email', response.data)
@@ -24,4 +24,10 @@ urlpatterns = [
     path('stats/courses/', views.courses_list_for_stats, name='courses-list-for-stats'),
     path('stats/courses/<int:course_id>/', views.course_stats, name='course-stats'),
     path('stats/courses/<int:course_id>/export/', views.export_course_stats_csv, name='export-course-stats-csv'),
+
+    # Метрики и профили запросов (администраторы; Prometheus - также по токену)
+    path('metrics/', views.request_metrics, name='request-metrics'),
+    path('metrics/prometheus/', views.request_metrics_prometheus, name='request-metrics-prometheus'),
+    path('profiles/', views.request_profiles, name='request-profiles'),
+    path('profiles/<str:view_name>/', views.request_profile_collapsed, name='request-profile-collapsed'),
 ]
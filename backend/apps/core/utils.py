@@ -0,0 +1,75 @@
+import zipfile
+from typing import Iterable, Iterator, Tuple, Union
+
+from django.core.files.storage import default_storage
+
+
+class _ZipStreamBuffer:
+    """
+    Минимальный файловый объект для zipfile без поддержки seek/tell.
+
+    zipfile в этом случае сам пишет data descriptor после каждого файла,
+    поэтому архив можно отдавать клиенту по мере записи.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        """Возвращает накопленные байты и очищает буфер"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries: Iterable[Tuple[str, Union[str, bytes]]], storage=None) -> Iterator[bytes]:
+    """
+    Генерирует ZIP-архив из файлов хранилища по частям, без временных файлов.
+
+    Каждый файл читается из storage чанками и сразу записывается в архив,
+    поэтому расход памяти не зависит от размера архива.
+
+    Args:
+        entries: Пары (имя файла в архиве, путь в хранилище).
+            Вместо пути можно передать bytes - они будут записаны как есть
+        storage: Хранилище файлов (по умолчанию default_storage)
+
+    Yields:
+        Очередные байты архива
+    """
+    storage = storage or default_storage
+    buffer = _ZipStreamBuffer()
+
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for arcname, storage_path in entries:
+            if isinstance(storage_path, bytes):
+                archive.writestr(arcname, storage_path, compress_type=zipfile.ZIP_DEFLATED)
+                yield buffer.pop()
+                continue
+
+            zinfo = zipfile.ZipInfo(arcname)
+            zinfo.compress_type = zipfile.ZIP_STORED
+            # Размер нужен заранее, чтобы zipfile включил ZIP64 для файлов > 4 ГБ.
+            # Отсутствующие в хранилище файлы пропускаем, чтобы не оборвать архив.
+            try:
+                zinfo.file_size = storage.size(storage_path)
+            except OSError:
+                continue
+
+            with storage.open(storage_path, 'rb') as source:
+                with archive.open(zinfo, mode='w') as target:
+                    for chunk in source.chunks():
+                        target.write(chunk)
+                        yield buffer.pop()
+            yield buffer.pop()
+
+    # Центральный каталог записывается при закрытии архива
+    yield buffer.pop()
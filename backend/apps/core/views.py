@@ -7,13 +7,15 @@ from django.http import HttpResponse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 from apps.users.models import User
 from apps.users.permissions import IsAdmin
 from apps.courses.models import Course, HomeworkSubmission, ContentElement
-from .permissions import IsTeacherOrAdmin
+from .instrumentation import prometheus_text, store as metrics_store
+from .profiling import store as profile_store
+from .pagination import KeysetPagination
+from .permissions import HasMetricsToken, IsTeacherOrAdmin
 from .serializers import (
     UserStatsSerializer,
     ActiveUserSerializer,
@@ -24,8 +26,8 @@ from .serializers import (
 )
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    """Стандартная пагинация для списков."""
+class StandardResultsSetPagination(KeysetPagination):
+    """Стандартная пагинация для списков (режим курсора - если задан cursor_ordering)."""
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -289,16 +291,15 @@ def top_popular_courses(request):
     """
     limit = int(request.query_params.get('limit', 10))
 
-    courses = Course.objects.select_related('creator').annotate(
-        subs_count=Count('subscriptions')
-    ).order_by('-subs_count', '-created_at')[:limit]
+    # Порядок по индексу (-subscribers_count, -created_at), без COUNT по подпискам
+    courses = Course.objects.select_related('creator').order_by('-subscribers_count', '-created_at')[:limit]
 
     data = [
         {
             'id': course.id,
             'title': course.title,
             'creator_name': course.creator.full_name,
-            'subscribers_count': course.subs_count,
+            'subscribers_count': course.subscribers_count,
         }
         for course in courses
     ]
@@ -479,6 +480,7 @@ def users_by_role(request):
         - role: фильтр по роли (admin, teacher, user)
         - page: номер страницы
         - page_size: размер страницы
+        - pagination=cursor / cursor: постраничная навигация курсором
     """
     role_filter = request.query_params.get('role')
 
@@ -487,7 +489,7 @@ def users_by_role(request):
     if role_filter and role_filter in dict(User.Role.choices):
         queryset = queryset.filter(role=role_filter)
 
-    paginator = StandardResultsSetPagination()
+    paginator = StandardResultsSetPagination(cursor_ordering=('-created_at',))
     page = paginator.paginate_queryset(queryset, request)
 
     if page is not None:
@@ -555,9 +557,7 @@ def courses_list_for_stats(request):
     else:
         queryset = Course.objects.filter(creator=request.user)
 
-    queryset = queryset.select_related('creator').annotate(
-        subs_count=Count('subscriptions')
-    ).order_by('-created_at')
+    queryset = queryset.select_related('creator').order_by('-created_at')
 
     serializer = CourseListItemSerializer(queryset, many=True)
     return Response(serializer.data)
@@ -587,7 +587,7 @@ def course_stats(request, course_id):
         )
 
     # Количество подписчиков
-    subscribers_count = course.subscriptions.count()
+    subscribers_count = course.subscribers_count
 
     # Получаем все элементы ДЗ в курсе
     homework_elements = ContentElement.objects.filter(
@@ -676,7 +676,7 @@ def export_course_stats_csv(request, course_id):
         )
 
     # Получаем статистику (дублируем логику из course_stats)
-    subscribers_count = course.subscriptions.count()
+    subscribers_count = course.subscribers_count
 
     homework_elements = ContentElement.objects.filter(
         section__course=course,
@@ -749,6 +749,56 @@ def export_course_stats_csv(request, course_id):
     return response
 
 
+# =============================================================================
+# МЕТРИКИ ЗАПРОСОВ (apps.core.instrumentation)
+# =============================================================================
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def request_metrics(request):
+    """
+    Перцентили времени обработки, SQL-запросов и сериализации по view.
+
+    Считаются по последним REQUEST_METRICS_BUFFER_SIZE запросам текущего процесса.
+    """
+    return Response(metrics_store.summary())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin | HasMetricsToken])
+def request_metrics_prometheus(request):
+    """Метрики запросов в текстовом формате Prometheus"""
+    _, totals = metrics_store.snapshot()
+    return HttpResponse(
+        prometheus_text(metrics_store.summary(), totals),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdmin])
+def request_profiles(request):
+    """
+    Профилированные view: число запросов, семплов и разных стеков.
+
+    DELETE сбрасывает накопленные профили.
+    """
+    if request.method == 'DELETE':
+        profile_store.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(profile_store.summary())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def request_profile_collapsed(request, view_name):
+    """Профиль view в формате collapsed stacks (flamegraph.pl, speedscope)"""
+    collapsed = profile_store.collapsed(view_name)
+    if collapsed is None:
+        return Response({'error': 'Профилей для этого view нет'}, status=status.HTTP_404_NOT_FOUND)
+    return HttpResponse(collapsed, content_type='text/plain; charset=utf-8')
+
+
 # =============================================================================
 # LEGACY ENDPOINTS (для обратной совместимости)
 # =============================================================================
@@ -768,16 +818,14 @@ def users_by_grade(request):
 @permission_classes([IsAdmin])
 def popular_courses(request):
     """Статистика по популярным курсам (legacy)"""
-    courses = Course.objects.annotate(
-        subs_count=Count('subscriptions')
-    ).order_by('-subs_count', '-created_at')[:10]
+    courses = Course.objects.select_related('creator').order_by('-subscribers_count', '-created_at')[:10]
 
     data = [
         {
             'id': course.id,
             'title': course.title,
             'creator': course.creator.full_name,
-            'subscribers_count': course.subs_count
+            'subscribers_count': course.subscribers_count
         }
         for course in courses
     ]
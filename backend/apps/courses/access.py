@@ -0,0 +1,90 @@
+"""
+Контекст доступа пользователя к курсам.
+
+Собирает ID курсов, на которые пользователь подписан, и ID курсов, которыми
+он владеет, одним запросом. Результат живет только в пределах запроса (в
+атрибуте request): между запросами его не кэшируем, иначе отписка или смена
+владельца курса доходили бы до других процессов с локальным кэшем только по
+истечении таймаута, и пользователь сохранял бы доступ к закрытому контенту.
+"""
+
+from django.db.models import Value
+
+from .models import Course, Subscription
+
+SUBSCRIBED = 's'
+OWNED = 'o'
+
+
+class CourseAccess:
+    """
+    Множества курсов, доступных пользователю как подписчику и как владельцу.
+
+    Используется permission-классами, фильтрами queryset и сериализаторами
+    вместо отдельных запросов на каждую проверку.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.subscribed_ids = frozenset()
+        self.owned_ids = frozenset()
+
+        if user is not None and user.is_authenticated:
+            self.reload()
+
+    def reload(self):
+        """Загружает подписки и владение одним запросом"""
+        rows = Subscription.objects.filter(user_id=self.user.id).order_by().values_list(
+            'course_id', Value(SUBSCRIBED)
+        ).union(
+            Course.objects.filter(creator_id=self.user.id).order_by().values_list('id', Value(OWNED)),
+            all=True
+        )
+
+        subscribed, owned = set(), set()
+        for course_id, kind in rows:
+            (subscribed if kind == SUBSCRIBED else owned).add(course_id)
+
+        self.subscribed_ids = frozenset(subscribed)
+        self.owned_ids = frozenset(owned)
+
+    def _check(self, ids_attr, course_id) -> bool:
+        if self.user is None or not self.user.is_authenticated or course_id is None:
+            return False
+        try:
+            course_id = int(course_id)
+        except (TypeError, ValueError):
+            return False
+        return course_id in getattr(self, ids_attr)
+
+    def is_subscribed(self, course_id) -> bool:
+        """Подписан ли пользователь на курс"""
+        return self._check('subscribed_ids', course_id)
+
+    def owns(self, course_id) -> bool:
+        """Является ли пользователь создателем курса"""
+        return self._check('owned_ids', course_id)
+
+    def can_read(self, course_id) -> bool:
+        """Подписчик или владелец курса"""
+        return self.owns(course_id) or self.is_subscribed(course_id)
+
+    @property
+    def readable_ids(self) -> frozenset:
+        """ID курсов, где пользователь подписчик или владелец"""
+        return self.subscribed_ids | self.owned_ids
+
+
+def get_course_access(request) -> CourseAccess:
+    """
+    Возвращает контекст доступа для текущего запроса.
+
+    Создается один раз на запрос и сохраняется в request.
+    """
+    access = getattr(request, '_course_access', None)
+    user = getattr(request, 'user', None)
+    if access is None or access.user != user:
+        access = CourseAccess(user)
+        request._course_access = access
+    return access
+
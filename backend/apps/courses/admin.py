@@ -19,12 +19,9 @@ class CourseAdmin(admin.ModelAdmin):
     list_display = ['title', 'creator', 'subscribers_count', 'is_published', 'created_at']
     list_filter = ['is_published', 'creator', 'created_at']
     search_fields = ['title', 'short_description']
+    readonly_fields = ['subscribers_count']
     inlines = [SectionInline]
 
-    def subscribers_count(self, obj):
-        return obj.subscribers.count()
-    subscribers_count.short_description = 'Подписчиков'
-
 
 @admin.register(Section)
 class SectionAdmin(admin.ModelAdmin):
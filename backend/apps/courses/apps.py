@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CoursesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.courses'
+    verbose_name = 'Курсы'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,151 @@
+"""
+Пакетная подписка на курс.
+
+Подписать можно пользователей по фильтру (класс, город, роль) - один
+INSERT ... SELECT на всю выборку - или по CSV-ростеру с email. Ростер
+обрабатывается частями по ROSTER_CHUNK_SIZE адресов: на часть приходится
+один SELECT пользователей по email и один INSERT ... ON CONFLICT DO NOTHING
+(create_subscriptions), так что ростер на пару тысяч строк - это десяток
+запросов. По каждой строке ростера возвращается результат.
+
+Формат ростера: CSV в UTF-8 с разделителем ',' или ';'. Если в первой строке
+есть столбец email, адреса берутся из него, иначе из первого столбца.
+"""
+
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db.models import IntegerField, Value
+
+from apps.users.models import User
+from .subscriptions import create_subscriptions
+
+ROSTER_CHUNK_SIZE = 500
+MAX_ROSTER_ROWS = 10000
+
+
+class RosterError(Exception):
+    """CSV-ростер поврежден или имеет неподдерживаемый формат"""
+
+
+class RowStatus:
+    """Результат строки ростера"""
+    ENROLLED = 'enrolled'
+    ALREADY_SUBSCRIBED = 'already_subscribed'
+    NOT_FOUND = 'not_found'
+    INVALID = 'invalid'
+    DUPLICATE = 'duplicate'
+
+
+def filtered_users(grade=None, city=None, role=None):
+    """Активные пользователи по классу, городу и роли (пустые условия не применяются)"""
+    users = User.objects.filter(is_active=True)
+    if grade is not None:
+        users = users.filter(grade=grade)
+    if city:
+        # Точное совпадение: регистронезависимое сравнение SQLite не работает для кириллицы
+        users = users.filter(city=city.strip())
+    if role:
+        users = users.filter(role=role)
+    return users
+
+
+def enroll_users(course, users) -> list:
+    """
+    Подписывает пользователей из queryset одним запросом.
+
+    Returns:
+        ID подписанных пользователей; уже подписанные пропускаются
+    """
+    created = create_subscriptions(users, 'id', Value(course.id, output_field=IntegerField()))
+    return sorted(user_id for user_id, _ in created)
+
+
+def read_roster(file) -> list:
+    """
+    Читает email из CSV-ростера.
+
+    Args:
+        file: загруженный файл или файл, открытый в двоичном режиме
+
+    Returns:
+        Список (номер строки в файле, email) в порядке файла
+
+    Raises:
+        RosterError: файл не в UTF-8, пуст или слишком длинный
+    """
+    try:
+        text = file.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise RosterError('Ростер должен быть в кодировке UTF-8')
+
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(text), dialect)
+
+    column = None
+    rows = []
+    for cells in reader:
+        if not any(cell.strip() for cell in cells):
+            continue
+        if column is None:
+            # Первая непустая строка - заголовок, если в ней есть столбец email
+            header = [cell.strip().lower() for cell in cells]
+            column = header.index('email') if 'email' in header else 0
+            if 'email' in header:
+                continue
+        rows.append((reader.line_num, cells[column].strip() if column < len(cells) else ''))
+        if len(rows) > MAX_ROSTER_ROWS:
+            raise RosterError(f'В ростере больше {MAX_ROSTER_ROWS} строк')
+
+    if not rows:
+        raise RosterError('Ростер не содержит адресов')
+    return rows
+
+
+def enroll_roster(course, rows) -> list:
+    """
+    Подписывает на курс пользователей из ростера.
+
+    Args:
+        course: курс
+        rows: список (номер строки, email) из read_roster
+
+    Returns:
+        Отчет по строкам: row, email, status (RowStatus), user_id
+    """
+    report = []
+    by_email = {}
+    for line, raw_email in rows:
+        email = User.objects.normalize_email(raw_email)
+        entry = {'row': line, 'email': email, 'status': None, 'user_id': None}
+        report.append(entry)
+        try:
+            validate_email(email)
+        except ValidationError:
+            entry['status'] = RowStatus.INVALID
+            continue
+        if email in by_email:
+            entry['status'] = RowStatus.DUPLICATE
+            continue
+        by_email[email] = entry
+
+    emails = list(by_email)
+    for start in range(0, len(emails), ROSTER_CHUNK_SIZE):
+        chunk = emails[start:start + ROSTER_CHUNK_SIZE]
+        user_ids = dict(User.objects.filter(email__in=chunk, is_active=True).values_list('email', 'id'))
+        enrolled = set(enroll_users(course, User.objects.filter(id__in=user_ids.values())))
+        for email in chunk:
+            entry = by_email[email]
+            entry['user_id'] = user_ids.get(email)
+            if entry['user_id'] is None:
+                entry['status'] = RowStatus.NOT_FOUND
+            elif entry['user_id'] in enrolled:
+                entry['status'] = RowStatus.ENROLLED
+            else:
+                entry['status'] = RowStatus.ALREADY_SUBSCRIBED
+    return report
@@ -0,0 +1,68 @@
+import copy
+import gc
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.serializers import BlockDataValidator
+
+# Примеры блоков всех типов; смесь близка к реальному контенту курсов и новостей
+SAMPLE_BLOCKS = [
+    ('text', {'html': '<p>Текст урока с <strong>выделением</strong> и <a href="/x">ссылкой</a></p>'}),
+    ('video', {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}),
+    ('video', {'url': 'https://vimeo.com/76979871'}),
+    ('video', {'url': 'https://vk.com/video-12345_67890'}),
+    ('video', {'url': 'https://rutube.ru/video/private/abc123/?p=secretkey'}),
+    ('video', {'url': 'https://dzen.ru/video/watch/abc123'}),
+    ('video', {'url': 'https://player.example.com/embed/42'}),
+    ('image', {'url': '/media/courses/images/1.jpg', 'caption': 'Схема'}),
+    ('link', {'url': 'https://example.com/materials', 'text': 'Материалы'}),
+    ('homework', {'description': 'Решить задачи', 'deadline': '2099-01-01T12:00:00+00:00'}),
+    ('gallery', {'images': [
+        {'url': f'/media/news/images/{index}.jpg', 'caption': 'Фото', 'alt': 'Фото'} for index in range(12)
+    ]}),
+]
+# Веса типов блоков в смеси: текст встречается чаще остальных
+SAMPLE_WEIGHTS = [6, 1, 1, 1, 1, 1, 1, 2, 2, 1, 2]
+
+
+class Command(BaseCommand):
+    help = 'Микробенчмарк BlockDataValidator: время валидации большого списка блоков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocks', type=int, default=5000, help='Число блоков в списке')
+        parser.add_argument('--repeat', type=int, default=5, help='Число замеров')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options['blocks'] < 1 or options['repeat'] < 1:
+            raise CommandError('--blocks и --repeat должны быть положительными')
+
+        rng = random.Random(options['seed'])
+        blocks = [
+            {'type': block_type, 'data': data}
+            for block_type, data in rng.choices(SAMPLE_BLOCKS, SAMPLE_WEIGHTS, k=options['blocks'])
+        ]
+
+        timings = []
+        for _ in range(options['repeat']):
+            # Валидатор дополняет data (provider, video_id) - каждый замер на свежей копии
+            batch = copy.deepcopy(blocks)
+            # Как timeit: сборщик мусора не должен срабатывать внутри замера
+            gc.collect()
+            gc.disable()
+            try:
+                started = time.perf_counter()
+                BlockDataValidator.validate_blocks(batch)
+                timings.append(time.perf_counter() - started)
+            finally:
+                gc.enable()
+
+        best = min(timings)
+        self.stdout.write(
+            f'Блоков: {len(blocks)}, замеров: {len(timings)}\n'
+            f'Лучший: {best * 1000:.2f} мс, медиана: {statistics.median(timings) * 1000:.2f} мс, '
+            f'{len(blocks) / best / 1000:.1f} тыс. блоков/с'
+        )
@@ -0,0 +1,69 @@
+"""
+Management command: enroll_course
+
+Подписывает на курс пользователей по CSV-ростеру с email или по фильтру
+(класс, город, роль) - так же, как эндпоинт /api/courses/{id}/enroll/.
+
+Usage:
+    python manage.py enroll_course 42 --roster 7b.csv --report 7b_report.csv
+    python manage.py enroll_course 42 --grade 7 --city Казань
+"""
+
+import csv
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.enrollment import (
+    RosterError, RowStatus, enroll_roster, enroll_users, filtered_users, read_roster
+)
+from apps.courses.models import Course
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Подписывает на курс пользователей по CSV-ростеру или по фильтру класс/город/роль'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', type=int)
+        parser.add_argument('--roster', help='CSV-файл с email (столбец email или первый столбец)')
+        parser.add_argument('--report', help='Куда записать отчет по строкам ростера (CSV)')
+        parser.add_argument('--grade', type=int, choices=range(1, 12))
+        parser.add_argument('--city')
+        parser.add_argument('--role', choices=User.Role.values)
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.get(pk=options['course_id'])
+        except Course.DoesNotExist:
+            raise CommandError(f'Курс {options["course_id"]} не найден')
+
+        filters = {field: options[field] for field in ('grade', 'city', 'role') if options[field] is not None}
+        if bool(options['roster']) == bool(filters):
+            raise CommandError('Укажите либо --roster, либо фильтр --grade/--city/--role')
+
+        if filters:
+            user_ids = enroll_users(course, filtered_users(**filters))
+            self.stdout.write(self.style.SUCCESS(f'Подписано пользователей: {len(user_ids)}'))
+            return
+
+        try:
+            with open(options['roster'], 'rb') as file:
+                rows = read_roster(file)
+        except (RosterError, OSError) as e:
+            raise CommandError(str(e))
+
+        report = enroll_roster(course, rows)
+        for entry in report:
+            if entry['status'] in (RowStatus.INVALID, RowStatus.NOT_FOUND):
+                self.stdout.write(f'Строка {entry["row"]}: {entry["email"] or "-"} - {entry["status"]}')
+        if options['report']:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=['row', 'email', 'status', 'user_id'])
+                writer.writeheader()
+                writer.writerows(report)
+
+        summary = Counter(entry['status'] for entry in report)
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{status}: {count}' for status, count in sorted(summary.items()))
+        ))
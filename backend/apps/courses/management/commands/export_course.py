@@ -0,0 +1,40 @@
+"""
+Management command: export_course
+
+Выгружает курс со всеми разделами, элементами и медиафайлами в ZIP-архив,
+который можно загрузить на другой инсталляции командой import_course.
+
+Usage:
+    python manage.py export_course 42 course_42.zip
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.models import Course
+from apps.courses.transfer import export_course_stream
+
+
+class Command(BaseCommand):
+    help = 'Exports a course with sections, elements and media into a ZIP archive'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('course_id', type=int, help='ID of the course to export.')
+        parser.add_argument('output', help='Path of the archive to write.')
+
+    def handle(self, *args, **options) -> None:
+        try:
+            course = Course.objects.get(pk=options['course_id'])
+        except Course.DoesNotExist:
+            raise CommandError(f'Course {options["course_id"]} does not exist')
+
+        size = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in export_course_stream(course):
+                output.write(chunk)
+                size += len(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Exported "{course.title}" to {options["output"]} ({size / (1024 * 1024):.2f} MB)'
+            )
+        )
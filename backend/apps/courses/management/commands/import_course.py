@@ -0,0 +1,53 @@
+"""
+Management command: import_course
+
+Создает курс-черновик из архива, полученного командой export_course
+или API-эндпоинтом /api/courses/{id}/export/.
+
+Usage:
+    python manage.py import_course course_42.zip --creator teacher@example.com
+    python manage.py import_course course_42.zip --creator teacher@example.com \\
+        --base-url https://portal.example.com
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.transfer import CourseArchiveError, import_course
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Imports a course from a ZIP archive created by export_course'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('archive', help='Path of the course archive.')
+        parser.add_argument(
+            '--creator',
+            required=True,
+            help='Email of the user who will own the imported course.',
+        )
+        parser.add_argument(
+            '--base-url',
+            default=None,
+            help='Absolute prefix for rewritten media URLs (e.g. https://portal.example.com).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            creator = User.objects.get(email=options['creator'])
+        except User.DoesNotExist:
+            raise CommandError(f'User {options["creator"]} does not exist')
+
+        try:
+            course = import_course(options['archive'], creator=creator, base_url=options['base_url'])
+        except (CourseArchiveError, OSError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported "{course.title}" as course {course.id} '
+                f'({course.sections.count()} sections)'
+            )
+        )
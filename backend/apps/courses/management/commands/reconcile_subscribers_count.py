@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.courses.subscriptions import reconcile_subscribers_count
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счетчики подписчиков курсов с таблицей подписок и исправляет '
+        'расхождения - после пакетных операций в обход сигналов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int, help='ID курсов; без аргументов - все курсы')
+
+    def handle(self, *args, **options):
+        drift = reconcile_subscribers_count(options['course_ids'] or None)
+        for course_id, stored, counted in drift:
+            self.stdout.write(f'Курс {course_id}: {stored} -> {counted}')
+        self.stdout.write(self.style.SUCCESS(f'Исправлено курсов: {len(drift)}'))
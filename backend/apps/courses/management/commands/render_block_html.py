@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.courses.models import ContentElement
+from apps.core.rendering import render_blocks
+from apps.news.models import News
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает rendered_html элементов курсов и новостей - после обновления '
+        'рендерера или для записей, созданных до появления колонки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным')
+
+        elements = self._render(
+            ContentElement.objects.order_by('id'), batch_size,
+            lambda element: element.render_html(),
+        )
+        news = self._render(
+            News.objects.only('id', 'content_blocks', 'rendered_html').order_by('id'), batch_size,
+            lambda item: setattr(item, 'rendered_html', render_blocks(item.content_blocks)),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Готово: элементов {elements}, новостей {news}'))
+
+    def _render(self, queryset, batch_size, render):
+        """Рендерит записи пачками по id, сохраняет только изменившийся HTML"""
+        model = queryset.model
+        changed = 0
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                return changed
+            last_id = batch[-1].id
+
+            updated = []
+            for obj in batch:
+                previous = obj.rendered_html
+                render(obj)
+                if obj.rendered_html != previous:
+                    updated.append(obj)
+            model.objects.bulk_update(updated, ['rendered_html'])
+            changed += len(updated)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_add_publish_datetime'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='homeworksubmission',
+            index=models.Index(fields=['-submitted_at', '-id'], name='courses_hom_submitt_e481ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='homeworksubmission',
+            index=models.Index(fields=['user', '-submitted_at', '-id'], name='courses_hom_user_id_735a2c_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_add_submission_cursor_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contentelement',
+            index=models.Index(condition=models.Q(('content_type', 'homework')), fields=['section', 'order'], name='courses_el_homework_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['is_published', '-created_at'], name='courses_cou_is_publ_fd1efe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['creator', 'is_published'], name='courses_cou_creator_a37ae6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='homeworksubmission',
+            index=models.Index(fields=['user', 'element'], name='courses_hom_user_id_ce4bf5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['course', 'is_published', 'publish_datetime'], name='courses_sec_course__d1fff1_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_add_query_shape_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentelement',
+            name='rendered_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML блока'),
+        ),
+    ]
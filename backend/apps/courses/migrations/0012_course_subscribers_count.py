@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:55
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_subscribers_count(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Subscription = apps.get_model('courses', 'Subscription')
+    counted = Subscription.objects.filter(course_id=OuterRef('pk')).order_by().values(
+        'course_id'
+    ).annotate(total=Count('id')).values('total')
+    Course.objects.update(subscribers_count=Coalesce(Subquery(counted), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_element_rendered_html'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='subscribers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписчиков'),
+        ),
+        migrations.RunPython(fill_subscribers_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-subscribers_count', '-created_at'], name='courses_cou_subscri_db98a6_idx'),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django_ckeditor_5.fields import CKEditor5Field
 
+from apps.core.rendering import render_element
+
 
 class Course(models.Model):
     title = models.CharField('Название', max_length=255)
@@ -39,6 +41,9 @@ class Course(models.Model):
         verbose_name='Подписчики'
     )
 
+    # Число подписок, меняется вместе с ними (apps.courses.subscriptions)
+    subscribers_count = models.PositiveIntegerField('Подписчиков', default=0, editable=False)
+
     is_published = models.BooleanField('Опубликовано', default=False)
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
@@ -47,6 +52,14 @@ class Course(models.Model):
         verbose_name = 'Курс'
         verbose_name_plural = 'Курсы'
         ordering = ['-created_at']
+        indexes = [
+            # Публичный каталог и "последние курсы"
+            models.Index(fields=['is_published', '-created_at']),
+            # Курсы преподавателя и черновики
+            models.Index(fields=['creator', 'is_published']),
+            # Популярные курсы
+            models.Index(fields=['-subscribers_count', '-created_at']),
+        ]
 
     def __str__(self):
         return self.title
@@ -72,10 +85,6 @@ class Course(models.Model):
         from django.conf import settings
         return f'{settings.STATIC_URL}images/default-course.jpg'
 
-    @property
-    def subscribers_count(self):
-        return self.subscribers.count()
-
 
 class Subscription(models.Model):
     """Подписка пользователя на курс"""
@@ -127,6 +136,8 @@ class Section(models.Model):
         ordering = ['order', 'created_at']
         indexes = [
             models.Index(fields=['publish_datetime']),
+            # Доступные разделы курса
+            models.Index(fields=['course', 'is_published', 'publish_datetime']),
         ]
 
     def __str__(self):
@@ -154,6 +165,10 @@ class Section(models.Model):
         return False
 
 
+# Поля элемента, от которых зависит rendered_html
+RENDER_SOURCE_FIELDS = {'content_type', 'data', 'text_content', 'image', 'link_url', 'link_text', 'homework_description'}
+
+
 class ContentElement(models.Model):
     """Элемент контента раздела"""
     class ContentType(models.TextChoices):
@@ -198,6 +213,8 @@ class ContentElement(models.Model):
 
     # JSON данные блока (новый формат)
     data = models.JSONField('Данные блока', default=dict, blank=True)
+    # HTML блока, пересчитывается при сохранении (apps.core.rendering)
+    rendered_html = models.TextField('HTML блока', blank=True, editable=False)
 
     order = models.PositiveIntegerField('Порядок', default=0)
     is_published = models.BooleanField('Опубликовано', default=True)
@@ -215,11 +232,35 @@ class ContentElement(models.Model):
         ordering = ['order', 'created_at']
         indexes = [
             models.Index(fields=['publish_datetime']),
+            # Домашние задания раздела (расписание, статистика по ДЗ)
+            models.Index(
+                fields=['section', 'order'],
+                condition=models.Q(content_type='homework'),
+                name='courses_el_homework_idx',
+            ),
         ]
 
     def __str__(self):
         return f'{self.section} - {self.get_content_type_display()}'
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.render_html()
+        elif RENDER_SOURCE_FIELDS.intersection(update_fields):
+            self.render_html()
+            kwargs['update_fields'] = {*update_fields, 'rendered_html'}
+        super().save(*args, **kwargs)
+
+    def render_html(self):
+        """
+        Пересчитывает rendered_html по данным блока.
+
+        bulk_create/bulk_update не вызывают save() - перед ними метод
+        нужно вызвать явно (пакетное редактирование, импорт, копирование курса).
+        """
+        self.rendered_html = render_element(self)
+
     def is_locked_for_user(self, user) -> bool:
         """
         Проверяет, заблокирован ли элемент для конкретного пользователя.
@@ -298,6 +339,11 @@ class HomeworkSubmission(models.Model):
         ordering = ['-submitted_at']
         indexes = [
             models.Index(fields=['element', 'status']),
+            # Ключи курсорной пагинации: все ответы и ответы пользователя
+            models.Index(fields=['-submitted_at', '-id']),
+            models.Index(fields=['user', '-submitted_at', '-id']),
+            # Ответ пользователя на конкретное задание
+            models.Index(fields=['user', 'element']),
         ]
 
     def __str__(self):
@@ -6,11 +6,14 @@
 - Статуса публикации (is_published, publish_datetime)
 - Подписки на курс (Subscription)
 - Владения контентом (creator)
+
+Подписки и владение читаются из контекста доступа (apps.courses.access),
+который загружается один раз на запрос.
 """
 
 from rest_framework import permissions
-from django.utils import timezone
-from .models import Course, Section, ContentElement, Subscription
+from .access import get_course_access
+from .models import Course, Section, ContentElement
 
 
 class IsAccessibleOrAdmin(permissions.BasePermission):
@@ -99,8 +102,10 @@ class IsCourseSubscriberOrAdmin(permissions.BasePermission):
         if not course:
             return False
 
+        access = get_course_access(request)
+
         # Владелец курса имеет полный доступ
-        if course.creator == user:
+        if access.owns(course.id):
             return True
 
         # Преподаватели имеют доступ ко всем опубликованным курсам
@@ -108,4 +113,4 @@ class IsCourseSubscriberOrAdmin(permissions.BasePermission):
             return True
 
         # Студенты должны быть подписаны на курс
-        return Subscription.objects.filter(user=user, course=course).exists()
+        return access.is_subscribed(course.id)
@@ -1,39 +1,54 @@
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 import re
-from .models import Course, Section, ContentElement, HomeworkSubmission, HomeworkReviewHistory, Subscription
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+from .access import get_course_access
+from .enrollment import filtered_users
+from .models import (
+    Course, Section, ContentElement, HomeworkSubmission, HomeworkReviewHistory, Subscription, RENDER_SOURCE_FIELDS
+)
+from apps.users.models import User
 from apps.users.serializers import UserPublicSerializer
+from apps.search.indexing import schedule_course_tree
+from apps.core.mixins import MAX_ID
 
 
 class BlockDataValidator:
-    """Валидатор JSON данных блока в зависимости от типа контента"""
-
-    VIDEO_PATTERNS = {
-        'youtube': re.compile(
-            r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/|youtube\.com/v/|youtube\.com/shorts/)([a-zA-Z0-9_-]{11})'
-        ),
-        'vimeo': re.compile(
-            r'vimeo\.com/(?:video/)?(\d+)'
-        ),
-        'vk': re.compile(
-            r'(?:vk\.com/video|vkvideo\.ru/video)(-?\d+_\d+)'
-        ),
-        'rutube': re.compile(
-            r'rutube\.ru/(?:video/(?:private/)?|play/embed/)([a-zA-Z0-9]+)'
-        ),
-        'dzen': re.compile(
-            r'dzen\.ru/(?:video/watch|embed)/([a-zA-Z0-9]+)'
-        ),
-    }
+    """
+    Валидатор JSON данных блока в зависимости от типа контента.
+
+    Все, что не зависит от данных, готовится один раз при импорте модуля:
+    таблица валидаторов по типам (VALIDATORS) и единое регулярное выражение
+    для URL видео всех провайдеров. Для списков блоков (новости, пакетное
+    редактирование) validate_blocks проверяет все блоки и возвращает все
+    ошибки сразу, а не первую из них.
+    """
+
+    # Провайдер определяется по имени сработавшей группы (match.lastgroup)
+    VIDEO_URL_PATTERN = re.compile(
+        r'(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/|youtube\.com/v/|youtube\.com/shorts/)'
+        r'(?P<youtube>[a-zA-Z0-9_-]{11})'
+        r'|vimeo\.com/(?:video/)?(?P<vimeo>\d+)'
+        r'|(?:vk\.com/video|vkvideo\.ru/video)(?P<vk>-?\d+_\d+)'
+        r'|rutube\.ru/(?:video/(?:private/)?|play/embed/)(?P<rutube>[a-zA-Z0-9]+)'
+        r'|dzen\.ru/(?:video/watch|embed)/(?P<dzen>[a-zA-Z0-9]+)'
+    )
+
+    # Заполняется после объявления класса: тип блока -> метод валидации
+    VALIDATORS = {}
 
     @classmethod
-    def validate(cls, content_type: str, data: dict) -> dict:
+    def validate(cls, content_type: str, data: dict, allow_past_deadline: bool = False) -> dict:
         """
         Валидирует данные блока согласно его типу.
 
         Args:
             content_type: Тип контента (text, video, image, link, homework, gallery)
             data: Словарь с данными блока
+            allow_past_deadline: Не отклонять дедлайн ДЗ в прошлом (импорт
+                ранее созданного курса - проверяется только структура)
 
         Returns:
             Валидированный словарь данных
@@ -44,21 +59,53 @@ class BlockDataValidator:
         if not isinstance(data, dict):
             raise serializers.ValidationError("Данные блока должны быть объектом")
 
-        validators = {
-            'text': cls._validate_text,
-            'video': cls._validate_video,
-            'image': cls._validate_image,
-            'link': cls._validate_link,
-            'homework': cls._validate_homework,
-            'gallery': cls._validate_gallery,
-        }
-
-        validator = validators.get(content_type)
+        validator = cls.VALIDATORS.get(content_type)
         if not validator:
             raise serializers.ValidationError(f"Неизвестный тип контента: {content_type}")
 
+        if content_type == 'homework':
+            return validator(data, allow_past_deadline=allow_past_deadline)
         return validator(data)
 
+    @classmethod
+    def validate_blocks(cls, blocks, excluded_types=()) -> list:
+        """
+        Валидирует список блоков вида {type, data} за один проход.
+
+        Args:
+            blocks: Список блоков
+            excluded_types: Типы, которые в этом списке не допускаются
+
+        Returns:
+            Тот же список с валидированными данными блоков
+
+        Raises:
+            serializers.ValidationError: Со списком ошибок всех невалидных блоков
+        """
+        if not isinstance(blocks, list):
+            raise serializers.ValidationError("Блоки должны быть списком")
+
+        errors = []
+        for index, block in enumerate(blocks):
+            if not isinstance(block, dict):
+                errors.append(f"Блок {index} должен быть объектом")
+                continue
+            block_type = block.get('type')
+            if not block_type:
+                errors.append(f"Блок {index}: отсутствует поле 'type'")
+                continue
+            if block_type in excluded_types:
+                errors.append(f"Блок {index}: тип '{block_type}' здесь не поддерживается")
+                continue
+            try:
+                cls.validate(block_type, block.get('data', {}))
+            except serializers.ValidationError as e:
+                errors.extend(f"Блок {index} ({block_type}): {message}" for message in _error_messages(e.detail))
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return blocks
+
     @classmethod
     def _validate_text(cls, data: dict) -> dict:
         """Валидация текстового блока"""
@@ -81,50 +128,33 @@ class BlockDataValidator:
         if not isinstance(url, str) or not url:
             raise serializers.ValidationError("URL видео должен быть непустой строкой")
 
-        # Определяем провайдер и извлекаем video_id
-        provider = None
-        video_id = None
-
-        for provider_name, pattern in cls.VIDEO_PATTERNS.items():
-            match = pattern.search(url)
-            if match:
-                provider = provider_name
-                video_id = match.group(1)
-                break
-
+        # Определяем провайдер и извлекаем video_id одним поиском
+        match = cls.VIDEO_URL_PATTERN.search(url)
+        if match:
+            provider = match.lastgroup
+            video_id = match.group(provider)
         # Если не нашли известный провайдер, проверяем на универсальный embed URL
-        if not provider:
-            # Если URL похож на embed URL (содержит /embed/ или player) или начинается с https://
-            if '/embed/' in url or 'player.' in url or url.startswith('https://'):
-                try:
-                    # Проверяем, что это валидный URL
-                    from urllib.parse import urlparse
-                    parsed = urlparse(url)
-                    if parsed.scheme in ['http', 'https'] and parsed.netloc:
-                        provider = 'custom'
-                        video_id = url  # Для custom provider весь URL является идентификатором
-                    else:
-                        raise serializers.ValidationError(
-                            "Неверный формат URL видео"
-                        )
-                except Exception:
-                    raise serializers.ValidationError(
-                        "Неверный формат URL видео"
-                    )
-            else:
-                raise serializers.ValidationError(
-                    "Поддерживаются: YouTube, Vimeo, VK Video, Rutube, Dzen или любой embed URL"
-                )
+        elif '/embed/' in url or 'player.' in url or url.startswith('https://'):
+            try:
+                parsed = urlsplit(url)
+            except ValueError:
+                parsed = None
+            if parsed is None or parsed.scheme not in ('http', 'https') or not parsed.netloc:
+                raise serializers.ValidationError("Неверный формат URL видео")
+            provider = 'custom'
+            video_id = url  # Для custom provider весь URL является идентификатором
+        else:
+            raise serializers.ValidationError(
+                "Поддерживаются: YouTube, Vimeo, VK Video, Rutube, Dzen или любой embed URL"
+            )
 
         # Добавляем извлеченные данные
         data['provider'] = provider
         data['video_id'] = video_id
 
         # Для приватных видео RuTube сохраняем ключ доступа
-        if provider == 'rutube':
-            from urllib.parse import urlparse, parse_qs
-            qs = parse_qs(urlparse(url).query)
-            private_key = qs.get('p', [None])[0]
+        if provider == 'rutube' and '?' in url:
+            private_key = parse_qs(urlsplit(url).query).get('p', [None])[0]
             if private_key:
                 data['privateKey'] = private_key
 
@@ -153,7 +183,7 @@ class BlockDataValidator:
             raise serializers.ValidationError("URL должен быть непустой строкой")
 
         # Проверяем, что URL начинается с http://, https:// или /
-        if not (url.startswith('http://') or url.startswith('https://') or url.startswith('/')):
+        if not url.startswith(('http://', 'https://', '/')):
             raise serializers.ValidationError(
                 "URL должен начинаться с http://, https:// или /"
             )
@@ -161,22 +191,18 @@ class BlockDataValidator:
         return data
 
     @classmethod
-    def _validate_homework(cls, data: dict) -> dict:
+    def _validate_homework(cls, data: dict, allow_past_deadline: bool = False) -> dict:
         """Валидация блока домашнего задания"""
-        # deadline опционален, но если указан - не должен быть в прошлом
+        # deadline опционален, но если указан - не должен быть в прошлом (кроме импорта)
         deadline = data.get('deadline')
-        if deadline:
-            # deadline может быть строкой ISO или datetime объектом
-            if isinstance(deadline, str):
-                try:
-                    from datetime import datetime
-                    deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-                    if deadline_dt < datetime.now(deadline_dt.tzinfo):
-                        raise serializers.ValidationError(
-                            "Дедлайн не может быть в прошлом"
-                        )
-                except ValueError:
-                    raise serializers.ValidationError("Неверный формат даты для deadline")
+        # deadline может быть строкой ISO или datetime объектом
+        if deadline and isinstance(deadline, str):
+            try:
+                deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+            except ValueError:
+                raise serializers.ValidationError("Неверный формат даты для deadline")
+            if not allow_past_deadline and deadline_dt < datetime.now(deadline_dt.tzinfo):
+                raise serializers.ValidationError("Дедлайн не может быть в прошлом")
 
         # task_file_url и task_file_name опциональны
         task_file_url = data.get('task_file_url')
@@ -199,7 +225,18 @@ class BlockDataValidator:
         if not isinstance(images, list):
             raise serializers.ValidationError("Поле 'images' должно быть массивом")
 
-        # Проверяем каждое изображение в галерее
+        # Типичная галерея валидна целиком: один проход без построения сообщений,
+        # поиск конкретной ошибки - только если проход не удался
+        for image in images:
+            if type(image) is not dict:
+                break
+            url = image.get('url')
+            if (type(url) is not str or not url
+                    or type(image.get('caption', '')) is not str or type(image.get('alt', '')) is not str):
+                break
+        else:
+            return data
+
         for idx, image in enumerate(images):
             if not isinstance(image, dict):
                 raise serializers.ValidationError(
@@ -231,6 +268,25 @@ class BlockDataValidator:
         return data
 
 
+BlockDataValidator.VALIDATORS = {
+    'text': BlockDataValidator._validate_text,
+    'video': BlockDataValidator._validate_video,
+    'image': BlockDataValidator._validate_image,
+    'link': BlockDataValidator._validate_link,
+    'homework': BlockDataValidator._validate_homework,
+    'gallery': BlockDataValidator._validate_gallery,
+}
+
+
+def _error_messages(detail) -> list:
+    """Плоский список текстов ошибок из ValidationError.detail"""
+    if isinstance(detail, dict):
+        return [message for value in detail.values() for message in _error_messages(value)]
+    if isinstance(detail, list):
+        return [message for value in detail for message in _error_messages(value)]
+    return [str(detail)]
+
+
 class CourseBriefSerializer(serializers.ModelSerializer):
     """Краткая информация о курсе для вложенных структур"""
 
@@ -348,7 +404,7 @@ class ContentElementSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContentElement
         fields = [
-            'id', 'section', 'content_type', 'title', 'data',
+            'id', 'section', 'content_type', 'title', 'data', 'rendered_html',
             'order', 'is_published', 'publish_datetime', 'is_locked', 'unlock_datetime'
         ]
 
@@ -372,8 +428,8 @@ class ContentElementSerializer(serializers.ModelSerializer):
         """
         Скрывает контент для заблокированных элементов.
 
-        Для студентов заблокированные элементы возвращаются с пустым data.
-        Админы и преподаватели видят полный контент.
+        Для студентов заблокированные элементы возвращаются с пустыми data
+        и rendered_html. Админы и преподаватели видят полный контент.
         """
         representation = super().to_representation(instance)
         request = self.context.get('request')
@@ -382,6 +438,7 @@ class ContentElementSerializer(serializers.ModelSerializer):
         # Если элемент заблокирован для студента - скрываем контент
         if instance.is_locked_for_user(user):
             representation['data'] = {}
+            representation['rendered_html'] = ''
 
         return representation
 
@@ -390,6 +447,11 @@ class ContentElementSerializer(serializers.ModelSerializer):
         content_type = attrs.get('content_type')
         data = attrs.get('data', {})
 
+        if self.instance is not None and content_type and content_type != self.instance.content_type \
+                and 'data' not in attrs:
+            # Тип меняется без новых данных - сохраненные данные должны подойти новому типу
+            data = {**self.instance.data, 'type': content_type} if self.instance.data else {}
+
         if content_type and data:
             # Добавляем version и type если их нет
             if 'version' not in data:
@@ -413,7 +475,7 @@ class ContentElementDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContentElement
         fields = [
-            'id', 'section', 'content_type', 'title', 'data',
+            'id', 'section', 'content_type', 'title', 'data', 'rendered_html',
             'order', 'is_published', 'publish_datetime', 'is_locked', 'unlock_datetime', 'my_submission'
         ]
 
@@ -436,7 +498,11 @@ class ContentElementDetailSerializer(serializers.ModelSerializer):
     def get_my_submission(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            submission = obj.submissions.filter(user=request.user).first()
+            # Ответы пользователя, загруженные через prefetch (user_submissions)
+            if hasattr(obj, 'user_submissions'):
+                submission = obj.user_submissions[0] if obj.user_submissions else None
+            else:
+                submission = obj.submissions.filter(user=request.user).first()
             if submission:
                 return HomeworkSubmissionSerializer(submission).data
         return None
@@ -450,6 +516,7 @@ class ContentElementDetailSerializer(serializers.ModelSerializer):
         # Если элемент заблокирован для студента - скрываем контент
         if instance.is_locked_for_user(user):
             representation['data'] = {}
+            representation['rendered_html'] = ''
             representation['my_submission'] = None
 
         return representation
@@ -528,6 +595,9 @@ class SectionListSerializer(serializers.ModelSerializer):
         return None
 
     def get_elements_count(self, obj):
+        # Аннотация elements_total из SectionViewSet.get_queryset
+        if hasattr(obj, 'elements_total'):
+            return obj.elements_total
         return obj.elements.count()
 
 
@@ -581,7 +651,7 @@ class CourseListSerializer(serializers.ModelSerializer):
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.subscribers.filter(id=request.user.id).exists()
+            return get_course_access(request).is_subscribed(obj.id)
         return False
 
 
@@ -637,7 +707,7 @@ class CourseDetailSerializer(serializers.ModelSerializer):
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.subscribers.filter(id=request.user.id).exists()
+            return get_course_access(request).is_subscribed(obj.id)
         return False
 
 
@@ -660,6 +730,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         fields = ['id', 'course', 'subscribed_at']
 
     def get_course(self, obj):
+        # Для списка подписок курсы загружаются через prefetch (см. my_courses)
         return CourseListSerializer(
             obj.course,
             context=self.context
@@ -682,3 +753,293 @@ class CourseScheduleItemSerializer(serializers.Serializer):
     is_overdue = serializers.BooleanField(required=False)
     has_submission = serializers.BooleanField(required=False)
     submission_status = serializers.CharField(allow_null=True, required=False)
+
+
+def _prepare_block_data(content_type: str, data: dict, allow_past_deadline: bool = False) -> dict:
+    """Добавляет служебные поля блока и валидирует его данные"""
+    if 'version' not in data:
+        data['version'] = 1
+    if 'type' not in data:
+        data['type'] = content_type
+    return BlockDataValidator.validate(content_type, data, allow_past_deadline=allow_past_deadline)
+
+
+class CourseCloneSerializer(serializers.Serializer):
+    """Параметры копирования курса: сдвиг дат не больше 10 лет, чтобы даты оставались в пределах datetime"""
+    MAX_OFFSET_DAYS = 3650
+
+    offset_days = serializers.IntegerField(
+        required=False, allow_null=True, min_value=-MAX_OFFSET_DAYS, max_value=MAX_OFFSET_DAYS
+    )
+    offset_hours = serializers.IntegerField(
+        required=False, allow_null=True, min_value=-24 * MAX_OFFSET_DAYS, max_value=24 * MAX_OFFSET_DAYS
+    )
+    title = serializers.CharField(required=False, allow_blank=True, allow_null=True, max_length=255)
+
+    def get_offset(self) -> timedelta:
+        return timedelta(
+            days=self.validated_data.get('offset_days') or 0,
+            hours=self.validated_data.get('offset_hours') or 0
+        )
+
+
+class EnrollSerializer(serializers.Serializer):
+    """
+    Пакетная подписка на курс. Источник пользователей - ровно один из:
+    список user_ids, CSV-ростер с email или фильтр grade/city/role.
+    """
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_ID),
+        required=False, allow_empty=False, max_length=5000
+    )
+    roster = serializers.FileField(required=False)
+    grade = serializers.ChoiceField(choices=User._meta.get_field('grade').choices, required=False)
+    city = serializers.CharField(max_length=100, required=False)
+    role = serializers.ChoiceField(choices=User.Role.choices, required=False)
+
+    FILTER_FIELDS = ('grade', 'city', 'role')
+
+    def validate(self, attrs):
+        sources = [
+            'user_ids' in attrs,
+            'roster' in attrs,
+            any(field in attrs for field in self.FILTER_FIELDS),
+        ]
+        if sum(sources) != 1:
+            raise serializers.ValidationError('Укажите либо user_ids, либо roster, либо фильтр grade/city/role')
+        return attrs
+
+    def get_users(self):
+        """Активные пользователи по user_ids или фильтру"""
+        if 'user_ids' in self.validated_data:
+            return filtered_users().filter(id__in=self.validated_data['user_ids'])
+        return filtered_users(**{
+            field: self.validated_data[field] for field in self.FILTER_FIELDS if field in self.validated_data
+        })
+
+
+class ElementBatchItemSerializer(serializers.Serializer):
+    """Элемент в пакетном запросе: без id - создание, с id - обновление"""
+    id = serializers.IntegerField(min_value=1, max_value=MAX_ID, required=False)
+    content_type = serializers.ChoiceField(choices=ContentElement.ContentType.choices, required=False)
+    title = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    data = serializers.JSONField(required=False)
+    order = serializers.IntegerField(min_value=0, required=False)
+    is_published = serializers.BooleanField(required=False)
+    publish_datetime = serializers.DateTimeField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if 'id' not in attrs and 'content_type' not in attrs:
+            raise serializers.ValidationError("Поле 'content_type' обязательно для нового элемента")
+        if 'data' in attrs and not isinstance(attrs['data'], dict):
+            raise serializers.ValidationError("Данные блока должны быть объектом")
+        return attrs
+
+
+class SectionBatchItemSerializer(serializers.Serializer):
+    """Раздел в пакетном запросе: без id - создание, с id - обновление"""
+    id = serializers.IntegerField(min_value=1, max_value=MAX_ID, required=False)
+    title = serializers.CharField(max_length=255, required=False)
+    order = serializers.IntegerField(min_value=0, required=False)
+    is_published = serializers.BooleanField(required=False)
+    publish_datetime = serializers.DateTimeField(required=False, allow_null=True)
+    elements = ElementBatchItemSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        if 'id' not in attrs and not attrs.get('title'):
+            raise serializers.ValidationError("Поле 'title' обязательно для нового раздела")
+        return attrs
+
+
+class CourseBatchSerializer(serializers.Serializer):
+    """
+    Пакетное редактирование структуры курса одной транзакцией.
+
+    Принимает дерево разделов с элементами (создание, обновление, перенос,
+    изменение порядка) и списки ID на удаление. Все блоки валидируются
+    BlockDataValidator до записи; существующие объекты загружаются по одному
+    запросу на модель, запись выполняется через bulk_create/bulk_update.
+
+    Ожидает курс в context['course'].
+    """
+    SECTION_FIELDS = ['title', 'order', 'is_published', 'publish_datetime']
+    ELEMENT_FIELDS = ['content_type', 'title', 'data', 'order', 'is_published', 'publish_datetime']
+
+    sections = SectionBatchItemSerializer(many=True, required=False)
+    delete_sections = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_ID), required=False
+    )
+    delete_elements = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_ID), required=False
+    )
+
+    def validate(self, attrs):
+        course = self.context['course']
+        sections = attrs.get('sections', [])
+        delete_sections = set(attrs.get('delete_sections', []))
+        delete_elements = set(attrs.get('delete_elements', []))
+
+        section_ids = [item['id'] for item in sections if 'id' in item]
+        element_ids = [
+            element['id']
+            for item in sections
+            for element in item.get('elements', [])
+            if 'id' in element
+        ]
+
+        if len(section_ids) != len(set(section_ids)):
+            raise serializers.ValidationError("Раздел указан в запросе несколько раз")
+        if len(element_ids) != len(set(element_ids)):
+            raise serializers.ValidationError("Элемент указан в запросе несколько раз")
+        if delete_sections & set(section_ids):
+            raise serializers.ValidationError("Раздел не может быть одновременно изменен и удален")
+        if delete_elements & set(element_ids):
+            raise serializers.ValidationError("Элемент не может быть одновременно изменен и удален")
+
+        # Все существующие объекты курса, на которые ссылается запрос - по запросу на модель
+        existing_sections = Section.objects.filter(course=course).in_bulk(
+            set(section_ids) | delete_sections
+        )
+        missing = (set(section_ids) | delete_sections) - set(existing_sections)
+        if missing:
+            raise serializers.ValidationError(
+                f"Разделы не найдены в курсе: {', '.join(map(str, sorted(missing)))}"
+            )
+
+        existing_elements = ContentElement.objects.filter(section__course=course).in_bulk(
+            set(element_ids) | delete_elements
+        )
+        missing = (set(element_ids) | delete_elements) - set(existing_elements)
+        if missing:
+            raise serializers.ValidationError(
+                f"Элементы не найдены в курсе: {', '.join(map(str, sorted(missing)))}"
+            )
+
+        errors = {}
+        for section_index, item in enumerate(sections):
+            for element_index, element in enumerate(item.get('elements', [])):
+                if 'data' not in element:
+                    existing = existing_elements.get(element.get('id'))
+                    if existing is None or element.get('content_type', existing.content_type) == existing.content_type:
+                        continue
+                    # Тип меняется без новых данных - сохраненные данные должны подойти новому типу
+                    element['data'] = {**existing.data, 'type': element['content_type']} if existing.data else {}
+                content_type = element.get('content_type')
+                if not content_type:
+                    content_type = existing_elements[element['id']].content_type
+                if not element['data']:
+                    continue
+                try:
+                    element['data'] = _prepare_block_data(content_type, element['data'])
+                except serializers.ValidationError as e:
+                    errors[f'sections[{section_index}].elements[{element_index}]'] = e.detail
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        attrs['existing_sections'] = existing_sections
+        attrs['existing_elements'] = existing_elements
+        return attrs
+
+    def save(self, **kwargs):
+        """
+        Применяет изменения одной транзакцией.
+
+        Returns:
+            Словарь со счетчиками и ID разделов/элементов в порядке запроса
+        """
+        course = self.context['course']
+        validated = self.validated_data
+        existing_sections = validated['existing_sections']
+        existing_elements = validated['existing_elements']
+
+        sections_to_create = []
+        sections_to_update = []
+        section_fields = set()
+        # Для каждого раздела из запроса: (объект раздела, список его элементов из запроса)
+        section_plan = []
+
+        for item in validated.get('sections', []):
+            if 'id' in item:
+                section = existing_sections[item['id']]
+                sections_to_update.append(section)
+            else:
+                section = Section(course=course)
+                sections_to_create.append(section)
+            for field in self.SECTION_FIELDS:
+                if field in item:
+                    setattr(section, field, item[field])
+                    if 'id' in item:
+                        section_fields.add(field)
+            section_plan.append((section, item.get('elements', [])))
+
+        with transaction.atomic():
+            if sections_to_update and section_fields:
+                Section.objects.bulk_update(sections_to_update, sorted(section_fields))
+            if sections_to_create:
+                Section.objects.bulk_create(sections_to_create)
+
+            elements_to_create = []
+            elements_to_update = []
+            element_fields = set()
+            result_sections = []
+
+            for section, element_items in section_plan:
+                section_elements = []
+                for element_item in element_items:
+                    if 'id' in element_item:
+                        element = existing_elements[element_item['id']]
+                        elements_to_update.append(element)
+                        if element.section_id != section.id:
+                            element.section = section
+                            element_fields.add('section')
+                    else:
+                        element = ContentElement(section=section)
+                        elements_to_create.append(element)
+                    for field in self.ELEMENT_FIELDS:
+                        if field in element_item:
+                            setattr(element, field, element_item[field])
+                            if 'id' in element_item:
+                                element_fields.add(field)
+                    section_elements.append(element)
+                result_sections.append((section, section_elements))
+
+            # bulk-операции не вызывают save() - HTML блоков пересчитываем здесь
+            for element in elements_to_create:
+                element.render_html()
+            if element_fields & RENDER_SOURCE_FIELDS:
+                for element in elements_to_update:
+                    element.render_html()
+                element_fields.add('rendered_html')
+
+            if elements_to_update and element_fields:
+                ContentElement.objects.bulk_update(elements_to_update, sorted(element_fields))
+            if elements_to_create:
+                ContentElement.objects.bulk_create(elements_to_create)
+
+            # Удаление выполняем последним, чтобы перенесенные элементы
+            # не попали под каскадное удаление своего прежнего раздела
+            deleted_elements = 0
+            deleted_sections = 0
+            if validated.get('delete_elements'):
+                ContentElement.objects.filter(id__in=validated['delete_elements']).delete()
+                deleted_elements = len(validated['delete_elements'])
+            if validated.get('delete_sections'):
+                Section.objects.filter(id__in=validated['delete_sections']).delete()
+                deleted_sections = len(validated['delete_sections'])
+
+            # bulk-операции не отправляют сигналы - обновляем поисковые документы явно
+            schedule_course_tree(course.id)
+
+        return {
+            'created_sections': len(sections_to_create),
+            'updated_sections': len(sections_to_update),
+            'deleted_sections': deleted_sections,
+            'created_elements': len(elements_to_create),
+            'updated_elements': len(elements_to_update),
+            'deleted_elements': deleted_elements,
+            'sections': [
+                {'id': section.id, 'elements': [element.id for element in elements]}
+                for section, elements in result_sections
+            ],
+        }
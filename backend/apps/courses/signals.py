@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Subscription
+from .subscriptions import adjust_subscribers_count
+
+
+@receiver(post_save, sender=Subscription)
+def count_new_subscriber(sender, instance, created, **kwargs):
+    if created:
+        adjust_subscribers_count(instance.course_id, 1)
+
+
+@receiver(post_delete, sender=Subscription)
+def count_removed_subscriber(sender, instance, **kwargs):
+    """Срабатывает и при каскадном удалении пользователя или курса"""
+    adjust_subscribers_count(instance.course_id, -1)
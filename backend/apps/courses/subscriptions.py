@@ -0,0 +1,133 @@
+"""
+Счетчик подписчиков курса.
+
+Course.subscribers_count хранится в курсе, поэтому каталог и "популярные
+курсы" сортируются по индексу без COUNT по таблице подписок. Счетчик
+меняется атомарным UPDATE с F() в сигналах Subscription (apps.courses.signals),
+в том числе при каскадном удалении пользователя или курса. Пакетные операции
+в обход сигналов (bulk_create, delete через raw SQL) вызывают
+adjust_subscribers_count сами; накопившееся расхождение исправляет команда
+reconcile_subscribers_count.
+
+Подписка и отписка из API - create_subscriptions и delete_subscriptions:
+по одному SQL-запросу без предварительного SELECT. Уникальность пары
+(user, course) соблюдает сама БД (ON CONFLICT DO NOTHING), поэтому
+одновременные подписки не гоняются за unique_together и не падают с
+IntegrityError, а RETURNING сообщает, какие строки действительно изменились.
+"""
+
+from collections import Counter
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.db.models import Count, DateTimeField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Course, Subscription
+
+
+def adjust_subscribers_count(course_id, delta: int):
+    """Изменяет счетчик подписчиков курса на delta одним UPDATE"""
+    if delta:
+        # Greatest: счетчик не уходит в минус, даже если уже разошелся с подписками
+        Course.objects.filter(pk=course_id).update(
+            subscribers_count=Greatest(F('subscribers_count') + delta, Value(0))
+        )
+
+
+def reconcile_subscribers_count(course_ids=None) -> list:
+    """
+    Сверяет счетчики подписчиков с таблицей подписок и исправляет расхождения.
+
+    Args:
+        course_ids: ID курсов; None - все курсы
+
+    Returns:
+        Исправленные курсы: список (id, было, стало)
+    """
+    actual = Subscription.objects.filter(course_id=OuterRef('pk')).order_by().values(
+        'course_id'
+    ).annotate(total=Count('id')).values('total')
+    queryset = Course.objects.all()
+    if course_ids is not None:
+        queryset = queryset.filter(id__in=course_ids)
+
+    drift = [
+        (course_id, stored, counted)
+        for course_id, stored, counted in queryset.annotate(
+            counted=Coalesce(Subquery(actual), Value(0))
+        ).exclude(subscribers_count=F('counted')).values_list('id', 'subscribers_count', 'counted')
+    ]
+    if drift:
+        Course.objects.filter(id__in=[course_id for course_id, _, _ in drift]).update(
+            subscribers_count=Coalesce(Subquery(actual), Value(0))
+        )
+    return drift
+
+
+def _apply_changes(pairs, sign: int):
+    """Счетчики курсов после изменения подписок без сигналов"""
+    for course_id, delta in Counter(course_id for _, course_id in pairs).items():
+        adjust_subscribers_count(course_id, sign * delta)
+
+
+def create_subscriptions(queryset, user, course) -> list:
+    """
+    Создает подписки одним INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+    Args:
+        queryset: источник строк, например курс по id или пользователи класса
+        user: поле или выражение queryset с id пользователя
+        course: поле или выражение queryset с id курса
+
+    Returns:
+        Созданные подписки: список (user_id, course_id); существующие пропускаются
+    """
+    try:
+        select, params = queryset.order_by().values_list(
+            user, course, Value(timezone.now(), output_field=DateTimeField())
+        ).query.sql_with_params()
+    except EmptyResultSet:
+        # queryset.none() или фильтр по пустому списку - вставлять нечего
+        return []
+    quote = connection.ops.quote_name
+    # WHERE TRUE снимает неоднозначность INSERT ... SELECT ... ON CONFLICT в SQLite
+    sql = (
+        f'INSERT INTO {quote(Subscription._meta.db_table)} '
+        f'({quote("user_id")}, {quote("course_id")}, {quote("subscribed_at")}) '
+        f'SELECT * FROM ({select}) source WHERE TRUE '
+        f'ON CONFLICT ({quote("user_id")}, {quote("course_id")}) DO NOTHING '
+        f'RETURNING {quote("user_id")}, {quote("course_id")}'
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            created = [tuple(row) for row in cursor.fetchall()]
+        _apply_changes(created, 1)
+    return created
+
+
+def delete_subscriptions(course_id, user_ids) -> list:
+    """
+    Удаляет подписки пользователей на курс одним DELETE ... RETURNING.
+
+    Returns:
+        ID пользователей, подписки которых были удалены
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    sql = (
+        f'DELETE FROM {quote(Subscription._meta.db_table)} '
+        f'WHERE {quote("course_id")} = %s AND {quote("user_id")} IN ({placeholders}) '
+        f'RETURNING {quote("user_id")}'
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [course_id, *user_ids])
+            deleted = [user_id for user_id, in cursor.fetchall()]
+        _apply_changes([(user_id, course_id) for user_id in deleted], -1)
+    return deleted
@@ -0,0 +1,896 @@
+"""
+Тесты для API курсов.
+
+Для запуска тестов:
+    python manage.py test apps.courses
+"""
+
+import copy
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from apps.users.models import User
+from apps.courses.access import CourseAccess
+from apps.courses.models import Course, Section, ContentElement, HomeworkSubmission, Subscription
+from apps.core.rendering import render_blocks, sanitize_html
+from apps.courses.serializers import BlockDataValidator, ContentElementSerializer
+from apps.courses.subscriptions import create_subscriptions, reconcile_subscribers_count
+
+
+class HomeworkArchiveAPITestCase(TestCase):
+    """Тесты для выгрузки всех ответов на ДЗ одним архивом."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.other_teacher = User.objects.create_user(
+            email='other@test.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='Teacher',
+            role=User.Role.TEACHER
+        )
+
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher,
+            is_published=True
+        )
+        self.section = Section.objects.create(course=self.course, title='Section', order=1)
+        self.element = ContentElement.objects.create(
+            section=self.section,
+            content_type=ContentElement.ContentType.HOMEWORK,
+            title='Эссе',
+            order=1
+        )
+
+        for i, (first_name, last_name) in enumerate([('Иван', 'Петров'), ('Анна', 'Сидорова')]):
+            student = User.objects.create_user(
+                email=f'student{i}@test.com',
+                password='testpass123',
+                first_name=first_name,
+                last_name=last_name
+            )
+            submission = HomeworkSubmission(element=self.element, user=student)
+            submission.file.save(f'answer{i}.txt', ContentFile(f'answer {i}'.encode()), save=False)
+            submission.save()
+
+        self.client = APIClient()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _read_archive(self, response):
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_download_element_archive(self):
+        """Владелец курса получает архив с файлами, названными по студентам."""
+        self.client.force_authenticate(user=self.teacher)
+        url = reverse('homework-download-all')
+        response = self.client.get(url, {'element': self.element.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = self._read_archive(response)
+        names = sorted(archive.namelist())
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[0].startswith('Петров_Иван_'))
+        self.assertEqual(archive.read(names[0]), b'answer 0')
+
+    def test_download_section_archive_groups_by_element(self):
+        """Архив раздела раскладывает ответы по папкам элементов."""
+        self.client.force_authenticate(user=self.teacher)
+        url = reverse('homework-download-all')
+        response = self.client.get(url, {'section': self.section.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = self._read_archive(response).namelist()
+        self.assertTrue(all(name.startswith(f'01_Эссе_{self.element.id}/') for name in names))
+
+    def test_download_other_course_denied(self):
+        """Преподаватель не может скачать ответы чужого курса."""
+        self.client.force_authenticate(user=self.other_teacher)
+        url = reverse('homework-download-all')
+        response = self.client.get(url, {'element': self.element.id})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_download_rejects_non_numeric_target(self):
+        """Нечисловой или слишком большой ID элемента/раздела - 400."""
+        self.client.force_authenticate(user=self.teacher)
+        url = reverse('homework-download-all')
+        for params in [{'element': 'abc'}, {'section': '1.5'}, {'element': str(2 ** 64)}]:
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class ReorderAPITestCase(TestCase):
+    """Тесты для массового изменения порядка разделов и элементов."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.other_teacher = User.objects.create_user(
+            email='other@test.com',
+            password='testpass123',
+            first_name='Other',
+            last_name='Teacher',
+            role=User.Role.TEACHER
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher,
+            is_published=True
+        )
+        self.section = Section.objects.create(course=self.course, title='Section', order=0)
+        self.elements = [
+            ContentElement.objects.create(
+                section=self.section,
+                content_type=ContentElement.ContentType.TEXT,
+                order=i
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+
+    def test_reorder_elements(self):
+        """Владелец курса меняет порядок всех элементов одним запросом."""
+        self.client.force_authenticate(user=self.teacher)
+        items = [
+            {'id': element.id, 'order': 2 - i}
+            for i, element in enumerate(self.elements)
+        ]
+        response = self.client.post(reverse('element-reorder'), {'items': items}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        orders = list(
+            ContentElement.objects.filter(section=self.section)
+            .order_by('order')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(orders, [element.id for element in reversed(self.elements)])
+
+    def test_reorder_out_of_range_id_rejected(self):
+        """ID за пределами BIGINT дает 400, а не ошибку сервера."""
+        self.client.force_authenticate(user=self.teacher)
+        for object_id in (2 ** 64, 0):
+            with self.subTest(object_id=object_id):
+                response = self.client.post(
+                    reverse('element-reorder'), {'items': [{'id': object_id, 'order': 0}]}, format='json'
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reorder_too_large_order_rejected(self):
+        """Порядок больше INTEGER дает 400 и ничего не меняет."""
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.post(
+            reverse('element-reorder'), {'items': [{'id': self.elements[0].id, 'order': 2 ** 31}]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.elements[0].refresh_from_db()
+        self.assertEqual(self.elements[0].order, 0)
+
+    def test_reorder_sections_other_owner_denied(self):
+        """Преподаватель не может менять порядок разделов чужого курса."""
+        self.client.force_authenticate(user=self.other_teacher)
+        response = self.client.post(
+            reverse('section-reorder'),
+            {'items': [{'id': self.section.id, 'order': 5}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.section.refresh_from_db()
+        self.assertEqual(self.section.order, 0)
+
+    def test_reorder_missing_element(self):
+        """Несуществующий ID возвращает 404."""
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.post(
+            reverse('element-reorder'),
+            {'items': [{'id': 999999, 'order': 0}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CourseBatchAPITestCase(TestCase):
+    """Тесты для пакетного редактирования структуры курса."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher
+        )
+        self.section = Section.objects.create(course=self.course, title='Old', order=0)
+        self.element = ContentElement.objects.create(
+            section=self.section,
+            content_type=ContentElement.ContentType.TEXT,
+            data={'html': '<p>old</p>'},
+            order=0
+        )
+        self.obsolete = ContentElement.objects.create(
+            section=self.section,
+            content_type=ContentElement.ContentType.TEXT,
+            order=1
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.teacher)
+        self.url = reverse('course-batch', kwargs={'pk': self.course.id})
+
+    def test_batch_create_update_delete(self):
+        """Создание, перенос и удаление применяются одним запросом."""
+        payload = {
+            'sections': [
+                {'id': self.section.id, 'title': 'Renamed'},
+                {
+                    'title': 'New section',
+                    'order': 1,
+                    'elements': [
+                        {'id': self.element.id, 'order': 1},
+                        {'content_type': 'video', 'data': {'url': 'https://youtu.be/dQw4w9WgXcQ'}, 'order': 0},
+                    ]
+                },
+            ],
+            'delete_elements': [self.obsolete.id],
+        }
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created_sections'], 1)
+        self.assertEqual(response.data['created_elements'], 1)
+        self.assertEqual(response.data['deleted_elements'], 1)
+
+        new_section_id = response.data['sections'][1]['id']
+        self.element.refresh_from_db()
+        self.assertEqual(self.element.section_id, new_section_id)
+        video = ContentElement.objects.get(pk=response.data['sections'][1]['elements'][1])
+        self.assertEqual(video.data['provider'], 'youtube')
+        self.assertIn('https://www.youtube.com/embed/dQw4w9WgXcQ', video.rendered_html)
+        self.assertFalse(ContentElement.objects.filter(pk=self.obsolete.id).exists())
+        self.assertEqual(Section.objects.get(pk=self.section.id).title, 'Renamed')
+
+    def test_batch_invalid_block_rolls_back(self):
+        """Невалидный блок отклоняет весь пакет без частичной записи."""
+        payload = {
+            'sections': [{
+                'id': self.section.id,
+                'title': 'Renamed',
+                'elements': [{'content_type': 'link', 'data': {'url': 'ftp://bad'}}],
+            }],
+        }
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('sections[0].elements[0]', response.data)
+        self.assertEqual(Section.objects.get(pk=self.section.id).title, 'Old')
+
+    def test_type_change_revalidates_stored_data(self):
+        """Смена типа без новых data проверяет сохраненные data по новому типу."""
+        payload = {'sections': [{'id': self.section.id, 'elements': [{'id': self.element.id, 'content_type': 'video'}]}]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('sections[0].elements[0]', response.data)
+
+        response = self.client.patch(
+            reverse('element-detail', kwargs={'pk': self.element.id}), {'content_type': 'video'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.element.refresh_from_db()
+        self.assertEqual(self.element.content_type, ContentElement.ContentType.TEXT)
+
+    def test_batch_out_of_range_ids_rejected(self):
+        """ID за пределами BIGINT дают 400, а не ошибку сервера."""
+        payloads = [
+            {'delete_sections': [2 ** 64]},
+            {'delete_elements': [0]},
+            {'sections': [{'id': 2 ** 64, 'title': 'Huge'}]},
+            {'sections': [{'id': self.section.id, 'elements': [{'id': 2 ** 64}]}]},
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                response = self.client.post(self.url, payload, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_foreign_element_rejected(self):
+        """Элементы другого курса нельзя изменять через пакет."""
+        other_course = Course.objects.create(title='Other', short_description='Test', creator=self.teacher)
+        other_section = Section.objects.create(course=other_course, title='Other')
+        foreign = ContentElement.objects.create(
+            section=other_section,
+            content_type=ContentElement.ContentType.TEXT
+        )
+        response = self.client.post(self.url, {'delete_elements': [foreign.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(ContentElement.objects.filter(pk=foreign.id).exists())
+
+
+class CourseTransferAPITestCase(TestCase):
+    """Тесты для экспорта и импорта курса архивом."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher,
+            is_published=True
+        )
+        section = Section.objects.create(course=self.course, title='Section', order=0)
+        image_path = default_storage.save('courses/content/pic.png', ContentFile(b'png-bytes'))
+        self.image_url = f'http://old-host{default_storage.url(image_path)}'
+        ContentElement.objects.create(
+            section=section,
+            content_type=ContentElement.ContentType.IMAGE,
+            data={'url': self.image_url, 'type': 'image', 'version': 1},
+            order=0
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.teacher)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_export_import_round_trip(self):
+        """Курс выгружается архивом и загружается обратно с новыми ссылками на медиа."""
+        response = self.client.get(reverse('course-export', kwargs={'pk': self.course.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        archive_bytes = b''.join(response.streaming_content)
+        self.assertIn('media/courses/content/pic.png', zipfile.ZipFile(io.BytesIO(archive_bytes)).namelist())
+
+        upload = SimpleUploadedFile('course.zip', archive_bytes, content_type='application/zip')
+        response = self.client.post(reverse('course-import-archive'), {'archive': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        imported = Course.objects.get(pk=response.data['id'])
+        self.assertFalse(imported.is_published)
+        element = ContentElement.objects.get(section__course=imported)
+        self.assertNotEqual(element.data['url'], self.image_url)
+        self.assertTrue(element.data['url'].startswith('http://testserver/media/courses/content/pic'))
+
+    def test_round_trip_keeps_past_homework_deadline(self):
+        """Курс с прошедшим дедлайном ДЗ выгружается и загружается обратно."""
+        ContentElement.objects.create(
+            section=self.course.sections.get(),
+            content_type=ContentElement.ContentType.HOMEWORK,
+            data={'type': 'homework', 'version': 1, 'deadline': '2020-09-01T12:00:00+00:00'},
+            order=1
+        )
+        archive_bytes = b''.join(
+            self.client.get(reverse('course-export', kwargs={'pk': self.course.id})).streaming_content
+        )
+        upload = SimpleUploadedFile('course.zip', archive_bytes, content_type='application/zip')
+        response = self.client.post(reverse('course-import-archive'), {'archive': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        homework = ContentElement.objects.get(
+            section__course_id=response.data['id'], content_type=ContentElement.ContentType.HOMEWORK
+        )
+        self.assertEqual(homework.data['deadline'], '2020-09-01T12:00:00+00:00')
+
+    def test_import_rejects_invalid_archive(self):
+        """Не-ZIP файл отклоняется с ошибкой 400."""
+        upload = SimpleUploadedFile('course.zip', b'not a zip', content_type='application/zip')
+        response = self.client.post(reverse('course-import-archive'), {'archive': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_rejects_malformed_manifest_without_leaving_files(self):
+        """Манифест неверной структуры или с невалидными блоками - 400, файлы из архива не сохраняются."""
+        archive_bytes = b''.join(
+            self.client.get(reverse('course-export', kwargs={'pk': self.course.id})).streaming_content
+        )
+        manifest = json.loads(zipfile.ZipFile(io.BytesIO(archive_bytes)).read('course.json'))
+        stored_before = sorted(os.listdir(os.path.join(self.media_root, 'courses/content')))
+
+        def broken(change):
+            data = copy.deepcopy(manifest)
+            change(data)
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as archive:
+                archive.writestr('course.json', json.dumps(data))
+                archive.writestr('media/courses/content/pic.png', b'png-bytes')
+            return SimpleUploadedFile('course.zip', buffer.getvalue(), content_type='application/zip')
+
+        changes = [
+            lambda data: data['course'].pop('title'),
+            lambda data: data['course'].update(title='x' * 300),
+            lambda data: data.update(sections={}),
+            lambda data: data['sections'][0].update(order='first'),
+            lambda data: data['sections'][0]['elements'][0].update(content_type='quiz'),
+            lambda data: data['sections'][0]['elements'][0].update(data={'alt': 'без url'}),
+        ]
+        for change in changes:
+            response = self.client.post(
+                reverse('course-import-archive'), {'archive': broken(change)}, format='multipart'
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Course.objects.count(), 1)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.media_root, 'courses/content'))), stored_before)
+
+    def test_export_skips_media_links_outside_storage(self):
+        """Ссылки на /media/../ не попадают в архив и не обрывают выгрузку."""
+        ContentElement.objects.create(
+            section=self.course.sections.get(),
+            content_type=ContentElement.ContentType.TEXT,
+            text_content='<a href="/media/../settings.py">x</a>',
+            order=1
+        )
+        response = self.client.get(reverse('course-export', kwargs={'pk': self.course.id}))
+        names = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))).namelist()
+        self.assertEqual(names, ['course.json', 'media/courses/content/pic.png'])
+
+
+class CourseCloneAPITestCase(TestCase):
+    """Тесты для копирования курса."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher,
+            image='courses/images/cover.jpg',
+            is_published=True
+        )
+        self.publish_at = timezone.now() + timedelta(days=1)
+        section = Section.objects.create(
+            course=self.course,
+            title='Section',
+            publish_datetime=self.publish_at
+        )
+        ContentElement.objects.create(
+            section=section,
+            content_type=ContentElement.ContentType.HOMEWORK,
+            data={'deadline': '2030-09-01T12:00:00+00:00'}
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.teacher)
+
+    def test_clone_shifts_dates_and_shares_media(self):
+        """Копия сдвигает даты публикации и дедлайны и ссылается на те же файлы."""
+        url = reverse('course-clone', kwargs={'pk': self.course.id})
+        response = self.client.post(url, {'offset_days': 365, 'title': 'Copy'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        clone = Course.objects.get(pk=response.data['id'])
+        self.assertEqual(clone.title, 'Copy')
+        self.assertFalse(clone.is_published)
+        self.assertEqual(clone.image.name, 'courses/images/cover.jpg')
+
+        section = clone.sections.get()
+        self.assertEqual(section.publish_datetime, self.publish_at + timedelta(days=365))
+        element = section.elements.get()
+        self.assertEqual(element.data['deadline'], '2031-09-01T12:00:00+00:00')
+
+    def test_clone_rejects_invalid_parameters(self):
+        """Нечисловой или слишком большой сдвиг и длинное название - 400, а не 500."""
+        url = reverse('course-clone', kwargs={'pk': self.course.id})
+        for data in [{'offset_days': 'abc'}, {'offset_days': 10 ** 9}, {'title': 'x' * 256}, {'title': ['a']}]:
+            response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, data)
+        self.assertEqual(Course.objects.count(), 1)
+
+
+class CourseAccessTestCase(TestCase):
+    """Тесты для контекста доступа к курсам."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.student = User.objects.create_user(
+            email='student@test.com',
+            password='testpass123',
+            first_name='Student',
+            last_name='User'
+        )
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher,
+            is_published=True
+        )
+        self.section = Section.objects.create(course=self.course, title='Section')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def test_section_requires_subscription(self):
+        """Раздел доступен студенту только после подписки."""
+        url = reverse('section-detail', kwargs={'pk': self.section.id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.post(reverse('course-subscribe', kwargs={'pk': self.course.id}))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.client.post(reverse('course-unsubscribe', kwargs={'pk': self.course.id}))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_revoked_access_applies_immediately(self):
+        """Отписка и смена владельца курса сразу лишают доступа в следующем запросе."""
+        Subscription.objects.create(user=self.student, course=self.course)
+        self.assertTrue(CourseAccess(self.student).is_subscribed(self.course.id))
+        self.assertTrue(CourseAccess(self.teacher).owns(self.course.id))
+
+        # Изменения в обход сигналов - как из другого процесса
+        Subscription.objects.filter(user=self.student).delete()
+        other = User.objects.create_user(
+            email='other@test.com', password='testpass123', first_name='Other', last_name='Teacher',
+            role=User.Role.TEACHER
+        )
+        Course.objects.filter(pk=self.course.id).update(creator=other)
+
+        self.assertFalse(CourseAccess(self.student).is_subscribed(self.course.id))
+        self.assertFalse(CourseAccess(self.teacher).owns(self.course.id))
+        self.assertTrue(CourseAccess(other).owns(self.course.id))
+
+    def test_stale_cache_rechecked_on_denial(self):
+        """Отказ по устаревшему кэшу перепроверяется по БД."""
+        access = CourseAccess(self.student)
+        self.assertFalse(access.is_subscribed(self.course.id))
+
+        # Подписка без сигналов - кэш остается устаревшим
+        Subscription.objects.bulk_create([Subscription(user=self.student, course=self.course)])
+        self.assertTrue(CourseAccess(self.student).is_subscribed(self.course.id))
+
+
+class BlockRenderingTestCase(TestCase):
+    """Тесты для серверного рендеринга блоков в HTML."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.course = Course.objects.create(title='Test Course', short_description='Test', creator=self.teacher)
+        self.section = Section.objects.create(course=self.course, title='Section')
+
+    def test_sanitize_removes_scripts_handlers_and_unsafe_urls(self):
+        """Из HTML удаляются скрипты, обработчики событий и javascript: ссылки."""
+        html = sanitize_html(
+            '<p onclick="steal()">Hi<script>alert(1)</script> <a href="javascript:alert(1)">x</a>'
+            '<a href="https://example.com" target="_blank">ok</a><img src="data:x" alt="a">'
+        )
+
+        self.assertEqual(
+            html,
+            '<p>Hi <a>x</a><a href="https://example.com" target="_blank" rel="noopener noreferrer">ok</a>'
+            '<img alt="a"></p>'
+        )
+
+    def test_render_blocks_skips_unknown_and_empty(self):
+        """Неизвестные и пустые блоки не попадают в HTML."""
+        html = render_blocks([
+            {'type': 'text', 'data': {'html': '<b>bold</b>'}},
+            {'type': 'unknown', 'data': {'html': 'x'}},
+            {'type': 'link', 'data': {'url': 'javascript:alert(1)'}},
+        ])
+
+        self.assertEqual(html, '<div class="preview-block"><div class="preview-text"><b>bold</b></div></div>')
+
+    def test_save_rerenders_and_locked_element_hides_html(self):
+        """HTML пересчитывается при сохранении и скрыт у заблокированного элемента."""
+        element = ContentElement.objects.create(
+            section=self.section,
+            content_type=ContentElement.ContentType.TEXT,
+            data={'html': '<p>first</p>'},
+            publish_datetime=timezone.now() + timedelta(days=1)
+        )
+        self.assertIn('<p>first</p>', element.rendered_html)
+
+        element.data = {'html': '<p>second</p>'}
+        element.save(update_fields=['data'])
+        element.refresh_from_db()
+        self.assertIn('<p>second</p>', element.rendered_html)
+
+        representation = ContentElementSerializer(element).data
+        self.assertTrue(representation['is_locked'])
+        self.assertEqual(representation['rendered_html'], '')
+
+
+class BlockDataValidatorTestCase(TestCase):
+    """Тесты для валидатора данных блоков."""
+
+    def test_video_providers_detected_by_single_pattern(self):
+        """Провайдер и ID видео определяются одним выражением для всех провайдеров."""
+        cases = {
+            'https://youtu.be/dQw4w9WgXcQ': ('youtube', 'dQw4w9WgXcQ'),
+            'https://vimeo.com/video/76979871': ('vimeo', '76979871'),
+            'https://vkvideo.ru/video-1_2': ('vk', '-1_2'),
+            'https://dzen.ru/embed/abc': ('dzen', 'abc'),
+            'https://player.example.com/embed/42': ('custom', 'https://player.example.com/embed/42'),
+        }
+        for url, (provider, video_id) in cases.items():
+            data = BlockDataValidator.validate('video', {'url': url})
+            self.assertEqual((data['provider'], data['video_id']), (provider, video_id), url)
+
+        data = BlockDataValidator.validate('video', {'url': 'https://rutube.ru/video/private/abc123/?p=key'})
+        self.assertEqual((data['provider'], data['privateKey']), ('rutube', 'key'))
+
+    def test_validate_blocks_reports_all_errors(self):
+        """Список блоков проверяется целиком, ошибки возвращаются для всех блоков."""
+        blocks = [
+            {'type': 'text', 'data': {'html': 'ok'}},
+            {'type': 'link', 'data': {'url': 'ftp://bad'}},
+            {'type': 'homework', 'data': {}},
+            {'type': 'gallery', 'data': {'images': [{'url': '/a.jpg'}, {'url': '/b.jpg', 'alt': 1}]}},
+        ]
+        with self.assertRaises(ValidationError) as context:
+            BlockDataValidator.validate_blocks(blocks, excluded_types={'homework'})
+
+        errors = [str(error) for error in context.exception.detail]
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(errors[0].startswith('Блок 1 (link):'))
+        self.assertTrue(errors[1].startswith('Блок 2:'))
+        self.assertIn("Изображение #2: 'alt'", errors[2])
+
+
+class SubscribersCountTestCase(TestCase):
+    """Тесты для хранимого счетчика подписчиков курса."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f'student{index}@test.com',
+                password='testpass123',
+                first_name='Student',
+                last_name=str(index)
+            )
+            for index in range(3)
+        ]
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher,
+            is_published=True
+        )
+        self.client = APIClient()
+
+    def count(self):
+        self.course.refresh_from_db()
+        return self.course.subscribers_count
+
+    def test_counter_follows_subscriptions_and_cascades(self):
+        """Счетчик меняется при подписке, отписке, удалении подписчика и каскадном удалении."""
+        for student in self.students:
+            self.client.force_authenticate(user=student)
+            self.client.post(reverse('course-subscribe', kwargs={'pk': self.course.id}))
+        # Повторная подписка не меняет счетчик
+        self.client.post(reverse('course-subscribe', kwargs={'pk': self.course.id}))
+        self.assertEqual(self.count(), 3)
+
+        self.client.post(reverse('course-unsubscribe', kwargs={'pk': self.course.id}))
+        self.client.post(reverse('course-unsubscribe', kwargs={'pk': self.course.id}))
+        self.assertEqual(self.count(), 2)
+
+        self.client.force_authenticate(user=self.teacher)
+        self.client.post(
+            reverse('course-remove-subscriber', kwargs={'pk': self.course.id}),
+            {'user_id': self.students[0].id}
+        )
+        self.assertEqual(self.count(), 1)
+
+        self.students[1].delete()
+        self.assertEqual(self.count(), 0)
+
+        response = self.client.get(reverse('course-detail', kwargs={'pk': self.course.id}))
+        self.assertEqual(response.data['subscribers_count'], 0)
+
+    def test_reconcile_fixes_bulk_drift(self):
+        """Подписки через bulk_create не меняют счетчик - сверка его исправляет."""
+        Subscription.objects.bulk_create([Subscription(user=student, course=self.course) for student in self.students])
+        self.assertEqual(self.count(), 0)
+
+        self.assertEqual(reconcile_subscribers_count(), [(self.course.id, 0, 3)])
+        self.assertEqual(self.count(), 3)
+        self.assertEqual(reconcile_subscribers_count([self.course.id]), [])
+
+
+class EnrollAPITestCase(TestCase):
+    """Тесты для идемпотентной и пакетной подписки."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.students = [
+            User.objects.create_user(
+                email=f'student{index}@test.com',
+                password='testpass123',
+                first_name='Student',
+                last_name=str(index),
+                grade=7 if index < 2 else 8
+            )
+            for index in range(3)
+        ]
+        self.course = Course.objects.create(
+            title='Test Course',
+            short_description='Test',
+            creator=self.teacher,
+            is_published=True
+        )
+        self.draft = Course.objects.create(title='Draft', short_description='Test', creator=self.teacher)
+        self.client = APIClient()
+
+    def test_subscribe_is_single_idempotent_statement(self):
+        """Подписка - один INSERT; повтор не создает дубль и не падает, скрытый курс - 404."""
+        self.client.force_authenticate(user=self.students[0])
+        url = reverse('course-subscribe', kwargs={'pk': self.course.id})
+        with self.assertNumQueries(4):
+            # INSERT ... ON CONFLICT, UPDATE счетчика и SAVEPOINT/RELEASE транзакции
+            response = self.client.post(url)
+        self.assertEqual(response.data['status'], 'Вы подписались на курс')
+
+        response = self.client.post(url)
+        self.assertEqual(response.data['status'], 'Вы уже подписаны на этот курс')
+        self.assertEqual(Subscription.objects.filter(course=self.course).count(), 1)
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, 1)
+
+        response = self.client.post(reverse('course-subscribe', kwargs={'pk': self.draft.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(create_subscriptions(Course.objects.none(), 'id', 'id'), [])
+
+    def test_enroll_user_ids_and_grade(self):
+        """Пакетная подписка списка пользователей и класса пропускает уже подписанных."""
+        url = reverse('course-enroll', kwargs={'pk': self.course.id})
+        self.client.force_authenticate(user=self.students[0])
+        self.assertEqual(self.client.post(url, {'grade': 7}, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.post(url, {'user_ids': [self.students[0].id, 999999]}, format='json')
+        self.assertEqual(response.data, {'enrolled': 1, 'user_ids': [self.students[0].id]})
+
+        response = self.client.post(url, {'grade': 7}, format='json')
+        self.assertEqual(response.data, {'enrolled': 1, 'user_ids': [self.students[1].id]})
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, 2)
+
+        response = self.client.post(url, {'grade': 7, 'user_ids': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, {'user_ids': [2 ** 63]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            reverse('course-remove-subscriber', kwargs={'pk': self.course.id}), {'user_id': 2 ** 64}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('course-subscribe', kwargs={'pk': 2 ** 64}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_enroll_roster_reports_each_row(self):
+        """CSV-ростер: подписка найденных пользователей и результат по каждой строке."""
+        Subscription.objects.create(user=self.students[1], course=self.course)
+        roster = SimpleUploadedFile('roster.csv', (
+            '\ufeffФИО;Email\n'
+            'Ученик 0;student0@TEST.com\n'
+            'Ученик 1;student1@test.com\n'
+            'Ученик 0;student0@test.com\n'
+            'Ученик 9;nobody@test.com\n'
+            'Ученик ?;not-an-email\n'
+        ).encode('utf-8'), content_type='text/csv')
+
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.post(
+            reverse('course-enroll', kwargs={'pk': self.course.id}), {'roster': roster}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user_ids'], [self.students[0].id])
+        self.assertEqual(
+            [(row['row'], row['status']) for row in response.data['rows']],
+            [(2, 'enrolled'), (3, 'already_subscribed'), (4, 'duplicate'), (5, 'not_found'), (6, 'invalid')]
+        )
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, 2)
+
+        response = self.client.post(
+            reverse('course-enroll', kwargs={'pk': self.course.id}),
+            {'roster': SimpleUploadedFile('roster.csv', b'\xff\xfe')}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_enroll_by_city_and_role_filter(self):
+        """Фильтр по городу и роли объединяется через И, команда делает то же по ростеру."""
+        User.objects.filter(pk=self.students[2].pk).update(city='Казань')
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.post(
+            reverse('course-enroll', kwargs={'pk': self.course.id}),
+            {'city': 'Казань', 'role': User.Role.USER}, format='json'
+        )
+        self.assertEqual(response.data['user_ids'], [self.students[2].id])
+
+        roster = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        roster.write('student0@test.com\nstudent2@test.com\n')
+        roster.close()
+        self.addCleanup(os.remove, roster.name)
+        out = io.StringIO()
+        call_command('enroll_course', str(self.course.id), '--roster', roster.name, stdout=out)
+        self.assertIn('already_subscribed: 1, enrolled: 1', out.getvalue())
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.subscribers_count, 2)
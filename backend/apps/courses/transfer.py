@@ -0,0 +1,430 @@
+"""
+Перенос и копирование курсов.
+
+Экспорт упаковывает курс с разделами, элементами (включая JSON data) и всеми
+медиафайлами, на которые они ссылаются, в один ZIP-архив:
+
+    course.json      - структура курса
+    media/<путь>     - файлы из хранилища под своими исходными путями
+
+Экспорт отдается потоком (файлы читаются из хранилища чанками), импорт
+создает разделы и элементы через bulk_create и переписывает ссылки на медиа
+в data на новые пути в хранилище.
+
+Копирование внутри инсталляции (clone_course) не трогает файлы: копия
+ссылается на те же медиафайлы.
+"""
+
+import copy
+import json
+import re
+import zipfile
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers
+
+from apps.core.utils import stream_zip
+from apps.search.indexing import schedule_course_tree
+from .models import Course, Section, ContentElement
+from .serializers import _error_messages, _prepare_block_data
+
+ARCHIVE_VERSION = 1
+MANIFEST_NAME = 'course.json'
+MEDIA_PREFIX = 'media/'
+
+COURSE_FIELDS = ['title', 'short_description', 'description']
+SECTION_FIELDS = ['title', 'order', 'is_published']
+ELEMENT_FIELDS = [
+    'content_type', 'title', 'text_content', 'link_url', 'link_text',
+    'homework_description', 'data', 'order', 'is_published'
+]
+
+# Ссылка на файл из MEDIA_URL, абсолютная (с хостом) или относительная
+MEDIA_URL_RE = re.compile(
+    r'(?:https?://[^/\s"\'<>]+)?' + re.escape(settings.MEDIA_URL) + r'([^\s"\'<>?#]+)'
+)
+
+
+class CourseArchiveError(Exception):
+    """Архив курса поврежден или имеет неподдерживаемый формат"""
+
+
+def _iter_strings(value):
+    """Обходит все строки во вложенной JSON-структуре"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_strings(item)
+
+
+def _rewrite_strings(value, replace):
+    """Возвращает копию JSON-структуры с примененной к строкам функцией replace"""
+    if isinstance(value, str):
+        return replace(value)
+    if isinstance(value, dict):
+        return {key: _rewrite_strings(item, replace) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rewrite_strings(item, replace) for item in value]
+    return value
+
+
+def _is_safe_media_path(path) -> bool:
+    """Относительный путь в хранилище без выхода за его пределы"""
+    return isinstance(path, str) and bool(path) and not path.startswith('/') and '..' not in path.split('/')
+
+
+def _media_paths_in(value) -> set:
+    """Пути в хранилище, на которые ссылаются строки JSON-структуры"""
+    paths = set()
+    for string in _iter_strings(value):
+        paths.update(match.group(1) for match in MEDIA_URL_RE.finditer(string))
+    # Ссылки вида /media/../x хранилище не откроет (SuspiciousFileOperation) - не экспортируем
+    return {path for path in paths if _is_safe_media_path(path)}
+
+
+def _datetime_to_json(value):
+    return value.isoformat() if value else None
+
+
+def build_course_manifest(course: Course) -> dict:
+    """
+    Собирает описание курса для архива.
+
+    Загружает разделы и элементы двумя запросами.
+
+    Returns:
+        Словарь со структурой курса и списком путей медиафайлов
+    """
+    media = set()
+
+    course_data = {field: getattr(course, field) for field in COURSE_FIELDS}
+    for field in ['image', 'thumbnail']:
+        file = getattr(course, field)
+        course_data[field] = file.name if file else None
+        if file:
+            media.add(file.name)
+    media.update(_media_paths_in(course.description))
+
+    sections = list(course.sections.order_by('order', 'created_at').prefetch_related('elements'))
+    sections_data = []
+    for section in sections:
+        section_data = {field: getattr(section, field) for field in SECTION_FIELDS}
+        section_data['publish_datetime'] = _datetime_to_json(section.publish_datetime)
+        section_data['elements'] = []
+
+        for element in section.elements.all():
+            element_data = {field: getattr(element, field) for field in ELEMENT_FIELDS}
+            element_data['publish_datetime'] = _datetime_to_json(element.publish_datetime)
+            element_data['image'] = element.image.name if element.image else None
+            if element.image:
+                media.add(element.image.name)
+            media.update(_media_paths_in(element.data))
+            media.update(_media_paths_in(element.text_content))
+            section_data['elements'].append(element_data)
+
+        sections_data.append(section_data)
+
+    return {
+        'version': ARCHIVE_VERSION,
+        'course': course_data,
+        'sections': sections_data,
+        'media': sorted(media),
+    }
+
+
+def export_course_stream(course: Course) -> Iterator[bytes]:
+    """
+    Генерирует ZIP-архив курса по частям.
+
+    Медиафайлы, отсутствующие в хранилище, пропускаются.
+    """
+    manifest = build_course_manifest(course)
+
+    def entries():
+        yield MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+        for path in manifest['media']:
+            yield MEDIA_PREFIX + path, path
+
+    return stream_zip(entries())
+
+
+def _check_fields(data, model, names, where: str, optional=()):
+    """
+    Проверяет словарь из манифеста по полям модели: наличие, тип, длину и choices.
+
+    Поля из optional могут отсутствовать или быть None.
+    """
+    if not isinstance(data, dict):
+        raise CourseArchiveError(f'{where}: ожидается объект')
+    for name in names:
+        if name not in data or data[name] is None:
+            if name in optional:
+                continue
+            raise CourseArchiveError(f'{where}: отсутствует поле {name}')
+        value = data[name]
+        field = model._meta.get_field(name)
+        if isinstance(field, models.BooleanField):
+            valid = isinstance(value, bool)
+        elif isinstance(field, models.PositiveIntegerField):
+            valid = isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 2 ** 31 - 1
+        elif isinstance(field, models.JSONField):
+            valid = isinstance(value, dict)
+        elif isinstance(field, models.DateTimeField):
+            try:
+                valid = isinstance(value, str) and parse_datetime(value) is not None
+            except ValueError:
+                valid = False
+        else:
+            # Текстовые поля и пути файлов
+            valid = isinstance(value, str) and (field.max_length is None or len(value) <= field.max_length)
+            if valid and isinstance(field, models.FileField):
+                valid = _is_safe_media_path(value)
+        if valid and field.choices:
+            valid = value in {choice for choice, _ in field.flatchoices}
+        if not valid:
+            raise CourseArchiveError(f'{where}: недопустимое значение поля {name}')
+
+
+def _validate_manifest(manifest: dict):
+    """
+    Проверяет структуру манифеста до записи файлов и курса.
+
+    Данные блоков проходят BlockDataValidator так же, как при
+    редактировании курса, кроме запрета прошедших дедлайнов ДЗ;
+    нормализованные данные записываются обратно.
+
+    Raises:
+        CourseArchiveError: При любом несоответствии формату
+    """
+    if not isinstance(manifest, dict):
+        raise CourseArchiveError(f'{MANIFEST_NAME} должен содержать объект')
+    if manifest.get('version') != ARCHIVE_VERSION:
+        raise CourseArchiveError(f'Неподдерживаемая версия архива: {manifest.get("version")}')
+
+    media = manifest.get('media', [])
+    if not isinstance(media, list) or not all(isinstance(path, str) for path in media):
+        raise CourseArchiveError('media: ожидается список путей')
+    for path in media:
+        if not _is_safe_media_path(path):
+            raise CourseArchiveError(f'Недопустимый путь файла в архиве: {path}')
+
+    _check_fields(
+        manifest.get('course'), Course, COURSE_FIELDS + ['image', 'thumbnail'], 'course',
+        optional={'description', 'image', 'thumbnail'}
+    )
+
+    sections = manifest.get('sections', [])
+    if not isinstance(sections, list):
+        raise CourseArchiveError('sections: ожидается список')
+    for section_index, section_data in enumerate(sections):
+        where = f'sections[{section_index}]'
+        _check_fields(section_data, Section, SECTION_FIELDS + ['publish_datetime'], where, optional={'publish_datetime'})
+        elements = section_data.get('elements', [])
+        if not isinstance(elements, list):
+            raise CourseArchiveError(f'{where}.elements: ожидается список')
+
+        for element_index, element_data in enumerate(elements):
+            element_where = f'{where}.elements[{element_index}]'
+            _check_fields(
+                element_data, ContentElement, ELEMENT_FIELDS + ['publish_datetime', 'image'], element_where,
+                optional={'text_content', 'publish_datetime', 'image'}
+            )
+            if not element_data['data']:
+                continue
+            try:
+                # Дедлайны ДЗ в выгруженном курсе могли пройти - проверяем только структуру блока
+                element_data['data'] = _prepare_block_data(
+                    element_data['content_type'], element_data['data'], allow_past_deadline=True
+                )
+            except serializers.ValidationError as e:
+                raise CourseArchiveError(f'{element_where}.data: {"; ".join(_error_messages(e.detail))}')
+
+
+def import_course(archive_file, creator, base_url: Optional[str] = None) -> Course:
+    """
+    Создает курс из архива, полученного export_course_stream.
+
+    Манифест проверяется целиком до записи чего-либо. Медиафайлы сохраняются
+    в хранилище (при совпадении имен хранилище выбирает новое имя), ссылки
+    в data и HTML переписываются на новые пути. Если создать курс не удалось,
+    сохраненные файлы удаляются. Курс создается черновиком от имени creator.
+
+    Args:
+        archive_file: Путь к архиву или файловый объект с поддержкой seek
+        creator: Пользователь-владелец нового курса
+        base_url: Префикс для ссылок на медиа (например, https://portal.ru).
+            Если не указан - ссылки остаются относительными
+
+    Raises:
+        CourseArchiveError: При поврежденном архиве, неизвестной версии или
+            недопустимом содержимом манифеста
+    """
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile:
+        raise CourseArchiveError('Файл не является ZIP-архивом')
+
+    saved_paths = {}
+    try:
+        with archive:
+            try:
+                manifest = json.loads(archive.read(MANIFEST_NAME).decode('utf-8'))
+            except (KeyError, ValueError):
+                raise CourseArchiveError(f'В архиве отсутствует корректный {MANIFEST_NAME}')
+            _validate_manifest(manifest)
+
+            archive_names = set(archive.namelist())
+            for path in manifest.get('media', []):
+                arcname = MEDIA_PREFIX + path
+                if arcname not in archive_names:
+                    continue
+                with archive.open(arcname) as source:
+                    saved_paths[path] = default_storage.save(path, File(source, name=path))
+
+        return _create_imported_course(manifest, creator, saved_paths, base_url)
+    except Exception:
+        # Курс не создан - файлы, сохраненные для него, никому не нужны
+        for path in saved_paths.values():
+            default_storage.delete(path)
+        raise
+
+
+def _create_imported_course(manifest: dict, creator, saved_paths: dict, base_url: Optional[str]) -> Course:
+    """Создает курс, разделы и элементы из проверенного манифеста одной транзакцией"""
+    def media_url(path):
+        url = default_storage.url(path)
+        if base_url and not url.startswith('http'):
+            url = base_url.rstrip('/') + url
+        return url
+
+    def replace_media_urls(string):
+        def replace(match):
+            new_path = saved_paths.get(match.group(1))
+            return media_url(new_path) if new_path else match.group(0)
+        return MEDIA_URL_RE.sub(replace, string)
+
+    def stored(path):
+        return saved_paths.get(path) if path else None
+
+    course_data = manifest['course']
+
+    with transaction.atomic():
+        course = Course.objects.create(
+            creator=creator,
+            is_published=False,
+            title=course_data['title'],
+            short_description=course_data['short_description'],
+            description=replace_media_urls(course_data.get('description') or ''),
+            image=stored(course_data.get('image')),
+            thumbnail=stored(course_data.get('thumbnail')),
+        )
+
+        sections = []
+        for section_data in manifest.get('sections', []):
+            sections.append(Section(
+                course=course,
+                publish_datetime=parse_datetime(section_data.get('publish_datetime') or ''),
+                **{field: section_data[field] for field in SECTION_FIELDS}
+            ))
+        Section.objects.bulk_create(sections)
+
+        elements = []
+        for section, section_data in zip(sections, manifest.get('sections', [])):
+            for element_data in section_data.get('elements', []):
+                fields = {field: element_data.get(field) for field in ELEMENT_FIELDS}
+                fields['data'] = _rewrite_strings(fields['data'], replace_media_urls)
+                fields['text_content'] = replace_media_urls(fields['text_content'] or '')
+                elements.append(ContentElement(
+                    section=section,
+                    image=stored(element_data.get('image')),
+                    publish_datetime=parse_datetime(element_data.get('publish_datetime') or ''),
+                    **fields
+                ))
+        for element in elements:
+            element.render_html()
+        ContentElement.objects.bulk_create(elements, batch_size=500)
+        schedule_course_tree(course.id)
+
+    return course
+
+
+def _shift_datetime_string(value, offset: timedelta):
+    """Сдвигает дату в ISO-строке, сохраняя исходное значение при ошибке разбора"""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return value
+    return (parsed + offset).isoformat()
+
+
+def clone_course(course: Course, creator, offset: timedelta = timedelta(0), title: Optional[str] = None) -> Course:
+    """
+    Создает копию курса со всеми разделами и элементами.
+
+    Разделы и элементы вставляются через bulk_create. Даты публикации
+    (publish_datetime) и дедлайны ДЗ (data.deadline) сдвигаются на offset.
+    Медиафайлы не копируются: копия ссылается на те же файлы в хранилище.
+    Это безопасно, так как удаление курса или элемента не удаляет файлы,
+    а замена изображения в любой из копий сохраняет новый файл.
+
+    Args:
+        course: Исходный курс
+        creator: Владелец копии
+        offset: Сдвиг дат публикации и дедлайнов
+        title: Название копии (по умолчанию - название исходного курса)
+
+    Returns:
+        Новый курс-черновик
+    """
+    sections = list(course.sections.order_by('order', 'created_at').prefetch_related('elements'))
+
+    with transaction.atomic():
+        clone = Course.objects.create(
+            creator=creator,
+            is_published=False,
+            title=title or course.title,
+            short_description=course.short_description,
+            description=course.description,
+            image=course.image.name or None,
+            thumbnail=course.thumbnail.name or None,
+        )
+
+        new_sections = [
+            Section(
+                course=clone,
+                publish_datetime=section.publish_datetime + offset if section.publish_datetime else None,
+                **{field: getattr(section, field) for field in SECTION_FIELDS}
+            )
+            for section in sections
+        ]
+        Section.objects.bulk_create(new_sections)
+
+        new_elements = []
+        for section, new_section in zip(sections, new_sections):
+            for element in section.elements.all():
+                fields = {field: getattr(element, field) for field in ELEMENT_FIELDS}
+                fields['data'] = copy.deepcopy(element.data)
+                if offset and isinstance(fields['data'], dict) and fields['data'].get('deadline'):
+                    fields['data']['deadline'] = _shift_datetime_string(fields['data']['deadline'], offset)
+                new_elements.append(ContentElement(
+                    section=new_section,
+                    image=element.image.name or None,
+                    publish_datetime=element.publish_datetime + offset if element.publish_datetime else None,
+                    **fields
+                ))
+        for element in new_elements:
+            element.render_html()
+        ContentElement.objects.bulk_create(new_elements, batch_size=500)
+        schedule_course_tree(clone.id)
+
+    return clone
@@ -5,11 +5,14 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, IntegerField, Prefetch, Q, Value, prefetch_related_objects
 from django.core.files.storage import default_storage
 import os
+import re
+from collections import Counter
 
 from .models import (
     Course,
@@ -23,6 +26,9 @@ from .serializers import (
     CourseListSerializer,
     CourseDetailSerializer,
     CourseAdminSerializer,
+    CourseBatchSerializer,
+    CourseCloneSerializer,
+    EnrollSerializer,
     SectionSerializer,
     SectionListSerializer,
     ContentElementSerializer,
@@ -30,11 +36,21 @@ from .serializers import (
     HomeworkSubmissionSerializer,
     HomeworkReviewHistorySerializer,
     SubscriptionSerializer,
-    CourseScheduleItemSerializer
+    CourseScheduleItemSerializer,
+    MAX_ID
 )
 from apps.users.permissions import IsAdmin, IsTeacher, IsOwnerOrAdmin
 from apps.users.serializers import UserPublicSerializer
+from apps.core.mixins import BulkReorderMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.utils import stream_zip
+from apps.search.filters import FullTextSearchFilter
+from apps.search.models import SearchDocument
+from .access import get_course_access
 from .permissions import IsAccessibleOrAdmin, IsCourseSubscriberOrAdmin
+from .enrollment import RosterError, RowStatus, enroll_roster, enroll_users, read_roster
+from .subscriptions import create_subscriptions, delete_subscriptions
+from .transfer import CourseArchiveError, clone_course, export_course_stream, import_course
 
 
 class IsCourseOwnerOrAdmin(permissions.BasePermission):
@@ -49,22 +65,24 @@ class IsCourseOwnerOrAdmin(permissions.BasePermission):
         if request.user.is_admin or request.user.is_teacher:
             # Для создания Section - проверяем владельца курса
             if view.action == 'create':
+                if request.user.is_admin:
+                    return True
+
+                access = get_course_access(request)
                 course_id = request.data.get('course')
                 if course_id:
-                    try:
-                        course = Course.objects.get(pk=course_id)
-                        return course.creator == request.user or request.user.is_admin
-                    except Course.DoesNotExist:
-                        return False
+                    return access.owns(course_id)
 
                 # Для создания ContentElement - проверяем через section
                 section_id = request.data.get('section')
                 if section_id:
                     try:
-                        section = Section.objects.get(pk=section_id)
-                        return section.course.creator == request.user or request.user.is_admin
-                    except Section.DoesNotExist:
+                        course_id = Section.objects.filter(pk=section_id).values_list(
+                            'course_id', flat=True
+                        ).first()
+                    except (TypeError, ValueError):
                         return False
+                    return access.owns(course_id)
 
             return True
 
@@ -73,17 +91,18 @@ class IsCourseOwnerOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user.is_admin:
             return True
+        access = get_course_access(request)
         # Для Section и ContentElement - проверяем владельца курса
         if hasattr(obj, 'course'):
-            return obj.course.creator == request.user
+            return access.owns(obj.course_id)
         if hasattr(obj, 'section'):
-            return obj.section.course.creator == request.user
+            return access.owns(obj.section.course_id)
         # Для HomeworkSubmission - проверяем владельца курса через element
         if hasattr(obj, 'element'):
-            return obj.element.section.course.creator == request.user
+            return access.owns(obj.element.section.course_id)
         # Для Course
         if hasattr(obj, 'creator'):
-            return obj.creator == request.user
+            return access.owns(obj.id)
         return False
 
 
@@ -108,11 +127,57 @@ class IsCourseOwnerForHomework(permissions.BasePermission):
 
         # Проверяем, что пользователь является владельцем курса
         # obj - это HomeworkSubmission
-        # element.section.course.creator
-        return obj.element.section.course.creator == request.user
+        # element.section.course
+        return get_course_access(request).owns(obj.element.section.course_id)
+
+
+def _parse_id(value):
+    """ID из параметров запроса или None, если это не положительное целое в пределах BIGINT"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if 0 < value <= MAX_ID else None
+
+
+def _course_cards(queryset):
+    """Курсы с автором для CourseListSerializer (число подписчиков хранится в курсе)"""
+    return queryset.select_related('creator')
+
+
+def _elements_prefetch(user, lookup='elements'):
+    """
+    Prefetch элементов раздела вместе с ответами пользователя.
+
+    ContentElementDetailSerializer.get_my_submission берет ответ из
+    user_submissions вместо запроса на каждый элемент.
+    """
+    submissions = HomeworkSubmission.objects.select_related('user', 'element__section__course')
+    submissions = submissions.filter(user=user) if user.is_authenticated else submissions.none()
+    return Prefetch(lookup, queryset=ContentElement.objects.prefetch_related(
+        Prefetch('submissions', queryset=submissions, to_attr='user_submissions')
+    ))
+
+
+def _is_available(item, now):
+    """Опубликован и не заблокирован по дате открытия"""
+    return item.is_published and (item.publish_datetime is None or item.publish_datetime <= now)
 
 
-def _get_homework_schedule_for_course(course, user, now):
+def _user_submissions(user, course_ids):
+    """
+    Ответы пользователя на ДЗ курсов одним запросом: {element_id: последний ответ}.
+    """
+    submissions = {}
+    for submission in HomeworkSubmission.objects.filter(
+        user=user,
+        element__section__course_id__in=course_ids
+    ).order_by('-submitted_at', '-id'):
+        submissions.setdefault(submission.element_id, submission)
+    return submissions
+
+
+def _get_homework_schedule_for_course(course, user, now, submissions):
     """
     Получает список ДЗ с дедлайнами для конкретного курса.
 
@@ -120,25 +185,24 @@ def _get_homework_schedule_for_course(course, user, now):
     - С установленным дедлайном
     - Без ответа от пользователя ИЛИ ответ требует доработки
     - Из опубликованных и разблокированных разделов/элементов
+
+    Разделы и элементы берутся через course.sections.all() и
+    section.elements.all(), поэтому вызывающий код должен загрузить их
+    через prefetch_related('sections__elements'). Ответы пользователя
+    передаются словарем из _user_submissions.
     """
     from datetime import datetime
     homework_items = []
 
-    # Получаем все разделы курса (опубликованные и разблокированные)
-    sections = course.sections.filter(
-        is_published=True
-    ).filter(
-        Q(publish_datetime__isnull=True) | Q(publish_datetime__lte=now)
-    ).prefetch_related('elements')
+    # Все разделы курса (опубликованные и разблокированные)
+    sections = [section for section in course.sections.all() if _is_available(section, now)]
 
     for section in sections:
-        # Получаем все элементы типа homework с дедлайном
-        homework_elements = section.elements.filter(
-            content_type=ContentElement.ContentType.HOMEWORK,
-            is_published=True
-        ).filter(
-            Q(publish_datetime__isnull=True) | Q(publish_datetime__lte=now)
-        )
+        # Все элементы типа homework
+        homework_elements = [
+            element for element in section.elements.all()
+            if element.content_type == ContentElement.ContentType.HOMEWORK and _is_available(element, now)
+        ]
 
         for hw_element in homework_elements:
             deadline = hw_element.data.get('deadline') if hw_element.data else None
@@ -161,10 +225,7 @@ def _get_homework_schedule_for_course(course, user, now):
                 continue  # Пропускаем если не удалось распарсить
 
             # Проверяем наличие ответа
-            submission = HomeworkSubmission.objects.filter(
-                element=hw_element,
-                user=user
-            ).first()
+            submission = submissions.get(hw_element.id)
 
             has_submission = submission is not None
             submission_status = submission.status if submission else None
@@ -192,6 +253,36 @@ def _get_homework_schedule_for_course(course, user, now):
     return homework_items
 
 
+def _archive_safe_name(value):
+    """Убирает из имени символы, недопустимые в путях внутри архива"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', value).strip('_')
+
+
+def _submission_archive_entries(submissions, per_element=False):
+    """
+    Формирует пары (имя в архиве, путь в хранилище) для ответов на ДЗ.
+
+    Файлы называются по студенту: Фамилия_Имя_<id ответа>.<расширение>.
+    При выгрузке раздела ответы раскладываются по папкам элементов.
+    Queryset итерируется через iterator(), чтобы не держать все строки в памяти.
+    """
+    for submission in submissions.iterator(chunk_size=500):
+        if not submission.file:
+            continue
+
+        user = submission.user
+        student = _archive_safe_name(f'{user.last_name}_{user.first_name}') or f'user_{user.id}'
+        extension = os.path.splitext(submission.file.name)[1]
+        arcname = f'{student}_{submission.id}{extension}'
+
+        if per_element:
+            element = submission.element
+            folder = _archive_safe_name(element.title or 'Домашнее задание')
+            arcname = f'{element.order:02d}_{folder}_{element.id}/{arcname}'
+
+        yield arcname, submission.file.name
+
+
 def _get_locked_content_for_course(course, user, now):
     """
     Получает заблокированные материалы для курса.
@@ -201,8 +292,8 @@ def _get_locked_content_for_course(course, user, now):
     """
     locked_items = []
 
-    # Получаем все разделы курса
-    sections = course.sections.filter(is_published=True)
+    # Опубликованные разделы курса (из prefetch_related('sections__elements'))
+    sections = [section for section in course.sections.all() if section.is_published]
 
     for section in sections:
         # Если раздел заблокирован
@@ -223,8 +314,8 @@ def _get_locked_content_for_course(course, user, now):
                 'submission_status': None,
             })
 
-        # Получаем элементы раздела
-        elements = section.elements.filter(is_published=True)
+        # Опубликованные элементы раздела
+        elements = [element for element in section.elements.all() if element.is_published]
 
         for element in elements:
             # Если элемент заблокирован
@@ -250,20 +341,29 @@ def _get_locked_content_for_course(course, user, now):
 
 class CourseViewSet(viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'short_description']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
+    search_entity = SearchDocument.Entity.COURSE
     ordering_fields = ['created_at', 'title']
 
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated and user.is_admin:
-            return Course.objects.all()
-        if user.is_authenticated and user.is_teacher:
+            queryset = Course.objects.all()
+        elif user.is_authenticated and user.is_teacher:
             # Преподаватель видит опубликованные курсы + свои собственные (включая черновики)
-            return Course.objects.filter(
+            queryset = Course.objects.filter(
                 Q(is_published=True) | Q(creator=user)
             )
-        return Course.objects.filter(is_published=True)
+        else:
+            queryset = Course.objects.filter(is_published=True)
+
+        if self.action in ['list', 'latest']:
+            return _course_cards(queryset)
+        if self.action == 'retrieve':
+            return _course_cards(queryset).prefetch_related(
+                Prefetch('sections', queryset=Section.objects.prefetch_related(_elements_prefetch(user)))
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -279,37 +379,70 @@ class CourseViewSet(viewsets.ModelViewSet):
             return [IsTeacher()]
         if self.action in ['subscribe', 'unsubscribe', 'my_courses', 'schedule']:
             return [permissions.IsAuthenticated()]
-        if self.action in ['created_courses', 'drafts']:
+        if self.action in ['created_courses', 'drafts', 'import_archive']:
             return [IsTeacher()]
         return [IsCourseOwnerOrAdmin()]
 
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user)
 
+    def _course_pk(self) -> int:
+        """ID курса из URL без загрузки курса"""
+        course_id = _parse_id(self.kwargs['pk'])
+        if course_id is None:
+            raise Http404
+        return course_id
+
     @action(detail=True, methods=['post'])
     def subscribe(self, request, pk=None):
         """Подписаться на курс"""
-        course = self.get_object()
-        subscription, created = Subscription.objects.get_or_create(
-            user=request.user,
-            course=course
-        )
-        if created:
+        # Один INSERT ... SELECT из видимых пользователю курсов вместо get_object + get_or_create
+        course = self.get_queryset().filter(pk=self._course_pk())
+        if create_subscriptions(course, Value(request.user.id, output_field=IntegerField()), 'id'):
             return Response({'status': 'Вы подписались на курс'})
+        if not course.exists():
+            raise Http404
         return Response({'status': 'Вы уже подписаны на этот курс'})
 
     @action(detail=True, methods=['post'])
     def unsubscribe(self, request, pk=None):
         """Отписаться от курса"""
-        course = self.get_object()
-        deleted, _ = Subscription.objects.filter(
-            user=request.user,
-            course=course
-        ).delete()
-        if deleted:
+        if delete_subscriptions(self._course_pk(), [request.user.id]):
             return Response({'status': 'Вы отписались от курса'})
         return Response({'status': 'Вы не были подписаны на этот курс'})
 
+    @action(detail=True, methods=['post'], permission_classes=[IsCourseOwnerOrAdmin])
+    def enroll(self, request, pk=None):
+        """
+        Пакетная подписка на курс.
+
+        Request body (JSON или multipart/form-data), ровно один источник:
+            user_ids (list): ID пользователей
+            roster (file): CSV-ростер с email, в ответе - результат по каждой строке
+            grade, city, role: фильтр пользователей, условия объединяются через И
+        """
+        course = self.get_object()
+        serializer = EnrollSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        roster = serializer.validated_data.get('roster')
+        if roster is None:
+            user_ids = enroll_users(course, serializer.get_users())
+            return Response({'enrolled': len(user_ids), 'user_ids': user_ids})
+
+        try:
+            rows = read_roster(roster)
+        except RosterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        report = enroll_roster(course, rows)
+        user_ids = sorted(entry['user_id'] for entry in report if entry['status'] == RowStatus.ENROLLED)
+        return Response({
+            'enrolled': len(user_ids),
+            'user_ids': user_ids,
+            'summary': Counter(entry['status'] for entry in report),
+            'rows': report,
+        })
+
     @action(detail=True, methods=['get'], permission_classes=[IsCourseOwnerOrAdmin])
     def subscribers(self, request, pk=None):
         """Список подписчиков курса"""
@@ -328,18 +461,22 @@ class CourseViewSet(viewsets.ModelViewSet):
                 {'error': 'Укажите user_id'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        deleted, _ = Subscription.objects.filter(
-            user_id=user_id,
-            course=course
-        ).delete()
-        if deleted:
+        user_id = _parse_id(user_id)
+        if user_id is None:
+            return Response(
+                {'error': 'Некорректный user_id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if delete_subscriptions(course.id, [user_id]):
             return Response({'status': 'Подписчик удален'})
         return Response({'status': 'Подписчик не найден'})
 
     @action(detail=False, methods=['get'])
     def my_courses(self, request):
         """Курсы, на которые подписан текущий пользователь"""
-        subscriptions = Subscription.objects.filter(user=request.user)
+        subscriptions = Subscription.objects.filter(user=request.user).prefetch_related(
+            Prefetch('course', queryset=_course_cards(Course.objects.all()))
+        )
         serializer = SubscriptionSerializer(
             subscriptions,
             many=True,
@@ -361,17 +498,117 @@ class CourseViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def created_courses(self, request):
         """Курсы, созданные текущим пользователем"""
-        courses = Course.objects.filter(creator=request.user)
+        courses = _course_cards(Course.objects.filter(creator=request.user))
         serializer = CourseListSerializer(courses, many=True, context={'request': request})
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def drafts(self, request):
         """Черновики курсов текущего пользователя"""
-        drafts = Course.objects.filter(creator=request.user, is_published=False)
+        drafts = _course_cards(Course.objects.filter(creator=request.user, is_published=False))
         serializer = CourseListSerializer(drafts, many=True, context={'request': request})
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'], permission_classes=[IsCourseOwnerOrAdmin])
+    def batch(self, request, pk=None):
+        """
+        Пакетное редактирование разделов и элементов курса.
+
+        Права владельца проверяются один раз для курса, все блоки валидируются
+        до записи, изменения применяются одной транзакцией.
+
+        Ожидаемый формат:
+        {
+            "sections": [
+                {"id": 1, "title": "...", "order": 0, "elements": [
+                    {"id": 10, "order": 0},
+                    {"content_type": "text", "data": {"html": "..."}, "order": 1}
+                ]},
+                {"title": "Новый раздел", "order": 1, "elements": [...]}
+            ],
+            "delete_sections": [3],
+            "delete_elements": [7, 8]
+        }
+
+        Returns:
+            Счетчики изменений и ID разделов/элементов в порядке запроса
+        """
+        course = self.get_object()
+        serializer = CourseBatchSerializer(
+            data=request.data,
+            context={'request': request, 'course': course}
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save())
+
+    @action(detail=True, methods=['get'], permission_classes=[IsCourseOwnerOrAdmin])
+    def export(self, request, pk=None):
+        """
+        Выгрузить курс со всеми разделами, элементами и медиафайлами в ZIP-архив.
+
+        Архив отдается потоком и может быть загружен обратно через import.
+        """
+        course = self.get_object()
+        response = StreamingHttpResponse(export_course_stream(course), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="course_{course.id}.zip"'
+        return response
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        parser_classes=[MultiPartParser, FormParser],
+        permission_classes=[IsTeacher]
+    )
+    def import_archive(self, request):
+        """
+        Создать курс-черновик из архива, полученного через export.
+
+        Request body (multipart/form-data):
+            archive (обязательно): ZIP-архив курса
+        """
+        archive = request.FILES.get('archive')
+        if not archive:
+            return Response(
+                {'error': 'Файл архива не предоставлен'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            course = import_course(
+                archive,
+                creator=request.user,
+                base_url=request.build_absolute_uri('/')[:-1]
+            )
+        except CourseArchiveError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = CourseListSerializer(course, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], permission_classes=[IsCourseOwnerOrAdmin])
+    def clone(self, request, pk=None):
+        """
+        Создать копию курса для нового потока.
+
+        Копия создается черновиком текущего пользователя. Медиафайлы
+        не копируются, копия ссылается на те же файлы.
+
+        Request body:
+            offset_days (int, optional): Сдвиг дат публикации и дедлайнов ДЗ в днях
+            offset_hours (int, optional): Дополнительный сдвиг в часах
+            title (str, optional): Название копии
+        """
+        course = self.get_object()
+        params = CourseCloneSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        clone = clone_course(
+            course, creator=request.user, offset=params.get_offset(), title=params.validated_data.get('title')
+        )
+        serializer = CourseListSerializer(clone, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @action(detail=True, methods=['post'], permission_classes=[IsCourseOwnerOrAdmin])
     def publish(self, request, pk=None):
         course = self.get_object()
@@ -401,8 +638,9 @@ class CourseViewSet(viewsets.ModelViewSet):
         now = timezone.now()
 
         # Проверяем, что пользователь подписан на курс или является его владельцем
-        is_subscribed = course.subscribers.filter(id=user.id).exists()
-        is_owner = course.creator == user or user.is_admin or user.is_teacher
+        access = get_course_access(request)
+        is_subscribed = access.is_subscribed(course.id)
+        is_owner = user.is_admin or user.is_teacher or access.owns(course.id)
 
         if not (is_subscribed or is_owner):
             return Response(
@@ -415,7 +653,8 @@ class CourseViewSet(viewsets.ModelViewSet):
         schedule_items = []
 
         # ЧАСТЬ 1: Получаем заблокированные материалы
-        sections = course.sections.filter(is_published=True).select_related('course')
+        prefetch_related_objects([course], 'sections__elements')
+        sections = [section for section in course.sections.all() if section.is_published]
 
         for section in sections:
             # Если раздел заблокирован
@@ -436,8 +675,8 @@ class CourseViewSet(viewsets.ModelViewSet):
                     'submission_status': None,
                 })
 
-            # Получаем элементы раздела
-            elements = section.elements.filter(is_published=True)
+            # Опубликованные элементы раздела
+            elements = [element for element in section.elements.all() if element.is_published]
 
             for element in elements:
                 # Если элемент заблокирован
@@ -459,7 +698,9 @@ class CourseViewSet(viewsets.ModelViewSet):
         # ЧАСТЬ 2: Добавляем домашние задания (если запрошено)
         # Админы/преподаватели тоже могут быть подписаны на курсы как студенты
         if include_homework:
-            homework_items = _get_homework_schedule_for_course(course, user, now)
+            homework_items = _get_homework_schedule_for_course(
+                course, user, now, _user_submissions(user, [course.id])
+            )
             schedule_items.extend(homework_items)
 
         # Сортируем по дате (unlock_datetime для материалов, deadline для ДЗ)
@@ -469,10 +710,13 @@ class CourseViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(BulkReorderMixin, viewsets.ModelViewSet):
     """ViewSet для управления разделами курса"""
     queryset = Section.objects.all()
     serializer_class = SectionSerializer
+    reorder_model = Section
+    reorder_owner_field = 'course__creator_id'
+    reorder_success_message = 'Порядок разделов обновлен'
 
     def get_queryset(self):
         """
@@ -492,6 +736,10 @@ class SectionViewSet(viewsets.ModelViewSet):
         # Базовый queryset с фильтрацией по курсу
         course_id = self.request.query_params.get('course')
         queryset = Section.objects.select_related('course').all()
+        if self.action == 'list':
+            queryset = queryset.annotate(elements_total=Count('elements')).order_by('order', 'created_at')
+        elif self.action == 'retrieve':
+            queryset = queryset.prefetch_related(_elements_prefetch(user))
 
         if course_id:
             queryset = queryset.filter(course_id=course_id)
@@ -506,8 +754,10 @@ class SectionViewSet(viewsets.ModelViewSet):
 
         # Для студентов фильтруем заблокированные разделы
         # Показываем только разделы, которые:
-        # 1. Опубликованы (is_published=True)
-        # 2. НЕ заблокированы по времени (publish_datetime <= now ИЛИ publish_datetime IS NULL)
+        # 1. Относятся к курсам, на которые студент подписан
+        # 2. Опубликованы (is_published=True)
+        # 3. НЕ заблокированы по времени (publish_datetime <= now ИЛИ publish_datetime IS NULL)
+        queryset = queryset.filter(course_id__in=get_course_access(self.request).readable_ids)
         queryset = queryset.filter(is_published=True)
         queryset = queryset.filter(
             Q(publish_datetime__isnull=True) | Q(publish_datetime__lte=now)
@@ -546,10 +796,13 @@ class SectionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ContentElementViewSet(viewsets.ModelViewSet):
+class ContentElementViewSet(BulkReorderMixin, viewsets.ModelViewSet):
     """ViewSet для управления элементами контента раздела"""
     queryset = ContentElement.objects.all()
     serializer_class = ContentElementSerializer
+    reorder_model = ContentElement
+    reorder_owner_field = 'section__course__creator_id'
+    reorder_success_message = 'Порядок элементов обновлен'
 
     def get_queryset(self):
         """
@@ -585,7 +838,8 @@ class ContentElementViewSet(viewsets.ModelViewSet):
         # Показываем только элементы, которые:
         # 1. Опубликованы (is_published=True)
         # 2. НЕ заблокированы по времени (publish_datetime <= now ИЛИ publish_datetime IS NULL)
-        # 3. Принадлежат разблокированным разделам
+        # 3. Принадлежат разблокированным разделам курсов, на которые студент подписан
+        queryset = queryset.filter(section__course_id__in=get_course_access(self.request).readable_ids)
         queryset = queryset.filter(is_published=True)
         queryset = queryset.filter(
             Q(publish_datetime__isnull=True) | Q(publish_datetime__lte=now)
@@ -748,98 +1002,12 @@ class ContentElementViewSet(viewsets.ModelViewSet):
             'filename': task_file.name
         }, status=status.HTTP_201_CREATED)
 
-    @action(
-        detail=False,
-        methods=['post'],
-        permission_classes=[IsCourseOwnerOrAdmin]
-    )
-    def reorder(self, request):
-        """
-        Массово обновляет порядок элементов контента.
-
-        Ожидаемый формат:
-        {
-            "items": [
-                {"id": 1, "order": 0},
-                {"id": 2, "order": 1},
-                {"id": 3, "order": 2}
-            ]
-        }
-
-        Returns:
-            {"status": "Порядок элементов обновлен", "updated": 3}
-        """
-        items = request.data.get('items', [])
-
-        if not isinstance(items, list):
-            return Response(
-                {'error': 'Поле "items" должно быть списком'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        if not items:
-            return Response(
-                {'error': 'Список элементов не может быть пустым'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Проверяем формат данных
-        for item in items:
-            if not isinstance(item, dict) or 'id' not in item or 'order' not in item:
-                return Response(
-                    {'error': 'Каждый элемент должен содержать поля "id" и "order"'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-        # Обновляем порядок в транзакции
-        try:
-            with transaction.atomic():
-                updated_count = 0
-                for item in items:
-                    element_id = item['id']
-                    new_order = item['order']
-
-                    # Проверяем права доступа к элементу
-                    try:
-                        element = ContentElement.objects.select_related(
-                            'section__course'
-                        ).get(pk=element_id)
-
-                        # Проверяем, что пользователь имеет право изменять этот элемент
-                        if not (
-                            request.user.is_admin or
-                            element.section.course.creator == request.user
-                        ):
-                            return Response(
-                                {'error': f'Нет прав для изменения элемента {element_id}'},
-                                status=status.HTTP_403_FORBIDDEN
-                            )
-
-                        element.order = new_order
-                        element.save(update_fields=['order'])
-                        updated_count += 1
-
-                    except ContentElement.DoesNotExist:
-                        return Response(
-                            {'error': f'Элемент с id={element_id} не найден'},
-                            status=status.HTTP_404_NOT_FOUND
-                        )
-
-                return Response({
-                    'status': 'Порядок элементов обновлен',
-                    'updated': updated_count
-                })
-
-        except Exception as e:
-            return Response(
-                {'error': f'Ошибка при обновлении порядка: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
 
 class HomeworkSubmissionViewSet(viewsets.ModelViewSet):
     serializer_class = HomeworkSubmissionSerializer
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-submitted_at',)
 
     def get_queryset(self):
         """
@@ -900,13 +1068,72 @@ class HomeworkSubmissionViewSet(viewsets.ModelViewSet):
             return [permissions.IsAuthenticated()]
         if self.action == 'review':
             return [IsTeacher(), IsCourseOwnerForHomework()]
-        if self.action == 'section_stats':
+        if self.action in ['section_stats', 'download_all']:
             return [IsTeacher()]
         return [IsCourseOwnerOrAdmin()]
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'], url_path='download-all')
+    def download_all(self, request):
+        """
+        Скачать все ответы на ДЗ одним ZIP-архивом.
+
+        Архив формируется на лету: файлы читаются из хранилища чанками
+        и сразу отдаются клиенту, временные файлы не создаются.
+
+        Query params:
+            element: ID элемента ДЗ
+            section: ID раздела (все ДЗ раздела, по папке на элемент)
+        """
+        element_id = request.query_params.get('element')
+        section_id = request.query_params.get('section')
+
+        if not element_id and not section_id:
+            return Response(
+                {'error': 'Укажите element или section'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        target_id = _parse_id(element_id or section_id)
+        if target_id is None:
+            return Response(
+                {'error': 'element и section должны быть целыми положительными числами'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if element_id:
+            target = get_object_or_404(
+                ContentElement.objects.select_related('section__course'),
+                pk=target_id
+            )
+            course = target.section.course
+            submissions = HomeworkSubmission.objects.filter(element=target)
+            archive_name = f'homework_element_{target.id}.zip'
+        else:
+            target = get_object_or_404(Section.objects.select_related('course'), pk=target_id)
+            course = target.course
+            submissions = HomeworkSubmission.objects.filter(element__section=target)
+            archive_name = f'homework_section_{target.id}.zip'
+
+        if not (request.user.is_admin or get_course_access(request).owns(course.id)):
+            return Response(
+                {'error': 'Нет доступа к ответам этого курса'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        submissions = submissions.select_related('user', 'element').order_by(
+            'element__order', 'element_id', 'user__last_name', 'user__first_name', 'id'
+        )
+
+        response = StreamingHttpResponse(
+            stream_zip(_submission_archive_entries(submissions, per_element=not element_id)),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{archive_name}"'
+        return response
+
     @action(detail=True, methods=['post'])
     def review(self, request, pk=None):
         """
@@ -1065,44 +1292,29 @@ class HomeworkSubmissionViewSet(viewsets.ModelViewSet):
             )
 
         # Проверяем, что пользователь - владелец курса или админ
-        if not (request.user.is_admin or course.creator == request.user):
+        if not (request.user.is_admin or get_course_access(request).owns(course.id)):
             return Response(
                 {'error': 'Нет доступа к статистике этого курса'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Получаем все разделы курса
-        sections = Section.objects.filter(course=course).order_by('order')
+        # Статистика по всем разделам одним запросом (условная агрегация)
+        homework = Q(elements__content_type=ContentElement.ContentType.HOMEWORK)
+        reviewed = homework & Q(elements__submissions__status=HomeworkSubmission.Status.REVIEWED)
+        sections = Section.objects.filter(course=course).order_by('order').annotate(
+            total_submissions=Count('elements__submissions', filter=homework),
+            submitted_count=Count(
+                'elements__submissions',
+                filter=homework & Q(elements__submissions__status=HomeworkSubmission.Status.SUBMITTED)
+            ),
+            reviewed_count=Count('elements__submissions', filter=reviewed),
+            # Средняя оценка только для проверенных работ с оценкой
+            avg_grade=Avg('elements__submissions__grade', filter=reviewed),
+        )
 
         stats = []
         for section in sections:
-            # Получаем все элементы типа HOMEWORK в этом разделе
-            homework_elements = ContentElement.objects.filter(
-                section=section,
-                content_type=ContentElement.ContentType.HOMEWORK
-            )
-
-            # Получаем все submissions для ДЗ в этом разделе
-            submissions = HomeworkSubmission.objects.filter(
-                element__in=homework_elements
-            )
-
-            # Подсчитываем статистику
-            total_submissions = submissions.count()
-            submitted_count = submissions.filter(
-                status=HomeworkSubmission.Status.SUBMITTED
-            ).count()
-            reviewed_count = submissions.filter(
-                status=HomeworkSubmission.Status.REVIEWED
-            ).count()
-
-            # Вычисляем среднюю оценку (только для проверенных работ с оценкой)
-            avg_grade_result = submissions.filter(
-                status=HomeworkSubmission.Status.REVIEWED,
-                grade__isnull=False
-            ).aggregate(avg_grade=Avg('grade'))
-
-            avg_grade = avg_grade_result['avg_grade']
+            avg_grade = section.avg_grade
             # Округляем до 2 знаков после запятой, если есть значение
             if avg_grade is not None:
                 avg_grade = round(avg_grade, 2)
@@ -1110,9 +1322,9 @@ class HomeworkSubmissionViewSet(viewsets.ModelViewSet):
             stats.append({
                 'section_id': section.id,
                 'section_title': section.title,
-                'total_submissions': total_submissions,
-                'submitted_count': submitted_count,
-                'reviewed_count': reviewed_count,
+                'total_submissions': section.total_submissions,
+                'submitted_count': section.submitted_count,
+                'reviewed_count': section.reviewed_count,
                 'avg_grade': avg_grade
             })
 
@@ -1159,9 +1371,10 @@ class MyScheduleView(APIView):
 
         # Получаем все курсы, на которые подписан пользователь
         subscribed_courses = Course.objects.filter(
-            subscribers=user,
+            id__in=get_course_access(request).subscribed_ids,
             is_published=True
-        ).prefetch_related('sections', 'sections__elements')
+        ).prefetch_related('sections__elements')
+        submissions = _user_submissions(user, [course.id for course in subscribed_courses])
 
         unlocks = []
         homeworks = []
@@ -1172,7 +1385,7 @@ class MyScheduleView(APIView):
             unlocks.extend(unlock_items)
 
             # ЧАСТЬ 2: Собираем ДЗ с дедлайнами
-            homework_items = _get_homework_schedule_for_course(course, user, now)
+            homework_items = _get_homework_schedule_for_course(course, user, now, submissions)
             # Добавляем информацию о курсе
             for item in homework_items:
                 item['course_id'] = course.id
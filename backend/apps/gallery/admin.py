@@ -10,7 +10,7 @@ class PhotoInline(admin.TabularInline):
 
 @admin.register(Album)
 class AlbumAdmin(admin.ModelAdmin):
-    list_display = ['title', 'creator', 'photos_count', 'is_published', 'created_at']
+    list_display = ['title', 'creator', 'photos_count', 'is_published', 'published_at', 'created_at']
     list_filter = ['is_published', 'created_at', 'creator']
     search_fields = ['title', 'description', 'creator__email', 'creator__first_name', 'creator__last_name']
     readonly_fields = ['created_at', 'updated_at']
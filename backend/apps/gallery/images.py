@@ -0,0 +1,110 @@
+"""
+Сведения об изображениях фотографий, вычисляемые при загрузке.
+
+Размеры нужны фронтенду, чтобы разметить сетку галереи до загрузки
+изображений, а placeholder (LQIP) - крошечная размытая копия в виде
+data URI, которая показывается на месте фотографии, пока она грузится.
+Кроме них сохраняются размер файла, MIME-тип, преобладающий цвет и дата
+съемки из EXIF.
+"""
+
+import base64
+import io
+from datetime import datetime
+
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Наибольшая сторона placeholder в пикселях
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+# Число цветов палитры, из которой выбирается преобладающий
+PALETTE_COLORS = 8
+
+# Теги EXIF: Orientation, DateTime, ссылка на Exif IFD и DateTimeOriginal в нем
+EXIF_ORIENTATION = 0x0112
+EXIF_DATETIME = 0x0132
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_DATETIME_FORMAT = '%Y:%m:%d %H:%M:%S'
+
+# Поля Photo, которые заполняет read_image_info, и их значения для нечитаемых файлов
+IMAGE_INFO_DEFAULTS = {
+    'width': None,
+    'height': None,
+    'placeholder': '',
+    'file_size': None,
+    'mime_type': '',
+    'dominant_color': '',
+    'taken_at': None,
+}
+
+
+def _placeholder(image: Image.Image) -> str:
+    thumbnail = image.copy()
+    thumbnail.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format='JPEG', quality=PLACEHOLDER_QUALITY, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def _dominant_color(image: Image.Image) -> str:
+    """Самый частый цвет уменьшенной копии после сведения к палитре, #rrggbb"""
+    palette_image = image.resize((32, 32)).quantize(colors=PALETTE_COLORS)
+    _, index = max(palette_image.getcolors())
+    red, green, blue = palette_image.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def _taken_at(exif):
+    """Дата съемки: DateTimeOriginal, иначе DateTime; время считается местным"""
+    value = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+    if not isinstance(value, str):
+        return None
+    try:
+        taken_at = datetime.strptime(value.strip('\x00 '), EXIF_DATETIME_FORMAT)
+    except ValueError:
+        return None
+    return timezone.make_aware(taken_at)
+
+
+def _file_size(file) -> int:
+    size = getattr(file, 'size', None)
+    if size is None:
+        size = file.seek(0, io.SEEK_END)
+    return size
+
+
+def read_image_info(file) -> dict:
+    """
+    Сведения об изображении для полей Photo (ключи IMAGE_INFO_DEFAULTS).
+
+    Размеры учитывают поворот из EXIF. Файл читается с начала, после чтения
+    позиция снова устанавливается на начало. Для файлов, которые не являются
+    изображениями, заполняется только file_size.
+    """
+    info = dict(IMAGE_INFO_DEFAULTS)
+    try:
+        info['file_size'] = _file_size(file)
+        file.seek(0)
+        with Image.open(file) as image:
+            exif = image.getexif()
+            width, height = image.size
+            # Ориентации 5-8 поворачивают кадр на 90 градусов
+            if exif.get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+                width, height = height, width
+            info.update(
+                width=width,
+                height=height,
+                mime_type=Image.MIME.get(image.format, ''),
+                taken_at=_taken_at(exif),
+            )
+            # JPEG декодируется сразу в уменьшенном размере - полный кадр не нужен
+            image.draft('RGB', (PLACEHOLDER_SIZE * 8, PLACEHOLDER_SIZE * 8))
+            preview = ImageOps.exif_transpose(image).convert('RGB')
+            info.update(placeholder=_placeholder(preview), dominant_color=_dominant_color(preview))
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        pass
+    finally:
+        file.seek(0)
+    return info
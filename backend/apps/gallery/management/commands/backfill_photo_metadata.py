@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.gallery.images import IMAGE_INFO_DEFAULTS, read_image_info
+from apps.gallery.models import Photo
+
+
+def _read_photo(photo):
+    """Сведения об изображении фотографии или None, если файл не открывается"""
+    try:
+        with photo.image.open('rb') as file:
+            return read_image_info(file)
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет размеры, placeholder, размер файла, MIME-тип, преобладающий цвет '
+        'и дату съемки для фотографий, загруженных до появления этих полей'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--album', type=int, help='Только фотографии альбома')
+        parser.add_argument('--all', action='store_true', help='Пересчитать и уже заполненные фотографии')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=4, help='Число потоков чтения файлов')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size и --workers должны быть положительными')
+
+        queryset = Photo.objects.only('id', 'image').order_by('id')
+        if options['album']:
+            queryset = queryset.filter(album_id=options['album'])
+        if not options['all']:
+            queryset = queryset.filter(file_size__isnull=True)
+
+        processed = failed = 0
+        last_id = 0
+        fields = list(IMAGE_INFO_DEFAULTS)
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                batch = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                # Файлы читаются и декодируются параллельно, запись - одним запросом на пачку
+                updated = []
+                for photo, info in zip(batch, executor.map(_read_photo, batch)):
+                    if info is None:
+                        failed += 1
+                        self.stderr.write(f'Фото #{photo.id}: не удалось открыть {photo.image.name}')
+                        continue
+                    photo.apply_image_info(info)
+                    updated.append(photo)
+                Photo.objects.bulk_update(updated, fields)
+                processed += len(updated)
+                self.stdout.write(f'Обработано: {processed}')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово: обработано {processed}, ошибок {failed}'))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0002_album_creator'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['album', 'order', '-id'], name='gallery_pho_album_i_4ade8b_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0003_add_photo_cursor_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['is_published', '-created_at'], name='gallery_alb_is_publ_205b4a_idx'),
+        ),
+    ]
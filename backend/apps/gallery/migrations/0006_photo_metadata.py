@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0005_photo_dimensions_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='dominant_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Преобладающий цвет'),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт'),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='mime_type',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип'),
+        ),
+        migrations.AddField(
+            model_name='photo',
+            name='taken_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Дата съемки'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(fields=['album', 'taken_at'], name='gallery_pho_album_i_8a0e9f_idx'),
+        ),
+    ]
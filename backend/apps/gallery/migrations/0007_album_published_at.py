@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_published_at(apps, schema_editor):
+    # Уже опубликованные альбомы считаются опубликованными с момента создания
+    Album = apps.get_model('gallery', 'Album')
+    Album.objects.filter(is_published=True, published_at__isnull=True).update(published_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gallery', '0006_photo_metadata'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='published_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата публикации'),
+        ),
+        migrations.RunPython(fill_published_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='album',
+            index=models.Index(fields=['is_published', 'published_at'], name='gallery_alb_is_publ_c0f21a_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from .images import IMAGE_INFO_DEFAULTS, read_image_info
 
 
 class Album(models.Model):
@@ -22,6 +25,8 @@ class Album(models.Model):
     )
 
     is_published = models.BooleanField('Опубликовано', default=False)
+    # Задается при публикации; дата в будущем - альбом скрыт до этого времени
+    published_at = models.DateTimeField('Дата публикации', null=True, blank=True)
     created_at = models.DateTimeField('Дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('Дата обновления', auto_now=True)
 
@@ -29,18 +34,48 @@ class Album(models.Model):
         verbose_name = 'Альбом'
         verbose_name_plural = 'Альбомы'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_published', '-created_at']),
+            # Ближайшие отложенные публикации (команда publish_scheduled)
+            models.Index(fields=['is_published', 'published_at']),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Опубликованный альбом всегда с датой: публичные списки фильтруют по published_at
+        published_at = self.published_at
+        if self.is_published and published_at is None:
+            self.published_at = timezone.now()
+        elif not self.is_published:
+            self.published_at = None
+        # Иначе save(update_fields=['is_published']) не записал бы новую дату или ее сброс
+        if self.published_at != published_at and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'published_at'}
+        super().save(*args, **kwargs)
+
+    @property
+    def is_scheduled(self):
+        """Опубликован с датой в будущем - виден с published_at"""
+        return self.is_published and self.published_at is not None and self.published_at > timezone.now()
+
     @property
     def photos_count(self):
+        # photos_total - аннотация списков альбомов (см. AlbumViewSet.get_queryset)
+        if hasattr(self, 'photos_total'):
+            return self.photos_total
         return self.photos.count()
 
     @property
     def cover_url(self):
         if self.cover:
             return self.cover.url
+        # cover_photo - аннотация с путем к первой фотографии альбома
+        if hasattr(self, 'cover_photo'):
+            if self.cover_photo:
+                return Photo._meta.get_field('image').storage.url(self.cover_photo)
+            return None
         first_photo = self.photos.first()
         if first_photo:
             return first_photo.image.url
@@ -58,6 +93,16 @@ class Photo(models.Model):
     image = models.ImageField('Изображение', upload_to='gallery/photos/')
     description = models.TextField('Описание', blank=True)
 
+    # Заполняются при загрузке (apps.gallery.images.read_image_info),
+    # для старых фотографий - командой backfill_photo_metadata
+    width = models.PositiveIntegerField('Ширина', null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField('Высота', null=True, blank=True, editable=False)
+    placeholder = models.TextField('Placeholder (LQIP)', blank=True, editable=False)
+    file_size = models.PositiveBigIntegerField('Размер файла, байт', null=True, blank=True, editable=False)
+    mime_type = models.CharField('MIME-тип', max_length=50, blank=True, editable=False)
+    dominant_color = models.CharField('Преобладающий цвет', max_length=7, blank=True, editable=False)
+    taken_at = models.DateTimeField('Дата съемки', null=True, blank=True, editable=False)
+
     order = models.PositiveIntegerField('Порядок', default=0)
     created_at = models.DateTimeField('Дата добавления', auto_now_add=True)
 
@@ -65,6 +110,21 @@ class Photo(models.Model):
         verbose_name = 'Фотография'
         verbose_name_plural = 'Фотографии'
         ordering = ['order', '-created_at']
+        indexes = [
+            models.Index(fields=['album', 'order', '-id']),
+            models.Index(fields=['album', 'taken_at']),
+        ]
 
     def __str__(self):
         return self.title or f'Фото #{self.id}'
+
+    def save(self, *args, **kwargs):
+        # Сведения об изображении вычисляются для нового, еще не сохраненного файла
+        if self.image and not self.image._committed:
+            self.apply_image_info(read_image_info(self.image.file))
+        super().save(*args, **kwargs)
+
+    def apply_image_info(self, info: dict):
+        """Заполняет поля сведениями из read_image_info"""
+        for field, default in IMAGE_INFO_DEFAULTS.items():
+            setattr(self, field, info.get(field, default))
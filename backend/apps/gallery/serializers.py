@@ -7,7 +7,10 @@ class PhotoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Photo
-        fields = ['id', 'album', 'title', 'image', 'description', 'order', 'created_at']
+        fields = [
+            'id', 'album', 'title', 'image', 'description', 'order', 'created_at',
+            'width', 'height', 'placeholder', 'file_size', 'mime_type', 'dominant_color', 'taken_at'
+        ]
 
     def validate_image(self, value):
         """Валидация размера файла изображения"""
@@ -22,23 +25,25 @@ class AlbumListSerializer(serializers.ModelSerializer):
     """Сериализатор для списка альбомов"""
     photos_count = serializers.ReadOnlyField()
     cover_url = serializers.SerializerMethodField()
+    is_scheduled = serializers.ReadOnlyField()
     creator_name = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Album
         fields = [
             'id', 'title', 'description', 'cover_url', 'photos_count',
-            'creator_name', 'is_published', 'created_at'
+            'creator_name', 'is_published', 'published_at', 'is_scheduled', 'created_at'
         ]
 
     def get_cover_url(self, obj: Album):
-        """Возвращает полный URL обложки альбома (только если обложка задана явно)"""
-        if not obj.cover:
+        """Возвращает полный URL обложки альбома (явной или первой фотографии)"""
+        url = obj.cover_url
+        if not url:
             return None
         request = self.context.get('request')
         if request:
-            return request.build_absolute_uri(obj.cover.url)
-        return obj.cover.url
+            return request.build_absolute_uri(url)
+        return url
 
     def get_creator_name(self, obj: Album) -> str:
         """Возвращает полное имя создателя альбома"""
@@ -48,18 +53,34 @@ class AlbumListSerializer(serializers.ModelSerializer):
 
 
 class AlbumDetailSerializer(serializers.ModelSerializer):
-    """Сериализатор для детального просмотра альбома с фотографиями"""
-    photos = PhotoSerializer(many=True, read_only=True)
+    """
+    Сериализатор для детального просмотра альбома с первой страницей фотографий.
+
+    Страница фотографий и ссылка на следующую передаются во view через контекст
+    (photos_page, photos_next); следующие страницы отдает /albums/{id}/photos/.
+    """
+    photos = serializers.SerializerMethodField()
+    photos_next = serializers.SerializerMethodField()
     photos_count = serializers.ReadOnlyField()
+    is_scheduled = serializers.ReadOnlyField()
     creator_name = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Album
         fields = [
-            'id', 'title', 'description', 'cover', 'photos',
-            'photos_count', 'creator_name', 'is_published', 'created_at'
+            'id', 'title', 'description', 'cover', 'photos', 'photos_next',
+            'photos_count', 'creator_name', 'is_published', 'published_at', 'is_scheduled', 'created_at'
         ]
 
+    def get_photos(self, obj: Album):
+        """Первая страница фотографий альбома"""
+        page = self.context.get('photos_page', [])
+        return PhotoSerializer(page, many=True, context=self.context).data
+
+    def get_photos_next(self, obj: Album):
+        """Ссылка на следующую страницу фотографий (null, если фотографий больше нет)"""
+        return self.context.get('photos_next')
+
     def get_creator_name(self, obj: Album) -> str:
         """Возвращает полное имя создателя альбома"""
         if obj.creator:
@@ -72,4 +93,4 @@ class AlbumAdminSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Album
-        fields = ['id', 'title', 'description', 'cover', 'is_published']
+        fields = ['id', 'title', 'description', 'cover', 'is_published', 'published_at']
@@ -0,0 +1,277 @@
+"""
+Тесты для API галереи.
+
+Для запуска тестов:
+    python manage.py test apps.gallery
+"""
+
+import io
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from apps.users.models import User
+from apps.gallery.models import Album, Photo
+
+
+class AlbumListAPITestCase(TestCase):
+    """Тесты для списка альбомов."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User',
+            role=User.Role.ADMIN
+        )
+        self.album = Album.objects.create(title='Выпускной', creator=self.admin, is_published=True)
+        self.empty_album = Album.objects.create(title='Пустой', creator=self.admin, is_published=True)
+        Album.objects.create(title='Черновик', creator=self.admin, is_published=False)
+
+    def add_photos(self, album, count, start=0):
+        Photo.objects.bulk_create(
+            Photo(album=album, image=f'gallery/photos/{index}.jpg', order=index)
+            for index in range(start, start + count)
+        )
+
+    def test_list_counts_photos_and_uses_first_photo_as_cover(self):
+        """Число фотографий и обложка из первой фотографии."""
+        self.add_photos(self.album, 3)
+
+        response = self.client.get('/api/gallery/albums/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        albums = {item['id']: item for item in response.data['results']}
+        self.assertEqual(set(albums), {self.album.id, self.empty_album.id})
+        self.assertEqual(albums[self.album.id]['photos_count'], 3)
+        self.assertTrue(albums[self.album.id]['cover_url'].endswith('/media/gallery/photos/0.jpg'))
+        self.assertEqual(albums[self.empty_album.id]['photos_count'], 0)
+        self.assertIsNone(albums[self.empty_album.id]['cover_url'])
+
+    def test_scheduled_album_hidden_until_due(self):
+        """Альбом с будущей датой публикации не виден до published_at."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(
+            f'/api/gallery/albums/{self.empty_album.id}/publish/',
+            {'published_at': (timezone.now() + timezone.timedelta(days=1)).isoformat()},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(self.empty_album.id, [item['id'] for item in self.client.get('/api/gallery/albums/latest/').data])
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/gallery/albums/')
+        self.assertEqual([item['id'] for item in response.data['results']], [self.album.id])
+
+        Album.objects.filter(pk=self.empty_album.id).update(published_at=timezone.now())
+        response = self.client.get('/api/gallery/albums/')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_unpublish_with_update_fields_clears_date(self):
+        """save(update_fields=['is_published']) записывает и сброс, и новую дату публикации."""
+        self.album.is_published = False
+        self.album.save(update_fields=['is_published'])
+        self.album.refresh_from_db()
+        self.assertIsNone(self.album.published_at)
+
+        self.album.is_published = True
+        self.album.save(update_fields=['is_published'])
+        self.album.refresh_from_db()
+        self.assertIsNotNone(self.album.published_at)
+
+    def test_list_queries_do_not_depend_on_photos(self):
+        """Число запросов списка и latest не растет с числом фотографий."""
+        self.add_photos(self.album, 2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/api/gallery/albums/')
+            self.client.get('/api/gallery/albums/latest/')
+
+        self.add_photos(self.album, 50, start=2)
+        self.add_photos(self.empty_album, 10)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get('/api/gallery/albums/')
+            response = self.client.get('/api/gallery/albums/latest/')
+
+        self.assertEqual(len(large), len(small))
+        self.assertFalse(any('"gallery_photo"."description"' in query['sql'] for query in large))
+        self.assertEqual({item['photos_count'] for item in response.data}, {52, 10})
+
+
+def make_jpeg(name='photo.jpg', size=(120, 80), color=(200, 40, 40)):
+    """JPEG-файл для загрузки."""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class AlbumDetailAPITestCase(TestCase):
+    """Тесты для просмотра альбома и страниц его фотографий."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User',
+            role=User.Role.ADMIN
+        )
+        self.album = Album.objects.create(title='Выпускной', creator=self.admin, is_published=True)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_stores_dimensions_and_placeholder(self):
+        """При загрузке сохраняются размеры и placeholder."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post('/api/gallery/photos/bulk_upload/', {
+            'album': self.album.id,
+            'images': [make_jpeg()],
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        photo = response.data['photos'][0]
+        self.assertEqual((photo['width'], photo['height']), (120, 80))
+        self.assertTrue(photo['placeholder'].startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(photo['placeholder']), 1000)
+        self.assertEqual(photo['mime_type'], 'image/jpeg')
+        self.assertGreater(photo['file_size'], 0)
+        red, green, blue = (int(photo['dominant_color'][i:i + 2], 16) for i in (1, 3, 5))
+        self.assertGreater(red, 150)
+        self.assertLess(max(green, blue), 100)
+
+    def test_single_create_reads_exif_capture_date(self):
+        """Дата съемки из EXIF и размеры с учетом поворота."""
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Поворот на 90 градусов
+        exif.get_ifd(0x8769)[0x9003] = '2025:06:21 18:30:00'
+        buffer = io.BytesIO()
+        Image.new('RGB', (120, 80), (10, 120, 10)).save(buffer, format='JPEG', exif=exif)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post('/api/gallery/photos/', {
+            'album': self.album.id,
+            'image': SimpleUploadedFile('exif.jpg', buffer.getvalue(), content_type='image/jpeg'),
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        photo = Photo.objects.get(id=response.data['id'])
+        self.assertEqual((photo.width, photo.height), (80, 120))
+        self.assertEqual(timezone.localtime(photo.taken_at).strftime('%Y-%m-%d %H:%M'), '2025-06-21 18:30')
+
+    def test_backfill_command_fills_existing_photos(self):
+        """Команда заполняет сведения для фотографий, загруженных раньше."""
+        from io import StringIO
+        from django.core.files.storage import default_storage
+        from django.core.management import call_command
+
+        name = default_storage.save('gallery/photos/old.jpg', make_jpeg(size=(64, 48)))
+        Photo.objects.bulk_create([
+            Photo(album=self.album, image=name),
+            Photo(album=self.album, image='gallery/photos/missing.jpg'),
+        ])
+
+        out, err = StringIO(), StringIO()
+        call_command('backfill_photo_metadata', '--batch-size', '1', '--workers', '2', stdout=out, stderr=err)
+        photo = Photo.objects.get(image=name)
+        self.assertEqual((photo.width, photo.height, photo.mime_type), (64, 48, 'image/jpeg'))
+        self.assertTrue(photo.placeholder)
+        self.assertIn('обработано 1, ошибок 1', out.getvalue())
+        self.assertIn('missing.jpg', err.getvalue())
+
+    def test_retrieve_returns_first_page_and_cursor_link(self):
+        """Альбом отдает первую страницу, остальные - подресурс photos по курсору."""
+        Photo.objects.bulk_create(
+            Photo(album=self.album, image=f'gallery/photos/{index}.jpg', order=index % 3)
+            for index in range(7)
+        )
+        expected = list(Photo.objects.filter(album=self.album).order_by('order', '-created_at', '-id')
+                        .values_list('id', flat=True))
+
+        response = self.client.get(f'/api/gallery/albums/{self.album.id}/?page_size=3')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['photos_count'], 7)
+        ids = [photo['id'] for photo in response.data['photos']]
+        self.assertEqual(len(ids), 3)
+
+        next_url = response.data['photos_next']
+        self.assertIn(f'/api/gallery/albums/{self.album.id}/photos/', next_url)
+        while next_url:
+            page = self.client.get(next_url)
+            self.assertEqual(page.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(page.data['results']), 3)
+            ids += [photo['id'] for photo in page.data['results']]
+            next_url = page.data['next']
+
+        self.assertEqual(ids, expected)
+
+
+class PhotoBulkUploadIndexTestCase(TransactionTestCase):
+    """
+    Переиндексация альбома при массовой загрузке.
+
+    TransactionTestCase: запросы выполняются в режиме autocommit, как в работе,
+    и отложенная переиндексация срабатывает при каждой фиксации.
+    """
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User',
+            role=User.Role.ADMIN
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.album = Album.objects.create(title='Выпускной', creator=self.admin, is_published=True)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def upload(self, count):
+        """Загружает count файлов; возвращает SQL без запросов, приходящихся на сам файл."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/gallery/photos/bulk_upload/', {
+                'album': self.album.id,
+                'images': [make_jpeg(f'{count}-{i}.jpg') for i in range(count)],
+            }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Вставка фотографии и ее точка сохранения неизбежны для каждого файла
+        return [
+            query['sql'] for query in queries
+            if not query['sql'].startswith(('INSERT INTO "gallery_photo"', 'SAVEPOINT', 'RELEASE SAVEPOINT'))
+        ]
+
+    def test_bulk_upload_indexes_album_once(self):
+        """Число запросов загрузки не растет с числом файлов: альбом индексируется один раз."""
+        single, several = self.upload(1), self.upload(5)
+
+        self.assertEqual(len(several), len(single))
+        self.assertEqual(sum('FROM "search_searchdocument"' in sql for sql in several), 1)
+        self.assertEqual(self.album.photos.count(), 6)
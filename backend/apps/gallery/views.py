@@ -1,7 +1,12 @@
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.utils.urls import replace_query_param
 
 from .models import Album, Photo
 from .serializers import (
@@ -11,6 +16,31 @@ from .serializers import (
     PhotoSerializer
 )
 from apps.users.permissions import IsAdmin
+from apps.core.mixins import BulkReorderMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.serializers import PublishSerializer
+
+
+class AlbumPhotoPagination(KeysetPagination):
+    """Фотографии альбома страницами по курсору в порядке (order, -created_at)"""
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_only = True
+    # id растет вместе с created_at, ключ покрыт индексом (album, order, -id)
+    cursor_ordering = ('order', '-id')
+
+
+def _album_cards(queryset):
+    """
+    Альбомы для карточек: число фотографий и путь к первой фотографии
+    (кандидат в обложку) считаются в том же запросе, сами фотографии не загружаются.
+    """
+    first_photo = Photo.objects.filter(album=OuterRef('pk')).order_by('order', '-id').values('image')[:1]
+    return queryset.annotate(
+        photos_total=Count('photos'),
+        cover_photo=Subquery(first_photo),
+    ).order_by('-created_at')
 
 
 class AlbumViewSet(viewsets.ModelViewSet):
@@ -23,10 +53,23 @@ class AlbumViewSet(viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get_queryset(self):
-        """Админы видят все альбомы, пользователи - только опубликованные"""
-        if self.request.user.is_authenticated and self.request.user.is_admin:
-            return Album.objects.select_related('creator').prefetch_related('photos').all()
-        return Album.objects.filter(is_published=True).select_related('creator').prefetch_related('photos')
+        """
+        Админы видят все альбомы, пользователи - только опубликованные
+        (с наступившим published_at). Последние альбомы - только видимые всем.
+
+        Для списков число фотографий и обложка берутся из аннотаций
+        (_album_cards), фотографии загружаются страницами (retrieve, photos).
+        """
+        queryset = Album.objects.select_related('creator')
+        if not (self.request.user.is_authenticated and self.request.user.is_admin) or self.action == 'latest':
+            # Опубликованные, время публикации которых наступило
+            queryset = queryset.filter(is_published=True, published_at__lte=timezone.now())
+
+        if self.action in ['list', 'latest']:
+            return _album_cards(queryset)
+        if self.action == 'retrieve':
+            return queryset.annotate(photos_total=Count('photos'))
+        return queryset
 
     def get_serializer_class(self):
         """Выбор сериализатора в зависимости от действия"""
@@ -38,7 +81,7 @@ class AlbumViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         """Настройка прав доступа для разных действий"""
-        if self.action in ['list', 'retrieve', 'latest']:
+        if self.action in ['list', 'retrieve', 'latest', 'photos']:
             return [permissions.AllowAny()]
         return [IsAdmin()]
 
@@ -46,12 +89,47 @@ class AlbumViewSet(viewsets.ModelViewSet):
         """Автоматически устанавливаем creator при создании альбома"""
         serializer.save(creator=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        """Альбом с первой страницей фотографий и ссылкой на следующую"""
+        album = self.get_object()
+        paginator = AlbumPhotoPagination()
+        paginator.base_url = request.build_absolute_uri(reverse('album-photos', args=[album.pk]))
+        page_size = request.query_params.get(paginator.page_size_query_param)
+        if page_size:
+            paginator.base_url = replace_query_param(paginator.base_url, paginator.page_size_query_param, page_size)
+        page = paginator.paginate_queryset(album.photos.all(), request, view=self)
+        serializer = self.get_serializer(album, context={
+            **self.get_serializer_context(),
+            'photos_page': page,
+            'photos_next': paginator.get_next_link(),
+        })
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], pagination_class=AlbumPhotoPagination)
+    def photos(self, request, pk=None):
+        """Фотографии альбома по курсору: ?cursor=<из photos_next или next>"""
+        album = self.get_object()
+        page = self.paginate_queryset(album.photos.all())
+        serializer = PhotoSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAdmin])
     def publish(self, request, pk=None):
-        """Публикация альбома"""
+        """
+        Публикация альбома.
+
+        Body:
+            published_at: Время публикации (необязательно); в будущем -
+                альбом скрыт из публичных списков до этого времени
+        """
         album = self.get_object()
+        serializer = PublishSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         album.is_published = True
+        album.published_at = serializer.validated_data.get('published_at') or timezone.now()
         album.save()
+        if album.is_scheduled:
+            return Response({'status': 'Публикация альбома запланирована', 'published_at': album.published_at})
         return Response({'status': 'Альбом опубликован'})
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdmin])
@@ -70,15 +148,20 @@ class AlbumViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class PhotoViewSet(viewsets.ModelViewSet):
+class PhotoViewSet(BulkReorderMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления фотографиями в альбомах.
 
     - Публичный доступ: list, retrieve
-    - Только админы: create, update, delete, bulk_upload
+    - Только админы: create, update, delete, bulk_upload, reorder
     """
     serializer_class = PhotoSerializer
+    reorder_model = Photo
+    reorder_success_message = 'Порядок фотографий обновлен'
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = KeysetPagination
+    # Совпадает с Photo.Meta.ordering: id растет вместе с created_at
+    cursor_ordering = ('order', '-id')
 
     def get_queryset(self):
         """Фильтрация фотографий по альбому"""
@@ -116,7 +199,9 @@ class PhotoViewSet(viewsets.ModelViewSet):
         """
         Массовая загрузка фотографий в альбом.
 
-        Валидирует размер каждого файла (не более 10 МБ).
+        Валидирует размер каждого файла (не более 10 МБ). Фотографии создаются
+        одной транзакцией, поэтому альбом переиндексируется в поиске один раз
+        после фиксации, а не после каждого файла.
         """
         album_id = request.data.get('album')
         files = request.FILES.getlist('images')
@@ -147,28 +232,31 @@ class PhotoViewSet(viewsets.ModelViewSet):
         photos = []
         max_file_size = 10 * 1024 * 1024  # 10MB
 
-        for i, file in enumerate(files):
-            # Проверка размера файла
-            if file.size > max_file_size:
-                errors.append({
-                    'file': file.name,
-                    'error': f'Файл слишком большой ({file.size / (1024*1024):.2f} МБ). Максимум: 10 МБ'
-                })
-                continue
-
-            try:
-                photo = Photo.objects.create(
-                    album=album,
-                    image=file,
-                    title=file.name,  # Используем имя файла как заголовок
-                    order=i
-                )
-                photos.append(photo)
-            except Exception as e:
-                errors.append({
-                    'file': file.name,
-                    'error': str(e)
-                })
+        with transaction.atomic():
+            for i, file in enumerate(files):
+                # Проверка размера файла
+                if file.size > max_file_size:
+                    errors.append({
+                        'file': file.name,
+                        'error': f'Файл слишком большой ({file.size / (1024*1024):.2f} МБ). Максимум: 10 МБ'
+                    })
+                    continue
+
+                try:
+                    # Точка сохранения: ошибка одного файла не прерывает транзакцию
+                    with transaction.atomic():
+                        photo = Photo.objects.create(
+                            album=album,
+                            image=file,
+                            title=file.name,  # Используем имя файла как заголовок
+                            order=i
+                        )
+                    photos.append(photo)
+                except Exception as e:
+                    errors.append({
+                        'file': file.name,
+                        'error': str(e)
+                    })
 
         # Формируем ответ
         response_data = {
@@ -4,7 +4,8 @@ from .models import News, Tag
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug']
+    list_display = ['name', 'slug', 'news_count']
+    readonly_fields = ['news_count']
     prepopulated_fields = {'slug': ('name',)}
 
 
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class NewsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.news'
+    verbose_name = 'Новости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,63 @@
+from django.db.models import Count, Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import News
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+
+
+class TagFeedFilter(BaseFilterBackend):
+    """
+    Лента новостей по тегам: ?tags=1,2 (или ?tags=1&tags=2) и ?tags_match=any|all.
+
+    Вместо JOIN с таблицей связей и distinct фильтр строится полусоединением,
+    поэтому новость с несколькими подходящими тегами не дублируется:
+    any - EXISTS по связям новости с любым из тегов, all - вхождение в
+    подзапрос по связям, сгруппированный по новости, с числом совпавших тегов,
+    равным числу запрошенных. Подзапросы читают индекс (tag_id, news_id).
+    """
+    tags_param = 'tags'
+    match_param = 'tags_match'
+
+    def _tag_ids(self, request) -> set:
+        values = request.query_params.getlist(self.tags_param)
+        try:
+            return {int(value) for item in values for value in item.split(',') if value.strip()}
+        except ValueError:
+            raise ValidationError({self.tags_param: 'Ожидаются ID тегов через запятую'})
+
+    def filter_queryset(self, request, queryset, view):
+        tag_ids = self._tag_ids(request)
+        if not tag_ids:
+            return queryset
+
+        match = request.query_params.get(self.match_param, MATCH_ANY)
+        links = News.tags.through.objects.filter(tag_id__in=tag_ids)
+        if match == MATCH_ANY:
+            return queryset.filter(Exists(links.filter(news_id=OuterRef('pk'))))
+        if match == MATCH_ALL:
+            matched = links.order_by().values('news_id').annotate(
+                matched=Count('tag_id')
+            ).filter(matched=len(tag_ids)).values('news_id')
+            return queryset.filter(id__in=matched)
+        raise ValidationError({self.match_param: f'Допустимые значения: {MATCH_ANY}, {MATCH_ALL}'})
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.tags_param,
+                'required': False,
+                'in': 'query',
+                'description': 'ID тегов через запятую',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.match_param,
+                'required': False,
+                'in': 'query',
+                'description': 'any - хотя бы один из тегов (по умолчанию), all - все теги',
+                'schema': {'type': 'string', 'enum': [MATCH_ANY, MATCH_ALL]},
+            },
+        ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:03
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_remove_news_gallery'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(models.F('is_published'), models.OrderBy(django.db.models.functions.comparison.Coalesce('published_at', 'created_at'), descending=True), models.OrderBy(models.F('id'), descending=True), name='news_publication_cursor_idx'),
+        ),
+    ]
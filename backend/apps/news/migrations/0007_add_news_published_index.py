@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_add_publication_cursor_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['is_published', '-published_at', '-created_at'], name='news_news_is_publ_2ccc3e_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:46
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_news_count(apps, schema_editor):
+    Tag = apps.get_model('news', 'Tag')
+    News = apps.get_model('news', 'News')
+    published = News.tags.through.objects.filter(
+        tag_id=OuterRef('pk'), news__is_published=True
+    ).order_by().values('tag_id').annotate(total=Count('news_id')).values('total')
+    Tag.objects.update(news_count=Coalesce(Subquery(published), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_news_rendered_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='news_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Опубликованных новостей'),
+        ),
+        migrations.RunPython(fill_news_count, migrations.RunPython.noop),
+        # Связи новостей с тегами со стороны тега: фильтр ленты по тегам
+        # (apps.news.filters.TagFeedFilter) и пересчет счетчиков читают только индекс
+        migrations.RunSQL(
+            'CREATE INDEX news_news_tags_tag_news_idx ON news_news_tags (tag_id, news_id)',
+            'DROP INDEX news_news_tags_tag_news_idx',
+        ),
+    ]
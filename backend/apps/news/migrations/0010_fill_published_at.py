@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:50
+
+from django.db import migrations
+from django.db.models import F
+
+
+def fill_published_at(apps, schema_editor):
+    # Публичные списки фильтруют по published_at - у опубликованных новостей он обязателен
+    News = apps.get_model('news', 'News')
+    News.objects.filter(is_published=True, published_at__isnull=True).update(published_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_tag_news_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_published_at, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,17 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django_ckeditor_5.fields import CKEditor5Field
 
+from apps.core.rendering import render_blocks
+
 
 class Tag(models.Model):
     name = models.CharField('Название', max_length=100, unique=True)
     slug = models.SlugField('Slug', unique=True)
+    # Число опубликованных новостей с тегом, пересчитывается сигналами (apps.news.tagging)
+    news_count = models.PositiveIntegerField('Опубликованных новостей', default=0, editable=False)
 
     class Meta:
         verbose_name = 'Тег'
@@ -25,6 +32,8 @@ class News(models.Model):
         blank=True,
         help_text='Структурированный контент в формате блоков'
     )
+    # HTML блоков, пересчитывается при сохранении (apps.core.rendering)
+    rendered_html = models.TextField('HTML блоков', blank=True, editable=False)
 
     image = models.ImageField(
         'Изображение',
@@ -50,10 +59,52 @@ class News(models.Model):
         verbose_name = 'Новость'
         verbose_name_plural = 'Новости'
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            # Ключ курсорной пагинации списка новостей (см. NewsViewSet)
+            models.Index(
+                F('is_published'),
+                Coalesce('published_at', 'created_at').desc(),
+                F('id').desc(),
+                name='news_publication_cursor_idx'
+            ),
+            # Сортировка по умолчанию: лента и последние новости
+            models.Index(fields=['is_published', '-published_at', '-created_at']),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Состояние публикации при загрузке: по нему сигналы определяют,
+        # изменилось ли оно при сохранении (см. apps.news.signals)
+        instance._loaded_publication = instance.publication_state
+        return instance
+
+    @property
+    def publication_state(self):
+        return self.__dict__.get('is_published'), self.__dict__.get('published_at')
+
+    @property
+    def is_scheduled(self):
+        """Опубликована с датой в будущем - видна с published_at"""
+        return self.is_published and self.published_at is not None and self.published_at > timezone.now()
+
+    def save(self, *args, **kwargs):
+        # Опубликованная новость всегда с датой: публичные списки фильтруют по published_at
+        if self.is_published and self.published_at is None:
+            self.published_at = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'published_at'}
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.rendered_html = render_blocks(self.content_blocks)
+        elif 'content_blocks' in update_fields:
+            self.rendered_html = render_blocks(self.content_blocks)
+            kwargs['update_fields'] = {*update_fields, 'rendered_html'}
+        super().save(*args, **kwargs)
+
     @property
     def image_url(self):
         if self.image:
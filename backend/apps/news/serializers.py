@@ -1,3 +1,5 @@
+import json
+
 from rest_framework import serializers
 from django.utils import timezone
 from .models import News, Tag
@@ -7,7 +9,7 @@ from apps.courses.serializers import BlockDataValidator
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'slug']
+        fields = ['id', 'name', 'slug', 'news_count']
 
 
 class NewsListSerializer(serializers.ModelSerializer):
@@ -15,12 +17,13 @@ class NewsListSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     image = serializers.SerializerMethodField()
     image_url = serializers.ReadOnlyField()
+    is_scheduled = serializers.ReadOnlyField()
 
     class Meta:
         model = News
         fields = [
             'id', 'title', 'short_description', 'image', 'image_url',
-            'tags', 'is_published', 'published_at'
+            'tags', 'is_published', 'published_at', 'is_scheduled'
         ]
 
     def get_image(self, obj):
@@ -38,12 +41,13 @@ class NewsDetailSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     image_url = serializers.ReadOnlyField()
     uses_block_editor = serializers.ReadOnlyField()
+    is_scheduled = serializers.ReadOnlyField()
 
     class Meta:
         model = News
         fields = [
-            'id', 'title', 'short_description', 'content', 'content_blocks',
-            'image', 'image_url', 'tags', 'is_published', 'published_at',
+            'id', 'title', 'short_description', 'content', 'content_blocks', 'rendered_html',
+            'image', 'image_url', 'tags', 'is_published', 'published_at', 'is_scheduled',
             'created_at', 'updated_at', 'uses_block_editor'
         ]
 
@@ -69,7 +73,6 @@ class NewsAdminSerializer(serializers.ModelSerializer):
         """Валидация блоков новостей"""
         # Если пришла JSON-строка (из FormData), парсим её
         if isinstance(value, str):
-            import json
             try:
                 value = json.loads(value)
             except json.JSONDecodeError:
@@ -78,25 +81,9 @@ class NewsAdminSerializer(serializers.ModelSerializer):
         if not isinstance(value, list):
             raise serializers.ValidationError("content_blocks должен быть списком")
 
-        for i, block in enumerate(value):
-            if not isinstance(block, dict):
-                raise serializers.ValidationError(f"Блок {i} должен быть объектом")
-
-            block_type = block.get('type')
-            if not block_type:
-                raise serializers.ValidationError(f"Блок {i}: отсутствует поле 'type'")
-
-            # Используем BlockDataValidator из курсов (исключаем homework)
-            if block_type == 'homework':
-                raise serializers.ValidationError("Тип 'homework' не поддерживается для новостей")
-
-            data = block.get('data', {})
-            try:
-                BlockDataValidator.validate(block_type, data)
-            except serializers.ValidationError as e:
-                raise serializers.ValidationError(f"Блок {i} ({block_type}): {str(e)}")
-
-        return value
+        # Используем BlockDataValidator из курсов (исключаем homework),
+        # ошибки всех блоков возвращаются одним списком
+        return BlockDataValidator.validate_blocks(value, excluded_types={'homework'})
 
     def create(self, validated_data: dict) -> News:
         """
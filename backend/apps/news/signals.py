@@ -0,0 +1,54 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import News, Tag
+from .tagging import invalidate_tag_cloud, refresh_tag_counts
+
+
+def _news_tag_ids(news) -> list:
+    return list(news.tags.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=News)
+def refresh_counts_on_publish(sender, instance, created, **kwargs):
+    """Публикация, снятие с публикации и перенос даты меняют счетчики тегов новости"""
+    # У только что созданной новости еще нет тегов - их добавит m2m_changed
+    if not created and getattr(instance, '_loaded_publication', None) != instance.publication_state:
+        refresh_tag_counts(_news_tag_ids(instance))
+    instance._loaded_publication = instance.publication_state
+
+
+@receiver(pre_delete, sender=News)
+def remember_deleted_news_tags(sender, instance, **kwargs):
+    # После удаления связи с тегами уже не найти. Состояние публикации
+    # в памяти может быть устаревшим - счетчики пересчитываются по БД
+    instance._deleted_tag_ids = _news_tag_ids(instance)
+
+
+@receiver(post_delete, sender=News)
+def refresh_counts_on_delete(sender, instance, **kwargs):
+    refresh_tag_counts(getattr(instance, '_deleted_tag_ids', ()))
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def refresh_counts_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Теги новости изменились (news.tags или tag.news)"""
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_tag_counts([instance.pk])
+        return
+
+    if not instance.is_published:
+        return
+    if action in ('post_add', 'post_remove'):
+        refresh_tag_counts(pk_set)
+    elif action == 'pre_clear':
+        instance._cleared_tag_ids = _news_tag_ids(instance)
+    elif action == 'post_clear':
+        refresh_tag_counts(getattr(instance, '_cleared_tag_ids', ()))
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def reset_tag_cloud(sender, instance, **kwargs):
+    """Переименование или удаление тега меняет облако"""
+    invalidate_tag_cloud()
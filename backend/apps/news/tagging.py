@@ -0,0 +1,88 @@
+"""
+Счетчики использования тегов и облако тегов.
+
+Tag.news_count - число опубликованных новостей с тегом, которые уже видны
+публично (published_at наступил). Сигналы (apps.news.signals) пересчитывают
+его для тегов, затронутых публикацией, снятием с публикации, удалением
+новости или изменением ее тегов; для отложенных публикаций это делает
+команда publish_scheduled в момент публикации. Пересчет - один UPDATE
+с подзапросом по затронутым тегам, а не инкремент, поэтому параллельные
+изменения не накапливают расхождение.
+
+Облако тегов (теги с опубликованными новостями по убыванию популярности)
+кэшируется и сбрасывается после каждого пересчета. Сброс из другого процесса
+не доходит до локального кэша, поэтому запись к тому же живет не дольше
+ближайшей отложенной публикации (с запасом на работу планировщика).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import News, Tag
+
+CLOUD_CACHE_KEY = 'news:tag_cloud'
+# Запас после времени отложенной публикации: за это время планировщик пересчитывает счетчики
+PUBLICATION_GRACE_SECONDS = 5
+
+
+def _cloud_cache_timeout() -> int:
+    return getattr(settings, 'NEWS_TAG_CLOUD_CACHE_TIMEOUT', 600)
+
+
+def refresh_tag_counts(tag_ids=None) -> int:
+    """
+    Пересчитывает news_count тегов.
+
+    Args:
+        tag_ids: ID тегов; None - все теги
+
+    Returns:
+        Число обновленных тегов
+    """
+    queryset = Tag.objects.all()
+    if tag_ids is not None:
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return 0
+        queryset = queryset.filter(id__in=tag_ids)
+
+    published = News.tags.through.objects.filter(
+        tag_id=OuterRef('pk'), news__is_published=True, news__published_at__lte=timezone.now()
+    ).order_by().values('tag_id').annotate(total=Count('news_id')).values('total')
+    updated = queryset.update(news_count=Coalesce(Subquery(published), Value(0)))
+    invalidate_tag_cloud()
+    return updated
+
+
+def invalidate_tag_cloud():
+    """Сбрасывает облако тегов после фиксации транзакции"""
+    # До фиксации другой запрос успел бы снова закэшировать старые счетчики
+    transaction.on_commit(lambda: cache.delete(CLOUD_CACHE_KEY))
+
+
+def _cloud_timeout_until_next_publication() -> int:
+    timeout = _cloud_cache_timeout()
+    now = timezone.now()
+    next_at = News.objects.filter(is_published=True, published_at__gt=now).order_by(
+        'published_at'
+    ).values_list('published_at', flat=True).first()
+    if next_at is not None:
+        timeout = min(timeout, int((next_at - now).total_seconds()) + PUBLICATION_GRACE_SECONDS)
+    return timeout
+
+
+def tag_cloud() -> list:
+    """Теги с опубликованными новостями: id, name, slug, news_count"""
+    cloud = cache.get(CLOUD_CACHE_KEY)
+    if cloud is None:
+        cloud = list(
+            Tag.objects.filter(news_count__gt=0)
+            .order_by('-news_count', 'name')
+            .values('id', 'name', 'slug', 'news_count')
+        )
+        cache.set(CLOUD_CACHE_KEY, cloud, _cloud_timeout_until_next_publication())
+    return cloud
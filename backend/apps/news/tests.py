@@ -0,0 +1,142 @@
+"""
+Тесты для API новостей.
+
+Для запуска тестов:
+    python manage.py test apps.news
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from apps.users.models import User
+from apps.core.publishing import apply_publications, next_publication_at
+from apps.news.models import News, Tag
+
+
+class TagCountsTestCase(TestCase):
+    """Тесты для счетчиков использования тегов и облака тегов."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User',
+            role=User.Role.ADMIN
+        )
+        self.python = Tag.objects.create(name='Python', slug='python')
+        self.django = Tag.objects.create(name='Django', slug='django')
+        self.news = News.objects.create(title='Релиз', short_description='Текст', is_published=True)
+
+    def counts(self):
+        return dict(Tag.objects.values_list('slug', 'news_count'))
+
+    def test_counts_follow_tags_and_publication(self):
+        """Счетчики учитывают изменение тегов, публикацию и удаление новостей."""
+        self.news.tags.set([self.python, self.django])
+        draft = News.objects.create(title='Черновик', short_description='Текст')
+        draft.tags.add(self.python)
+        self.assertEqual(self.counts(), {'python': 1, 'django': 1})
+
+        self.client.force_authenticate(user=self.admin)
+        self.client.post(f'/api/news/{draft.id}/publish/')
+        self.assertEqual(self.counts(), {'python': 2, 'django': 1})
+
+        news = News.objects.get(pk=self.news.id)
+        news.is_published = False
+        news.save()
+        self.assertEqual(self.counts(), {'python': 1, 'django': 0})
+
+        self.django.news.add(draft)
+        draft.delete()
+        self.assertEqual(self.counts(), {'python': 0, 'django': 0})
+
+    def test_feed_filters_by_any_and_all_tags_without_duplicates(self):
+        """Лента по тегам: any и all, без дублей новостей с несколькими тегами."""
+        self.news.tags.set([self.python, self.django])
+        other = News.objects.create(title='Другая', short_description='Текст', is_published=True)
+        other.tags.add(self.python)
+        tags = f'{self.python.id},{self.django.id}'
+
+        response = self.client.get(f'/api/news/?tags={tags}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(item['id'] for item in response.data['results']), [self.news.id, other.id])
+
+        response = self.client.get(f'/api/news/?tags={tags}&tags_match=all')
+        self.assertEqual([item['id'] for item in response.data['results']], [self.news.id])
+
+        response = self.client.get('/api/news/?tags=python')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cloud_is_cached_and_reset_on_change(self):
+        """Облако тегов кэшируется и сбрасывается после пересчета счетчиков."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.news.tags.add(self.python)
+
+        response = self.client.get('/api/news/tags/cloud/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(item['slug'], item['news_count']) for item in response.data], [('python', 1)])
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/news/tags/cloud/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.news.tags.add(self.django)
+        response = self.client.get('/api/news/tags/cloud/?limit=1')
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get('/api/news/tags/cloud/')
+        self.assertEqual([item['slug'] for item in response.data], ['django', 'python'])
+
+
+class ScheduledNewsTestCase(TestCase):
+    """Тесты для отложенной публикации новостей."""
+
+    def setUp(self):
+        """Создание тестовых данных."""
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com',
+            password='testpass123',
+            first_name='Admin',
+            last_name='User',
+            role=User.Role.ADMIN
+        )
+        self.tag = Tag.objects.create(name='Анонс', slug='announce')
+        self.news = News.objects.create(title='Анонс', short_description='Текст')
+        self.news.tags.add(self.tag)
+
+    def test_future_publication_hidden_until_due(self):
+        """Новость с будущей датой скрыта до published_at, затем планировщик обновляет счетчики."""
+        publish_at = timezone.now() + timedelta(hours=2)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(
+            f'/api/news/{self.news.id}/publish/', {'published_at': publish_at.isoformat()}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.client.get(f'/api/news/{self.news.id}/').data['is_scheduled'])
+        self.assertEqual(self.client.get('/api/news/latest/').data, [])
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get('/api/news/').data['results'], [])
+        self.assertEqual(self.client.get(f'/api/news/{self.news.id}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(next_publication_at(timezone.now()), publish_at)
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.news_count, 0)
+
+        # Время публикации наступило
+        due = timezone.now()
+        News.objects.filter(pk=self.news.id).update(published_at=due)
+        self.assertEqual(apply_publications(due - timedelta(seconds=1), timezone.now()), {'news': 1, 'albums': 0})
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.news_count, 1)
+        self.assertEqual(
+            [item['id'] for item in self.client.get('/api/news/').data['results']], [self.news.id]
+        )
@@ -3,10 +3,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.files.storage import default_storage
 import os
 
+from .filters import TagFeedFilter
 from .models import News, Tag
 from .serializers import (
     NewsListSerializer,
@@ -14,7 +16,12 @@ from .serializers import (
     NewsAdminSerializer,
     TagSerializer
 )
+from .tagging import tag_cloud
 from apps.users.permissions import IsAdmin
+from apps.core.pagination import KeysetPagination
+from apps.core.serializers import PublishSerializer
+from apps.search.filters import FullTextSearchFilter
+from apps.search.models import SearchDocument
 
 
 class TagViewSet(viewsets.ModelViewSet):
@@ -23,22 +30,51 @@ class TagViewSet(viewsets.ModelViewSet):
     pagination_class = None  # Отключаем пагинацию для тегов
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'cloud']:
             return [permissions.AllowAny()]
         return [IsAdmin()]
 
+    @action(detail=False, methods=['get'])
+    def cloud(self, request):
+        """
+        Облако тегов: теги с опубликованными новостями по убыванию news_count.
+
+        Query params:
+            limit: Сколько самых популярных тегов вернуть (по умолчанию все)
+        """
+        cloud = tag_cloud()
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except ValueError:
+                return Response({'error': 'limit должен быть числом'}, status=status.HTTP_400_BAD_REQUEST)
+            if limit < 1:
+                return Response({'error': 'limit должен быть положительным'}, status=status.HTTP_400_BAD_REQUEST)
+            cloud = cloud[:limit]
+        return Response(cloud)
+
 
 class NewsViewSet(viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['tags', 'is_published']
-    search_fields = ['title', 'short_description', 'tags__name']
+    filter_backends = [DjangoFilterBackend, TagFeedFilter, FullTextSearchFilter, filters.OrderingFilter]
+    filterset_fields = ['is_published']
+    search_entity = SearchDocument.Entity.NEWS
+    pagination_class = KeysetPagination
+    # Дата публикации, а для черновиков (published_at = NULL) - дата создания
+    cursor_ordering = ('-publication_date',)
     ordering_fields = ['published_at', 'created_at']
 
     def get_queryset(self):
-        if self.request.user.is_authenticated and self.request.user.is_admin:
-            return News.objects.all()
-        return News.objects.filter(is_published=True)
+        queryset = News.objects.annotate(
+            publication_date=Coalesce('published_at', 'created_at')
+        ).prefetch_related('tags')
+        if self.request.user.is_authenticated and self.request.user.is_admin and self.action != 'latest':
+            return queryset
+        # Опубликованные, время публикации которых наступило. У опубликованной
+        # новости published_at всегда задан, поэтому условие на publication_date
+        # равносильно условию на published_at и читает индекс news_publication_cursor_idx
+        return queryset.filter(is_published=True, publication_date__lte=timezone.now())
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -54,11 +90,21 @@ class NewsViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdmin])
     def publish(self, request, pk=None):
-        """Публикация новости"""
+        """
+        Публикация новости.
+
+        Body:
+            published_at: Время публикации (необязательно); в будущем -
+                новость скрыта из публичных списков до этого времени
+        """
         news = self.get_object()
+        serializer = PublishSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         news.is_published = True
-        news.published_at = timezone.now()
+        news.published_at = serializer.validated_data.get('published_at') or timezone.now()
         news.save()
+        if news.is_scheduled:
+            return Response({'status': 'Публикация новости запланирована', 'published_at': news.published_at})
         return Response({'status': 'Новость опубликована'})
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdmin])
@@ -73,7 +119,7 @@ class NewsViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny()])
     def latest(self, request):
         """Последние новости для главной страницы"""
-        news = self.get_queryset().filter(is_published=True)[:5]
+        news = self.get_queryset()[:5]
         serializer = NewsListSerializer(news, many=True, context={'request': request})
         return Response(serializer.data)
 
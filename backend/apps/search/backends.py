@@ -0,0 +1,219 @@
+"""
+Поисковые бэкенды.
+
+PostgreSQL: tsvector с весами A/B/C, GIN-индекс, русская морфология
+(конфигурация SEARCH_CONFIG), ранжирование ts_rank и подсветка ts_headline.
+
+SQLite (локальная разработка): FTS5-таблица search_searchdocument_fts с
+токенизатором unicode61, ранжирование bm25 с теми же весами полей и
+подсветка snippet(). Стемминга нет, поэтому каждое слово запроса ищется
+как префикс.
+"""
+
+import re
+from dataclasses import dataclass
+from html import escape
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Subquery
+from django.db.models.expressions import RawSQL
+
+from .models import SearchDocument
+
+FTS_TABLE = 'search_searchdocument_fts'
+
+# Веса полей title, summary, body
+FIELD_WEIGHTS = (1.0, 0.4, 0.1)
+
+# Маркеры подсветки заменяются на <mark> после экранирования текста
+_MARK_START = '\x02'
+_MARK_STOP = '\x03'
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    entity: str
+    object_id: int
+    title: str
+    rank: float
+    snippet: str
+    course_id: Optional[int] = None
+
+
+def _highlight_html(text: str) -> str:
+    """Экранирует фрагмент и превращает маркеры подсветки в <mark>"""
+    return escape(text or '').replace(_MARK_START, '<mark>').replace(_MARK_STOP, '</mark>')
+
+
+def query_terms(text: str) -> List[str]:
+    """Слова поискового запроса в нижнем регистре"""
+    return _TERM_RE.findall((text or '').lower())
+
+
+class PostgresSearchBackend:
+    """Полнотекстовый поиск на tsvector/tsquery"""
+
+    def __init__(self):
+        self.config = getattr(settings, 'SEARCH_CONFIG', 'russian')
+
+    def update_documents(self, ids: Iterable[int]):
+        """Пересчитывает search_vector для документов"""
+        from django.contrib.postgres.search import SearchVector
+
+        vector = (
+            SearchVector('title', weight='A', config=self.config)
+            + SearchVector('summary', weight='B', config=self.config)
+            + SearchVector('body', weight='C', config=self.config)
+        )
+        SearchDocument.objects.filter(pk__in=list(ids)).update(search_vector=vector)
+
+    def _query(self, text: str):
+        from django.contrib.postgres.search import SearchQuery
+        return SearchQuery(text, config=self.config, search_type='websearch')
+
+    def _rank(self, query):
+        from django.contrib.postgres.search import SearchRank
+        # ts_rank принимает веса в порядке D, C, B, A
+        weights = [0.0, FIELD_WEIGHTS[2], FIELD_WEIGHTS[1], FIELD_WEIGHTS[0]]
+        return SearchRank(F('search_vector'), query, weights=weights)
+
+    def filter_queryset(self, queryset, entity: str, text: str):
+        """
+        Оставляет в queryset найденные объекты и сортирует их по релевантности.
+
+        Релевантность доступна в аннотации search_rank (больше - лучше).
+        """
+        query = self._query(text)
+        ranks = SearchDocument.objects.filter(
+            entity=entity, object_id=OuterRef('pk'), search_vector=query
+        ).annotate(rank=self._rank(query)).values('rank')[:1]
+
+        return queryset.annotate(
+            search_rank=Subquery(ranks, output_field=FloatField())
+        ).filter(search_rank__isnull=False).order_by('-search_rank', '-pk')
+
+    def search(self, text: str, documents=None, limit: int = 20) -> List[SearchHit]:
+        """
+        Документы, подходящие под запрос, с фрагментами текста и подсветкой.
+
+        Args:
+            text: Поисковый запрос
+            documents: Queryset SearchDocument, в котором искать (по умолчанию - все)
+            limit: Максимальное количество результатов
+        """
+        from django.contrib.postgres.search import SearchHeadline
+
+        query = self._query(text)
+        if documents is None:
+            documents = SearchDocument.objects.all()
+
+        documents = documents.filter(search_vector=query).annotate(
+            rank=self._rank(query),
+            snippet=SearchHeadline(
+                'body', query, config=self.config,
+                start_sel=_MARK_START, stop_sel=_MARK_STOP, max_words=30, min_words=10
+            ),
+        ).order_by('-rank')[:limit]
+
+        return [
+            SearchHit(
+                doc.entity, doc.object_id, doc.title, doc.rank, _highlight_html(doc.snippet), doc.course_id
+            )
+            for doc in documents
+        ]
+
+
+class SqliteSearchBackend:
+    """Полнотекстовый поиск на FTS5"""
+
+    def update_documents(self, ids: Iterable[int]):
+        """FTS5-таблица обновляется триггерами"""
+
+    def _match(self, text: str) -> Optional[str]:
+        terms = query_terms(text)
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def _bm25(self) -> str:
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS)
+        return f'bm25({FTS_TABLE}, {weights})'
+
+    def filter_queryset(self, queryset, entity: str, text: str):
+        """
+        Оставляет в queryset найденные объекты и сортирует их по релевантности.
+
+        Релевантность доступна в аннотации search_rank (больше - лучше).
+        """
+        match = self._match(text)
+        if match is None:
+            return queryset.none()
+
+        doc_table = SearchDocument._meta.db_table
+        outer_pk = '{}.{}'.format(
+            connection.ops.quote_name(queryset.model._meta.db_table),
+            connection.ops.quote_name(queryset.model._meta.pk.column),
+        )
+        matched = (
+            f'SELECT d.object_id FROM {FTS_TABLE} JOIN {doc_table} d ON d.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND d.entity = %s'
+        )
+        # bm25 возвращает отрицательные значения: чем меньше, тем релевантнее
+        rank = (
+            f'SELECT -{self._bm25()} FROM {FTS_TABLE} JOIN {doc_table} d ON d.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s AND d.entity = %s AND d.object_id = {outer_pk}'
+        )
+
+        return queryset.filter(
+            pk__in=RawSQL(matched, [match, entity])
+        ).annotate(
+            search_rank=RawSQL(rank, [match, entity], output_field=FloatField())
+        ).order_by('-search_rank', '-pk')
+
+    def search(self, text: str, documents=None, limit: int = 20) -> List[SearchHit]:
+        """
+        Документы, подходящие под запрос, с фрагментами текста и подсветкой.
+
+        Args:
+            text: Поисковый запрос
+            documents: Queryset SearchDocument, в котором искать (по умолчанию - все)
+            limit: Максимальное количество результатов
+        """
+        match = self._match(text)
+        if match is None:
+            return []
+
+        doc_table = SearchDocument._meta.db_table
+        sql = (
+            f'SELECT d.entity, d.object_id, d.title, -{self._bm25()} AS rank, d.course_id, '
+            f"snippet({FTS_TABLE}, 2, %s, %s, '…', 30) "
+            f'FROM {FTS_TABLE} JOIN {doc_table} d ON d.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s'
+        )
+        params = [_MARK_START, _MARK_STOP, match]
+        if documents is not None:
+            subquery, subquery_params = documents.order_by().values('id').query.sql_with_params()
+            sql += f' AND d.id IN ({subquery})'
+            params.extend(subquery_params)
+        sql += ' ORDER BY rank DESC LIMIT %s'
+        params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        return [
+            SearchHit(entity, object_id, title, rank, _highlight_html(snippet), course_id)
+            for entity, object_id, title, rank, course_id, snippet in rows
+        ]
+
+
+def get_search_backend():
+    """Бэкенд поиска для текущей БД"""
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return SqliteSearchBackend()
@@ -0,0 +1,29 @@
+from rest_framework.filters import BaseFilterBackend
+
+from .backends import get_search_backend
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск по параметру ?search= вместо SearchFilter.
+
+    Тип документов задается атрибутом view.search_entity. Результаты
+    сортируются по релевантности, если запрошенная сортировка (?ordering=)
+    не задана - OrderingFilter должен стоять в filter_backends после этого фильтра.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return get_search_backend().filter_queryset(queryset, view.search_entity, text)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Полнотекстовый поиск',
+            'schema': {'type': 'string'},
+        }]
@@ -0,0 +1,305 @@
+"""
+Построение и обновление поисковых документов.
+
+Изменения объектов не индексируются сразу: сигналы ставят объект в очередь,
+а очередь разбирается после фиксации транзакции. Так пакетное изменение
+курса (десятки элементов) переиндексирует курс один раз, а откат транзакции
+не оставляет в индексе несуществующих данных.
+"""
+
+import threading
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .backends import get_search_backend, query_terms
+from .models import SearchDocument, SearchTerm
+from .text import blocks_to_text, html_to_text, join_text
+
+Entity = SearchDocument.Entity
+
+# Псевдотип очереди: курс со всеми разделами и элементами
+COURSE_TREE = 'course_tree'
+
+_pending = threading.local()
+
+
+def _element_text(element) -> str:
+    return join_text(
+        html_to_text(element.text_content),
+        element.link_text,
+        element.homework_description,
+        blocks_to_text(element.data),
+    )
+
+
+def _course_document(course) -> dict:
+    """
+    Текст курса: описание и названия разделов.
+
+    Содержимое элементов индексируется в их собственных документах, чтобы
+    фрагменты текста закрытых элементов не попадали в результаты по курсу.
+    """
+    return {
+        'title': course.title,
+        'summary': course.short_description,
+        'body': join_text(
+            html_to_text(course.description),
+            *(section.title for section in course.sections.all())
+        ),
+        'course_id': course.pk,
+        'is_published': course.is_published,
+        'available_from': None,
+    }
+
+
+def _section_document(section) -> dict:
+    """Раздел: название и заголовки его элементов"""
+    return {
+        'title': section.title,
+        'summary': '',
+        'body': join_text(*(element.title for element in section.elements.all())),
+        'course_id': section.course_id,
+        'is_published': section.is_published,
+        'available_from': section.publish_datetime,
+    }
+
+
+def _element_document(element) -> dict:
+    """Элемент доступен, только если доступен и его раздел"""
+    section = element.section
+    dates = [date for date in (section.publish_datetime, element.publish_datetime) if date]
+    return {
+        'title': element.title or section.title,
+        'summary': '',
+        'body': _element_text(element),
+        'course_id': section.course_id,
+        'is_published': element.is_published and section.is_published,
+        'available_from': max(dates) if dates else None,
+    }
+
+
+def _news_document(news) -> dict:
+    """Текст новости: описание, теги, HTML-контент и блоки"""
+    return {
+        'title': news.title,
+        'summary': join_text(news.short_description, *(tag.name for tag in news.tags.all())),
+        'body': join_text(html_to_text(news.content), blocks_to_text(news.content_blocks)),
+        'is_published': news.is_published,
+        # Отложенная публикация: документ находится только с published_at
+        'available_from': news.published_at,
+    }
+
+
+def _album_document(album) -> dict:
+    """Альбом: описание и подписи фотографий"""
+    parts = []
+    for photo in album.photos.all():
+        parts.extend([photo.title, photo.description])
+    return {
+        'title': album.title,
+        'summary': album.description,
+        'body': join_text(*parts),
+        'is_published': album.is_published,
+        'available_from': album.published_at,
+    }
+
+
+def _course_queryset():
+    from apps.courses.models import Course
+    return Course.objects.prefetch_related('sections')
+
+
+def _section_queryset():
+    from apps.courses.models import Section
+    return Section.objects.prefetch_related('elements')
+
+
+def _element_queryset():
+    from apps.courses.models import ContentElement
+    return ContentElement.objects.select_related('section')
+
+
+def _news_queryset():
+    from apps.news.models import News
+    return News.objects.prefetch_related('tags')
+
+
+def _album_queryset():
+    from apps.gallery.models import Album
+    return Album.objects.prefetch_related('photos')
+
+
+# Тип документа -> (queryset с нужными prefetch, построитель документа)
+REGISTRY = {
+    Entity.COURSE: (_course_queryset, _course_document),
+    Entity.SECTION: (_section_queryset, _section_document),
+    Entity.ELEMENT: (_element_queryset, _element_document),
+    Entity.NEWS: (_news_queryset, _news_document),
+    Entity.ALBUM: (_album_queryset, _album_document),
+}
+
+DOCUMENT_FIELDS = ['title', 'summary', 'body', 'course_id', 'is_published', 'available_from']
+
+
+def normalize_term(term: str) -> str:
+    """Слово в форме, в которой оно хранится в SearchTerm"""
+    return term.replace('ё', 'е')[:SearchTerm.MAX_LENGTH]
+
+
+def document_terms(document: SearchDocument) -> dict:
+    """Слова документа с весом поля, где они встретились"""
+    terms = {}
+    for text, weight in (
+        (document.body, SearchTerm.BODY_WEIGHT),
+        (document.summary, SearchTerm.SUMMARY_WEIGHT),
+        (document.title, SearchTerm.TITLE_WEIGHT),
+    ):
+        for term in query_terms(text):
+            if len(term) > 1:
+                terms[normalize_term(term)] = weight
+    return terms
+
+
+def _replace_terms(documents):
+    SearchTerm.objects.filter(document__in=documents).delete()
+    SearchTerm.objects.bulk_create(
+        [
+            SearchTerm(document=document, term=term, weight=weight)
+            for document in documents
+            for term, weight in document_terms(document).items()
+        ],
+        batch_size=1000
+    )
+
+
+def index_objects(entity: str, ids: Optional[Iterable[int]] = None, batch_size: int = 200) -> int:
+    """
+    Создает или обновляет документы для объектов.
+
+    Документы объектов из ids, которых больше нет в БД, удаляются.
+
+    Args:
+        entity: Тип объектов
+        ids: ID объектов (None - все объекты типа)
+        batch_size: Размер пачки при загрузке объектов
+
+    Returns:
+        Количество проиндексированных объектов
+    """
+    get_queryset, build = REGISTRY[entity]
+    backend = get_search_backend()
+
+    queryset = get_queryset().order_by('pk')
+    if ids is not None:
+        ids = set(ids)
+        queryset = queryset.filter(pk__in=ids)
+
+    indexed = set()
+    batch = []
+
+    def flush_batch():
+        existing = {
+            document.object_id: document
+            for document in SearchDocument.objects.filter(
+                entity=entity, object_id__in=[obj.pk for obj in batch]
+            )
+        }
+        now = timezone.now()
+
+        to_create, to_update = [], []
+        for obj in batch:
+            fields = build(obj)
+            document = existing.get(obj.pk)
+            if document is None:
+                to_create.append(SearchDocument(entity=entity, object_id=obj.pk, **fields))
+            else:
+                for name, value in fields.items():
+                    setattr(document, name, value)
+                document.updated_at = now
+                to_update.append(document)
+
+        created = SearchDocument.objects.bulk_create(to_create)
+        # bulk_update не вызывает auto_now - обновляем дату явно
+        SearchDocument.objects.bulk_update(to_update, DOCUMENT_FIELDS + ['updated_at'])
+        documents = created + to_update
+        backend.update_documents([document.pk for document in documents])
+        _replace_terms(documents)
+        batch.clear()
+
+    for obj in queryset.iterator(chunk_size=batch_size):
+        batch.append(obj)
+        indexed.add(obj.pk)
+        if len(batch) >= batch_size:
+            flush_batch()
+    if batch:
+        flush_batch()
+
+    stale = SearchDocument.objects.filter(entity=entity)
+    if ids is not None:
+        stale = stale.filter(object_id__in=ids - indexed)
+    else:
+        stale = stale.exclude(object_id__in=get_queryset().values('pk'))
+    stale.delete()
+
+    return len(indexed)
+
+
+def _expand_course_trees(queue: dict):
+    """Добавляет в очередь разделы и элементы курсов из COURSE_TREE"""
+    from apps.courses.models import ContentElement, Section
+
+    course_ids = queue.pop(COURSE_TREE, None)
+    if not course_ids:
+        return
+    queue.setdefault(Entity.COURSE, set()).update(course_ids)
+    queue.setdefault(Entity.SECTION, set()).update(
+        Section.objects.filter(course_id__in=course_ids).values_list('id', flat=True)
+    )
+    queue.setdefault(Entity.ELEMENT, set()).update(
+        ContentElement.objects.filter(section__course_id__in=course_ids).values_list('id', flat=True)
+    )
+    # Документы удаленных разделов и элементов
+    for entity in (Entity.SECTION, Entity.ELEMENT):
+        queue[entity].update(
+            SearchDocument.objects.filter(entity=entity, course_id__in=course_ids)
+            .values_list('object_id', flat=True)
+        )
+
+
+def _flush_pending():
+    queue = getattr(_pending, 'queue', None)
+    if not queue:
+        return
+    _pending.queue = {}
+    _expand_course_trees(queue)
+    for entity, ids in queue.items():
+        index_objects(entity, ids)
+
+
+def schedule_index(entity: str, object_id):
+    """
+    Ставит объект в очередь на переиндексацию после фиксации транзакции.
+
+    Повторные вызовы для одного объекта в рамках транзакции объединяются.
+    """
+    if object_id is None:
+        return
+    queue = getattr(_pending, 'queue', None)
+    if queue is None:
+        queue = _pending.queue = {}
+    queue.setdefault(entity, set()).add(object_id)
+    # Обработчик регистрируется каждый раз: если предыдущая транзакция была
+    # отменена, ее объекты переиндексируются вместе с текущими (по данным БД)
+    transaction.on_commit(_flush_pending)
+
+
+def schedule_course_tree(course_id):
+    """
+    Переиндексирует курс со всеми разделами и элементами.
+
+    Нужен после bulk-операций, которые не отправляют сигналы. Состав курса
+    определяется в момент разбора очереди, то есть уже после фиксации.
+    """
+    schedule_index(COURSE_TREE, course_id)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.search.indexing import REGISTRY, index_objects
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс (документы и слова для подсказок)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entity',
+            choices=[str(entity) for entity in REGISTRY],
+            action='append',
+            help='Тип объектов (можно указать несколько раз, по умолчанию - все)'
+        )
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        entities = options['entity'] or list(REGISTRY)
+        for entity in entities:
+            count = index_objects(entity, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{entity}: проиндексировано {count}'))
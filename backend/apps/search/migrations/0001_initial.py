@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:54
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('course', 'Курс'), ('news', 'Новость')], max_length=20, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('title', models.TextField(blank=True, verbose_name='Заголовок')),
+                ('summary', models.TextField(blank=True, verbose_name='Краткое описание')),
+                ('body', models.TextField(blank=True, verbose_name='Текст')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Поисковый документ',
+                'verbose_name_plural': 'Поисковые документы',
+                'unique_together': {('entity', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+"""
+Индексы полнотекстового поиска, зависящие от СУБД (см. apps.search.schema).
+"""
+
+from django.db import migrations
+
+from apps.search.schema import run_statements
+
+
+def create_search_indexes(apps, schema_editor):
+    run_statements(schema_editor)
+
+
+def drop_search_indexes(apps, schema_editor):
+    run_statements(schema_editor, backward=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
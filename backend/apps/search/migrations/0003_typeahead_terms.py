@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.search.schema import recreate_sqlite_triggers
+
+
+def restore_triggers(apps, schema_editor):
+    recreate_sqlite_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchdocument',
+            name='available_from',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Доступно с'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='course_id',
+            field=models.PositiveBigIntegerField(blank=True, db_index=True, null=True, verbose_name='ID курса'),
+        ),
+        migrations.AddField(
+            model_name='searchdocument',
+            name='is_published',
+            field=models.BooleanField(default=True, verbose_name='Опубликовано'),
+        ),
+        migrations.AlterField(
+            model_name='searchdocument',
+            name='entity',
+            field=models.CharField(choices=[('course', 'Курс'), ('section', 'Раздел курса'), ('element', 'Элемент курса'), ('news', 'Новость'), ('album', 'Альбом')], max_length=20, verbose_name='Тип объекта'),
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveSmallIntegerField(default=1, verbose_name='Вес')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='search.searchdocument', verbose_name='Документ')),
+            ],
+            options={
+                'verbose_name': 'Слово поискового индекса',
+                'verbose_name_plural': 'Слова поискового индекса',
+                'unique_together': {('term', 'document')},
+            },
+        ),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
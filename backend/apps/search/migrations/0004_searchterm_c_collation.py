@@ -0,0 +1,35 @@
+"""
+Побайтовая сортировка для колонки слов на PostgreSQL.
+
+При языковой сортировке (ru_RU.UTF-8) диапазон term >= 'pre' AND term < 'prf'
+не обязан совпадать с префиксом 'pre', а btree-индекс не используется для
+LIKE 'pre%'. С COLLATE "C" диапазонный запрос по префиксу точен и идет по
+индексу (term, document_id). На SQLite сортировка по умолчанию уже побайтовая.
+"""
+
+from django.db import migrations
+
+
+def set_c_collation(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE search_searchterm ALTER COLUMN term TYPE varchar(64) COLLATE "C"'
+        )
+
+
+def reset_collation(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE search_searchterm ALTER COLUMN term TYPE varchar(64) COLLATE "default"'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0003_typeahead_terms'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_c_collation, reset_collation),
+    ]
@@ -0,0 +1,81 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Поисковый документ - текст объекта, подготовленный для полнотекстового поиска.
+
+    Поля имеют разный вес при ранжировании: title (A) > summary (B) > body (C).
+    На PostgreSQL индексируется search_vector (GIN), на SQLite - FTS5-таблица,
+    которая синхронизируется с этой таблицей триггерами (см. миграцию 0002).
+
+    course_id, is_published и available_from копируются из объекта, чтобы
+    проверять доступ к результатам без соединения с таблицами курсов.
+    """
+    class Entity(models.TextChoices):
+        COURSE = 'course', 'Курс'
+        SECTION = 'section', 'Раздел курса'
+        ELEMENT = 'element', 'Элемент курса'
+        NEWS = 'news', 'Новость'
+        ALBUM = 'album', 'Альбом'
+
+    entity = models.CharField('Тип объекта', max_length=20, choices=Entity.choices)
+    object_id = models.PositiveBigIntegerField('ID объекта')
+
+    title = models.TextField('Заголовок', blank=True)
+    summary = models.TextField('Краткое описание', blank=True)
+    body = models.TextField('Текст', blank=True)
+
+    course_id = models.PositiveBigIntegerField('ID курса', null=True, blank=True, db_index=True)
+    # Для элемента учитывается публикация раздела
+    is_published = models.BooleanField('Опубликовано', default=True)
+    # Для элемента - более поздняя из дат публикации элемента и раздела
+    available_from = models.DateTimeField('Доступно с', null=True, blank=True)
+
+    # Заполняется только на PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Поисковый документ'
+        verbose_name_plural = 'Поисковые документы'
+        unique_together = ['entity', 'object_id']
+
+    def __str__(self):
+        return f'{self.entity}:{self.object_id} {self.title}'
+
+
+class SearchTerm(models.Model):
+    """
+    Обратный индекс для подсказок при вводе (typeahead).
+
+    Хранит каждое слово документа один раз с наибольшим весом поля, в котором
+    оно встретилось: 3 - заголовок, 2 - краткое описание, 1 - текст.
+    Поиск по префиксу выполняется диапазоном term >= 'pre' AND term < 'prf'
+    по индексу (term, document); на PostgreSQL колонка term использует
+    сортировку "C", чтобы диапазон совпадал с префиксом (миграция 0004).
+    """
+    TITLE_WEIGHT = 3
+    SUMMARY_WEIGHT = 2
+    BODY_WEIGHT = 1
+
+    MAX_LENGTH = 64
+
+    document = models.ForeignKey(
+        SearchDocument,
+        on_delete=models.CASCADE,
+        related_name='terms',
+        verbose_name='Документ'
+    )
+    term = models.CharField('Слово', max_length=MAX_LENGTH)
+    weight = models.PositiveSmallIntegerField('Вес', default=BODY_WEIGHT)
+
+    class Meta:
+        verbose_name = 'Слово поискового индекса'
+        verbose_name_plural = 'Слова поискового индекса'
+        unique_together = ['term', 'document']
+
+    def __str__(self):
+        return self.term
@@ -0,0 +1,105 @@
+"""
+Запросы к поисковому индексу с учетом прав пользователя.
+"""
+
+import operator
+from functools import reduce
+from typing import Iterable, List, Optional
+
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from apps.courses.access import get_course_access
+from apps.courses.models import Course
+
+from .backends import query_terms
+from .indexing import normalize_term
+from .models import SearchDocument, SearchTerm
+
+Entity = SearchDocument.Entity
+
+# Больше слов в подсказке не ищем: каждое слово - отдельный диапазон по индексу
+TYPEAHEAD_MAX_WORDS = 5
+
+
+def visible_documents(request, entities: Optional[Iterable[str]] = None):
+    """
+    Документы, которые пользователь может видеть в результатах поиска.
+
+    Правила совпадают со списками курсов, разделов и элементов:
+    - админы видят все;
+    - новости, альбомы и курсы - только опубликованные (свои курсы - все),
+      новости и альбомы - с наступившей датой публикации;
+    - разделы и элементы студент видит в курсах, где он подписчик или
+      владелец, если они опубликованы и не заблокированы по publish_datetime;
+    - преподаватель видит разделы и элементы опубликованных и своих курсов.
+    """
+    user = request.user
+    documents = SearchDocument.objects.all()
+    if entities is not None:
+        documents = documents.filter(entity__in=list(entities))
+
+    if user.is_authenticated and user.is_admin:
+        return documents
+
+    now = timezone.now()
+    # Новости и альбомы с отложенной публикацией скрыты до available_from
+    visible = (
+        Q(entity__in=[Entity.COURSE, Entity.NEWS, Entity.ALBUM], is_published=True)
+        & (Q(available_from__isnull=True) | Q(available_from__lte=now))
+    )
+    if not user.is_authenticated:
+        return documents.filter(visible)
+
+    access = get_course_access(request)
+    course_content = Q(entity__in=[Entity.SECTION, Entity.ELEMENT])
+    if user.is_teacher:
+        course_content &= Q(course_id__in=Course.objects.filter(is_published=True).values('id'))
+    else:
+        course_content &= (
+            Q(course_id__in=access.subscribed_ids, is_published=True)
+            & (Q(available_from__isnull=True) | Q(available_from__lte=now))
+        )
+
+    return documents.filter(visible | course_content | Q(course_id__in=access.owned_ids))
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Наименьшая строка, которая больше всех строк с префиксом prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def typeahead(text: str, documents, limit: int = 8) -> List[SearchDocument]:
+    """
+    Подсказки при вводе: документы, содержащие слова с префиксами из запроса.
+
+    Каждое слово запроса - диапазон по индексу SearchTerm(term, document),
+    документы должны содержать все слова. Порядок - по сумме весов полей,
+    где найдены слова (заголовок важнее текста).
+
+    Args:
+        text: Введенный текст
+        documents: Queryset SearchDocument, в котором искать
+        limit: Максимальное количество подсказок
+    """
+    words = list(dict.fromkeys(normalize_term(word) for word in query_terms(text)))[:TYPEAHEAD_MAX_WORDS]
+    if not words:
+        return []
+
+    conditions = [Q(term__gte=word, term__lt=_prefix_upper_bound(word)) for word in words]
+    matched_word = Case(
+        *[When(condition, then=Value(index)) for index, condition in enumerate(conditions)],
+        output_field=IntegerField()
+    )
+
+    rows = (
+        SearchTerm.objects
+        .filter(reduce(operator.or_, conditions), document__in=documents.order_by().values('id'))
+        .values('document_id')
+        .annotate(matched_words=Count(matched_word, distinct=True), score=Sum('weight'))
+        .filter(matched_words=len(words))
+        .order_by('-score', 'document_id')[:limit]
+    )
+    ids = [row['document_id'] for row in rows]
+    found = SearchDocument.objects.only('entity', 'object_id', 'title', 'course_id').in_bulk(ids)
+    return [found[document_id] for document_id in ids if document_id in found]
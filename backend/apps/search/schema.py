@@ -0,0 +1,80 @@
+"""
+SQL индексов полнотекстового поиска, зависящих от СУБД.
+
+PostgreSQL: GIN-индекс по search_vector.
+SQLite: FTS5-таблица с внешним содержимым (content=search_searchdocument),
+которую синхронизируют триггеры на вставку, изменение и удаление документов.
+
+SQLite пересоздает таблицу при большинстве изменений схемы (AddField,
+AlterField), и триггеры при этом удаляются. Миграции, меняющие
+SearchDocument, должны заканчиваться вызовом recreate_sqlite_triggers.
+"""
+
+POSTGRES_FORWARD = [
+    'CREATE INDEX search_doc_vector_gin ON search_searchdocument USING GIN (search_vector)',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS search_doc_vector_gin',
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5(
+        title, summary, body,
+        content='search_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_ai AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(rowid, title, summary, body)
+        VALUES (new.id, new.title, new.summary, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_ad AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, summary, body)
+        VALUES ('delete', old.id, old.title, old.summary, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_searchdocument_au AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, summary, body)
+        VALUES ('delete', old.id, old.title, old.summary, old.body);
+        INSERT INTO search_searchdocument_fts(rowid, title, summary, body)
+        VALUES (new.id, new.title, new.summary, new.body);
+    END
+    """,
+]
+SQLITE_REBUILD = "INSERT INTO search_searchdocument_fts(search_searchdocument_fts) VALUES ('rebuild')"
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS search_searchdocument_au',
+    'DROP TRIGGER IF EXISTS search_searchdocument_ad',
+    'DROP TRIGGER IF EXISTS search_searchdocument_ai',
+    'DROP TABLE IF EXISTS search_searchdocument_fts',
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRES_FORWARD, POSTGRES_BACKWARD),
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def run_statements(schema_editor, backward=False):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    for sql in statements[1 if backward else 0]:
+        schema_editor.execute(sql)
+    if not backward and schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(SQLITE_REBUILD)
+
+
+def recreate_sqlite_triggers(schema_editor):
+    """Восстанавливает триггеры FTS5 после пересоздания таблицы на SQLite"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in SQLITE_FORWARD:
+        if 'CREATE TRIGGER' in sql:
+            schema_editor.execute(sql.replace('CREATE TRIGGER', 'CREATE TRIGGER IF NOT EXISTS'))
+    schema_editor.execute(SQLITE_REBUILD)
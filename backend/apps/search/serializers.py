@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from .models import SearchDocument
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    """Параметры глобального поиска"""
+    MODE_FULL = 'full'
+    MODE_TYPEAHEAD = 'typeahead'
+
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    mode = serializers.ChoiceField(choices=[MODE_FULL, MODE_TYPEAHEAD], default=MODE_FULL)
+    entity = serializers.ListField(
+        child=serializers.ChoiceField(choices=SearchDocument.Entity.choices),
+        required=False
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=50, required=False)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Результат поиска: объект, его курс (для разделов и элементов) и фрагмент текста"""
+    entity = serializers.CharField()
+    id = serializers.IntegerField(source='object_id')
+    course_id = serializers.IntegerField(allow_null=True)
+    title = serializers.CharField()
+    snippet = serializers.CharField(required=False)
+    rank = serializers.FloatField(required=False)
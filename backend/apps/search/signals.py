@@ -0,0 +1,81 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.courses.models import ContentElement, Course, Section
+from apps.gallery.models import Album, Photo
+from apps.news.models import News, Tag
+
+from .indexing import Entity, schedule_index
+
+
+@receiver([post_save, post_delete], sender=Course)
+def index_course(sender, instance, **kwargs):
+    schedule_index(Entity.COURSE, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Section)
+def index_section(sender, instance, **kwargs):
+    schedule_index(Entity.COURSE, instance.course_id)
+    schedule_index(Entity.SECTION, instance.pk)
+
+
+@receiver(post_save, sender=Section)
+def index_section_elements(sender, instance, created, **kwargs):
+    """Публикация и дата раздела входят в документы его элементов"""
+    if created:
+        return
+    for element_id in instance.elements.values_list('id', flat=True):
+        schedule_index(Entity.ELEMENT, element_id)
+
+
+@receiver([post_save, post_delete], sender=ContentElement)
+def index_element(sender, instance, **kwargs):
+    """Заголовки элементов входят в документ раздела"""
+    schedule_index(Entity.SECTION, instance.section_id)
+    schedule_index(Entity.ELEMENT, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=News)
+def index_news(sender, instance, **kwargs):
+    schedule_index(Entity.NEWS, instance.pk)
+
+
+@receiver(m2m_changed, sender=News.tags.through)
+def index_news_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Теги входят в текст новости"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            schedule_index(Entity.NEWS, instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        for news_id in pk_set:
+            schedule_index(Entity.NEWS, news_id)
+    elif action == 'pre_clear':
+        # После очистки связи уже не найти
+        _schedule_tag_news(instance)
+
+
+def _schedule_tag_news(tag):
+    for news_id in tag.news.values_list('id', flat=True):
+        schedule_index(Entity.NEWS, news_id)
+
+
+@receiver(post_save, sender=Tag)
+def index_tag_news(sender, instance, created, **kwargs):
+    """Переименование тега меняет текст всех новостей с ним"""
+    if not created:
+        _schedule_tag_news(instance)
+
+
+@receiver(pre_delete, sender=Tag)
+def index_deleted_tag_news(sender, instance, **kwargs):
+    _schedule_tag_news(instance)
+
+
+@receiver([post_save, post_delete], sender=Album)
+def index_album(sender, instance, **kwargs):
+    schedule_index(Entity.ALBUM, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Photo)
+def index_photo_album(sender, instance, **kwargs):
+    schedule_index(Entity.ALBUM, instance.album_id)
@@ -0,0 +1,212 @@
+"""
+Тесты полнотекстового поиска.
+
+Для запуска тестов:
+    python manage.py test apps.search
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, Section, ContentElement, Subscription
+from apps.gallery.models import Album
+from apps.news.models import News, Tag
+from apps.users.models import User
+from apps.search.backends import get_search_backend
+from apps.search.models import SearchDocument
+from apps.search.text import blocks_to_text, html_to_text
+
+
+class TextExtractionTestCase(TestCase):
+    """Тесты извлечения текста из HTML и блоков."""
+
+    def test_html_to_text(self):
+        html = '<p>Первый&nbsp;абзац</p><p>второй</p><script>alert(1)</script>'
+        self.assertEqual(html_to_text(html), 'Первый абзац второй')
+
+    def test_blocks_to_text_skips_urls(self):
+        blocks = [
+            {'type': 'text', 'data': {'html': '<b>Фотосинтез</b> растений'}},
+            {'type': 'gallery', 'data': {'images': [{'url': '/media/a.jpg', 'caption': 'Лист'}]}},
+            {'type': 'video', 'data': {'url': 'https://youtu.be/xyz', 'title': 'Опыт'}},
+        ]
+        self.assertEqual(blocks_to_text(blocks), 'Фотосинтез растений Лист Опыт')
+
+
+class FullTextSearchAPITestCase(TestCase):
+    """Тесты поиска в списках курсов и новостей."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.botany = Course.objects.create(
+                title='Растения вокруг нас',
+                short_description='Курс о растениях',
+                description='<p>Строение клетки</p>',
+                creator=self.teacher,
+                is_published=True
+            )
+            section = Section.objects.create(course=self.botany, title='Введение', order=1)
+            ContentElement.objects.create(
+                section=section,
+                content_type='text',
+                data={'type': 'text', 'version': 1, 'html': '<p>Хлоропласты и фотосинтез</p>'}
+            )
+            self.chemistry = Course.objects.create(
+                title='Химия',
+                short_description='Реакции и растворы, немного про растения',
+                creator=self.teacher,
+                is_published=True
+            )
+            self.draft = Course.objects.create(
+                title='Черновик про растения',
+                short_description='Черновик',
+                creator=self.teacher,
+                is_published=False
+            )
+
+            tag = Tag.objects.create(name='Олимпиады', slug='olympiads')
+            self.news = News.objects.create(
+                title='Итоги смены',
+                short_description='Подводим итоги',
+                content_blocks=[{'type': 'text', 'data': {'html': '<p>Победители олимпиады</p>'}}],
+                is_published=True
+            )
+            self.news.tags.add(tag)
+
+    def search_ids(self, url, query):
+        response = self.client.get(url, {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_ranks_title_above_description(self):
+        ids = self.search_ids('/api/courses/', 'растения')
+        self.assertEqual(ids, [self.botany.id, self.chemistry.id])
+
+    def test_search_description_and_sections(self):
+        self.assertEqual(self.search_ids('/api/courses/', 'клетки'), [self.botany.id])
+        self.assertEqual(self.search_ids('/api/courses/', 'введение'), [self.botany.id])
+
+    def test_search_news_blocks_and_tags(self):
+        self.assertEqual(self.search_ids('/api/news/', 'победители'), [self.news.id])
+        self.assertEqual(self.search_ids('/api/news/', 'олимпиады'), [self.news.id])
+
+    def test_document_updated_on_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chemistry.title = 'Органическая химия'
+            self.chemistry.save()
+        self.assertEqual(self.search_ids('/api/courses/', 'органическая'), [self.chemistry.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chemistry.delete()
+        self.assertFalse(
+            SearchDocument.objects.filter(entity='course', object_id=self.chemistry.id).exists()
+        )
+
+    def test_search_highlight(self):
+        hits = get_search_backend().search(
+            'хлоропласты', documents=SearchDocument.objects.filter(entity='element')
+        )
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0].course_id, self.botany.id)
+        self.assertIn('<mark>Хлоропласты</mark>', hits[0].snippet)
+
+
+class GlobalSearchAPITestCase(TestCase):
+    """Тесты глобального поиска /api/search/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(
+            email='teacher@test.com',
+            password='testpass123',
+            first_name='Teacher',
+            last_name='User',
+            role=User.Role.TEACHER
+        )
+        self.student = User.objects.create_user(
+            email='student@test.com',
+            password='testpass123',
+            first_name='Student',
+            last_name='User'
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(
+                title='Астрономия',
+                short_description='Звезды и планеты',
+                creator=self.teacher,
+                is_published=True
+            )
+            self.section = Section.objects.create(course=self.course, title='Телескопы', order=1)
+            self.element = ContentElement.objects.create(
+                section=self.section,
+                content_type='text',
+                title='Рефрактор',
+                data={'type': 'text', 'version': 1, 'html': '<p>Линзовый телескоп</p>'}
+            )
+            self.locked_section = Section.objects.create(
+                course=self.course,
+                title='Телескопы будущего',
+                order=2,
+                publish_datetime=timezone.now() + timedelta(days=7)
+            )
+            Album.objects.create(title='Телескопы обсерватории', is_published=True)
+            Album.objects.create(title='Телескопы черновик', is_published=False)
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {(item['entity'], item['id']) for item in response.data['results']}
+
+    def test_anonymous_sees_only_public_entities(self):
+        results = self.search(q='телескопы')
+        self.assertEqual({entity for entity, _ in results}, {'course', 'album'})
+        self.assertEqual(len(results), 2)
+
+    def test_subscriber_sees_unlocked_course_content(self):
+        Subscription.objects.create(user=self.student, course=self.course)
+        self.client.force_authenticate(user=self.student)
+
+        results = self.search(q='телескоп', entity=['section', 'element'])
+        self.assertEqual(results, {('section', self.section.id), ('element', self.element.id)})
+
+    def test_typeahead_prefix(self):
+        Subscription.objects.create(user=self.student, course=self.course)
+        self.client.force_authenticate(user=self.student)
+
+        # Совпадение в заголовке элемента важнее, чем в тексте раздела и курса
+        response = self.client.get('/api/search/', {'q': 'реф', 'mode': 'typeahead'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first = response.data['results'][0]
+        self.assertEqual(
+            (first['entity'], first['id'], first['course_id']),
+            ('element', self.element.id, self.course.id)
+        )
+        self.assertEqual(self.search(q='астро пла', mode='typeahead'), {('course', self.course.id)})
+        self.assertEqual(self.search(q='астро луна', mode='typeahead'), set())
+
+    def test_owner_sees_locked_section(self):
+        self.client.force_authenticate(user=self.teacher)
+        results = self.search(q='будущего', mode='typeahead', entity='section')
+        self.assertEqual(results, {('section', self.locked_section.id)})
+
+        self.client.force_authenticate(user=self.student)
+        Subscription.objects.create(user=self.student, course=self.course)
+        self.assertEqual(self.search(q='будущего', mode='typeahead', entity='section'), set())
+
+    def test_invalid_entity(self):
+        response = self.client.get('/api/search/', {'q': 'телескоп', 'entity': 'photo'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
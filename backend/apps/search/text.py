@@ -0,0 +1,92 @@
+"""
+Извлечение текста для поисковых документов.
+
+HTML из CKEditor превращается в обычный текст, из JSON блоков (content_blocks
+новостей, ContentElement.data) берутся только текстовые поля - ссылки,
+идентификаторы видео и служебные поля в индекс не попадают.
+"""
+
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+# Ключи JSON блоков, значения которых содержат текст для поиска
+TEXT_KEYS = frozenset({
+    'html', 'text', 'title', 'caption', 'alt', 'description',
+    'content', 'link_text', 'task_file_name',
+})
+HTML_KEYS = frozenset({'html', 'content'})
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class _TextExtractor(HTMLParser):
+    """Собирает текстовые узлы HTML, пропуская script и style"""
+
+    SKIP_TAGS = {'script', 'style'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        else:
+            # Теги разделяют слова: <p>a</p><p>b</p> -> "a b"
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip:
+            self._skip -= 1
+        else:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def normalize_whitespace(text: str) -> str:
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def html_to_text(html) -> str:
+    """Возвращает текст HTML-фрагмента без тегов"""
+    if not html:
+        return ''
+    if '<' not in html:
+        return normalize_whitespace(unescape(html))
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return normalize_whitespace(''.join(parser.parts))
+
+
+def blocks_to_text(value) -> str:
+    """
+    Извлекает текст из JSON блоков.
+
+    Поддерживает как список блоков ({type, data} или плоский словарь),
+    так и данные одного блока.
+    """
+    parts = []
+
+    def walk(node, key=None):
+        if isinstance(node, str):
+            if key in TEXT_KEYS:
+                parts.append(html_to_text(node) if key in HTML_KEYS else node)
+        elif isinstance(node, dict):
+            for child_key, child in node.items():
+                walk(child, child_key)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child, key)
+
+    walk(value)
+    return normalize_whitespace(' '.join(part for part in parts if part))
+
+
+def join_text(*parts) -> str:
+    return normalize_whitespace(' '.join(part for part in parts if part))
@@ -0,0 +1,51 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .backends import get_search_backend
+from .queries import typeahead, visible_documents
+from .serializers import SearchParamsSerializer, SearchResultSerializer
+
+DEFAULT_LIMITS = {
+    SearchParamsSerializer.MODE_FULL: 20,
+    SearchParamsSerializer.MODE_TYPEAHEAD: 8,
+}
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search(request):
+    """
+    Поиск по курсам, разделам, элементам, новостям и альбомам.
+
+    Query params:
+        q: Поисковый запрос
+        mode: full (по умолчанию) - полнотекстовый поиск с фрагментами текста;
+            typeahead - быстрые подсказки по префиксам слов
+        entity: Тип объектов (course, section, element, news, album),
+            можно указать несколько раз
+        limit: Количество результатов (до 50)
+    """
+    query_data = {
+        key: request.query_params[key] for key in ('q', 'mode', 'limit') if key in request.query_params
+    }
+    if 'entity' in request.query_params:
+        query_data['entity'] = request.query_params.getlist('entity')
+    params = SearchParamsSerializer(data=query_data)
+    params.is_valid(raise_exception=True)
+    data = params.validated_data
+
+    mode = data['mode']
+    limit = data.get('limit') or DEFAULT_LIMITS[mode]
+    documents = visible_documents(request, data.get('entity'))
+
+    if mode == SearchParamsSerializer.MODE_TYPEAHEAD:
+        results = typeahead(data['q'], documents, limit)
+    else:
+        results = get_search_backend().search(data['q'], documents, limit)
+
+    return Response({
+        'query': data['q'],
+        'mode': mode,
+        'results': SearchResultSerializer(results, many=True).data,
+    })
@@ -67,6 +67,11 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ['-created_at']
+        indexes = [
+            # Ключи курсорной пагинации списков пользователей
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['role', '-created_at', '-id']),
+        ]
 
     def __str__(self):
         return f'{self.last_name} {self.first_name}'
@@ -11,6 +11,7 @@ from .serializers import (
     AssignRoleSerializer
 )
 from .permissions import IsAdmin
+from apps.core.pagination import KeysetPagination
 
 
 class ProfileView(generics.RetrieveUpdateAPIView):
@@ -27,6 +28,8 @@ class UserListView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
     queryset = User.objects.all()
+    pagination_class = KeysetPagination
+    cursor_ordering = ('-created_at',)
 
     def get_queryset(self):
         queryset = super().get_queryset()
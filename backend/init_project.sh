@@ -26,6 +26,10 @@ echo ""
 echo "Step 3: Creating default tags..."
 python manage.py create_default_tags
 
+echo ""
+echo "Step 3.1: Building search index..."
+python manage.py rebuild_search_index
+
 echo ""
 echo "Step 4: Checking for superuser..."
 python manage.py shell -c "from apps.users.models import User; exit(0 if User.objects.filter(is_admin=True).exists() else 1)"
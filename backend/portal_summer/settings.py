@@ -40,9 +40,13 @@ INSTALLED_APPS = [
     'apps.news',
     'apps.gallery',
     'apps.courses',
+    'apps.search',
 ]
 
 MIDDLEWARE = [
+    'apps.core.instrumentation.RequestMetricsMiddleware',
+    'apps.core.query_tracing.QueryTraceMiddleware',
+    'apps.core.profiling.ProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -227,3 +231,26 @@ CKEDITOR_5_CONFIGS = {
     },
 }
 CKEDITOR_5_FILE_UPLOAD_PERMISSION = "authenticated"
+
+# Метрики запросов (apps.core.instrumentation): включение, размер кольцевого буфера
+# и токен для сборщика Prometheus (Authorization: Bearer <токен>; пустой - только администраторы)
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'True').lower() == 'true'
+REQUEST_METRICS_BUFFER_SIZE = int(os.getenv('REQUEST_METRICS_BUFFER_SIZE', '5000'))
+REQUEST_METRICS_TOKEN = os.getenv('REQUEST_METRICS_TOKEN', '')
+
+# Трассировка SQL-запросов (apps.core.query_tracing): доля трассируемых запросов,
+# токен заголовка X-Query-Trace (в DEBUG не нужен) и пороги N+1 и медленного запроса
+QUERY_TRACE_SAMPLE_RATE = float(os.getenv('QUERY_TRACE_SAMPLE_RATE', '0'))
+QUERY_TRACE_TOKEN = os.getenv('QUERY_TRACE_TOKEN', '')
+QUERY_TRACE_REPEAT_THRESHOLD = int(os.getenv('QUERY_TRACE_REPEAT_THRESHOLD', '5'))
+QUERY_TRACE_SLOW_MS = int(os.getenv('QUERY_TRACE_SLOW_MS', '100'))
+
+# Семплирующий профилировщик (apps.core.profiling): доля профилируемых запросов,
+# токен заголовка X-Profile (в DEBUG не нужен), период снятия стеков и лимит стеков на view
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', '0'))
+PROFILER_TOKEN = os.getenv('PROFILER_TOKEN', '')
+PROFILER_INTERVAL_MS = int(os.getenv('PROFILER_INTERVAL_MS', '5'))
+PROFILER_MAX_STACKS = int(os.getenv('PROFILER_MAX_STACKS', '2000'))
+
+# Время жизни кэша облака тегов новостей (секунды); сбрасывается при пересчете счетчиков
+NEWS_TAG_CLOUD_CACHE_TIMEOUT = int(os.getenv('NEWS_TAG_CLOUD_CACHE_TIMEOUT', '600'))
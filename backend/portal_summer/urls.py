@@ -17,6 +17,7 @@ urlpatterns = [
     path('api/users/', include('apps.users.urls')),
     path('api/news/', include('apps.news.urls')),
     path('api/gallery/', include('apps.gallery.urls')),
+    path('api/search/', include('apps.search.urls')),
     path('api/', include('apps.courses.urls')),
     path('api/core/', include('apps.core.urls')),
 
@@ -11,6 +11,11 @@ const AlbumDetailPage = () => {
   const [album, setAlbum] = useState(null);
   const [loading, setLoading] = useState(true);
 
+  // Фотографии загружаются страницами: первая приходит с альбомом
+  const [photos, setPhotos] = useState([]);
+  const [photosNext, setPhotosNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
   // Лайтбокс: индекс открытого фото (null = закрыт)
   const [lightboxIndex, setLightboxIndex] = useState(null);
 
@@ -32,6 +37,8 @@ const AlbumDetailPage = () => {
     try {
       const response = await galleryAPI.getAlbum(id);
       setAlbum(response.data);
+      setPhotos(response.data.photos || []);
+      setPhotosNext(response.data.photos_next);
     } catch (error) {
       console.error('Error loading album:', error);
     } finally {
@@ -39,17 +46,30 @@ const AlbumDetailPage = () => {
     }
   };
 
+  const loadMorePhotos = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await galleryAPI.getAlbumPhotosPage(id, photosNext);
+      setPhotos((loaded) => [...loaded, ...response.data.results]);
+      setPhotosNext(response.data.next);
+    } catch (error) {
+      console.error('Error loading photos:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // ── Лайтбокс ──────────────────────────────────
   const openLightbox = (index) => setLightboxIndex(index);
   const closeLightbox = useCallback(() => setLightboxIndex(null), []);
 
   const prevPhoto = useCallback(() => {
-    setLightboxIndex((i) => (i === 0 ? album.photos.length - 1 : i - 1));
-  }, [album?.photos?.length]);
+    setLightboxIndex((i) => (i === 0 ? photos.length - 1 : i - 1));
+  }, [photos.length]);
 
   const nextPhoto = useCallback(() => {
-    setLightboxIndex((i) => (i === album.photos.length - 1 ? 0 : i + 1));
-  }, [album?.photos?.length]);
+    setLightboxIndex((i) => (i === photos.length - 1 ? 0 : i + 1));
+  }, [photos.length]);
 
   // Клавиатурная навигация
   useEffect(() => {
@@ -141,8 +161,6 @@ const AlbumDetailPage = () => {
     );
   }
 
-  const photos = album.photos || [];
-
   return (
     <Container className="py-4">
 
@@ -217,7 +235,7 @@ const AlbumDetailPage = () => {
       )}
 
       {/* ── Сетка фотографий ── */}
-      <h3 className="mb-3">Фотографии ({photos.length})</h3>
+      <h3 className="mb-3">Фотографии ({album.photos_count})</h3>
 
       {photos.length > 0 ? (
         <div className="album-photo-grid">
@@ -227,7 +245,17 @@ const AlbumDetailPage = () => {
               className="album-photo-item"
               onClick={() => openLightbox(index)}
             >
-              <img src={photo.image} alt={photo.title || `Фото ${index + 1}`} />
+              <img
+                src={photo.image}
+                alt={photo.title || `Фото ${index + 1}`}
+                width={photo.width || undefined}
+                height={photo.height || undefined}
+                loading="lazy"
+                style={photo.placeholder ? {
+                  backgroundImage: `url(${photo.placeholder})`,
+                  backgroundSize: 'cover',
+                } : undefined}
+              />
 
               {/* Оверлей при наведении */}
               <div className="album-photo-overlay" />
@@ -257,6 +285,14 @@ const AlbumDetailPage = () => {
         </p>
       )}
 
+      {photosNext && (
+        <div className="text-center mt-4">
+          <Button variant="outline-primary" onClick={loadMorePhotos} disabled={loadingMore}>
+            {loadingMore ? 'Загрузка...' : `Показать ещё (${photos.length} из ${album.photos_count})`}
+          </Button>
+        </div>
+      )}
+
       {/* ── Лайтбокс ── */}
       {lightboxIndex !== null && photos[lightboxIndex] && (
         <div
@@ -42,7 +42,7 @@ const AlbumEditor = () => {
         description: data.description || '',
         cover_url: data.cover,
       });
-      setPhotos(data.photos || []);
+      setPhotos(await galleryAPI.getAllAlbumPhotos(data));
       setIsPublished(data.is_published || false);
     } catch (error) {
       console.error('Error loading album:', error);
@@ -96,6 +96,22 @@ export const newsAPI = {
 export const galleryAPI = {
   getAlbums: (params) => api.get('/gallery/albums/', { params }),
   getAlbum: (id) => api.get(`/gallery/albums/${id}/`),
+  // Следующая страница фотографий альбома; nextUrl - photos_next альбома или next страницы.
+  // Передаем все параметры ссылки (cursor, page_size), а не только курсор
+  getAlbumPhotosPage: (id, nextUrl) => api.get(`/gallery/albums/${id}/photos/`, {
+    params: Object.fromEntries(new URL(nextUrl, window.location.origin).searchParams),
+  }),
+  // Все фотографии альбома (для редактора): первая страница из альбома и остальные по курсору
+  getAllAlbumPhotos: async (album) => {
+    const photos = [...(album.photos || [])];
+    let nextUrl = album.photos_next;
+    while (nextUrl) {
+      const { data } = await galleryAPI.getAlbumPhotosPage(album.id, nextUrl);
+      photos.push(...data.results);
+      nextUrl = data.next;
+    }
+    return photos;
+  },
   getLatest: () => api.get('/gallery/albums/latest/'),
   createAlbum: (data) => {
     const config = data instanceof FormData ? { headers: { 'Content-Type': 'multipart/form-data' } } : {};